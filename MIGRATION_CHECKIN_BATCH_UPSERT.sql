@@ -0,0 +1,36 @@
+-- ================================================================
+-- Database Migration: Set-based batch check-in upload
+-- ================================================================
+--
+-- POST /scanner/checkin/batch now writes the whole batch with one
+-- INSERT ... ON CONFLICT DO NOTHING, which needs a unique key on
+-- (entry_id, session_type, check_in_time).
+--
+-- Also adds the qr_data column that scanners already upload.
+--
+-- Run this in Supabase SQL Editor
+-- ================================================================
+
+-- Step 1: Add raw QR data column
+ALTER TABLE check_ins
+ADD COLUMN IF NOT EXISTS qr_data VARCHAR(1000);
+
+-- Step 2: Remove exact duplicate scans (keep the first recorded row)
+DELETE FROM check_ins a
+USING check_ins b
+WHERE a.entry_id = b.entry_id
+  AND a.session_type = b.session_type
+  AND a.check_in_time = b.check_in_time
+  AND a.id > b.id;
+
+-- Step 3: Add the unique constraint used by ON CONFLICT
+ALTER TABLE check_ins
+DROP CONSTRAINT IF EXISTS uq_check_ins_entry_session_time;
+
+ALTER TABLE check_ins
+ADD CONSTRAINT uq_check_ins_entry_session_time
+UNIQUE (entry_id, session_type, check_in_time);
+
+-- Step 4: Verify the migration
+SELECT conname FROM pg_constraint WHERE conname = 'uq_check_ins_entry_session_time';
+SELECT COUNT(*) AS total_check_ins FROM check_ins;
@@ -0,0 +1,91 @@
+-- ================================================================
+-- Database Migration: First-entry check-ins + re-entry table
+-- ================================================================
+--
+-- check_ins now holds exactly one row per (entry_id, session_type): the
+-- first entry. The database enforces this with a unique constraint, so two
+-- scanners scanning the same person at the same moment cannot both record
+-- a first check-in (the old SELECT-then-INSERT could).
+--
+-- Every later scan is stored in re_entries, pointing at the first check-in.
+--
+-- Replaces uq_check_ins_entry_session_time (MIGRATION_CHECKIN_BATCH_UPSERT.sql)
+-- and ix_check_ins_entry_session (MIGRATION_HOT_QUERY_INDEXES.sql).
+--
+-- Run this in Supabase SQL Editor
+-- ================================================================
+
+-- Step 1: Create re-entry table
+CREATE TABLE IF NOT EXISTS re_entries (
+    id SERIAL PRIMARY KEY,
+    check_in_id INTEGER NOT NULL REFERENCES check_ins(id) ON DELETE CASCADE,
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    session_type VARCHAR(50) NOT NULL,
+    check_in_time TIMESTAMPTZ DEFAULT NOW(),
+    gate_number VARCHAR(50),
+    gate_location VARCHAR(255),
+    scanner_device_id VARCHAR(100),
+    scanner_operator VARCHAR(100),
+    qr_data VARCHAR(1000),
+    idempotency_key VARCHAR(64),
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    CONSTRAINT uq_re_entries_entry_session_time UNIQUE (entry_id, session_type, check_in_time)
+);
+
+CREATE INDEX IF NOT EXISTS ix_re_entries_id ON re_entries (id);
+CREATE INDEX IF NOT EXISTS ix_re_entries_check_in_id ON re_entries (check_in_id);
+CREATE INDEX IF NOT EXISTS ix_re_entries_entry_id ON re_entries (entry_id);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_re_entries_idempotency_key ON re_entries (idempotency_key);
+
+-- Step 2: Move existing repeat scans into re_entries
+-- (the earliest check-in per entry/session stays in check_ins)
+WITH ranked AS (
+    SELECT id, entry_id, session_type,
+           FIRST_VALUE(id) OVER (
+               PARTITION BY entry_id, session_type ORDER BY check_in_time, id
+           ) AS first_id
+    FROM check_ins
+)
+INSERT INTO re_entries (
+    check_in_id, entry_id, session_type, check_in_time, gate_number, gate_location,
+    scanner_device_id, scanner_operator, qr_data, idempotency_key
+)
+SELECT r.first_id, c.entry_id, c.session_type, c.check_in_time, c.gate_number, c.gate_location,
+       c.scanner_device_id, c.scanner_operator, c.qr_data, c.idempotency_key
+FROM check_ins c
+JOIN ranked r ON r.id = c.id
+WHERE c.id <> r.first_id
+ON CONFLICT DO NOTHING;
+
+DELETE FROM check_ins c
+USING check_ins first
+WHERE c.entry_id = first.entry_id
+  AND c.session_type = first.session_type
+  AND (first.check_in_time, first.id) < (c.check_in_time, c.id);
+
+-- Step 3: Swap the constraints
+ALTER TABLE check_ins
+DROP CONSTRAINT IF EXISTS uq_check_ins_entry_session_time;
+
+DROP INDEX IF EXISTS ix_check_ins_entry_session;
+
+ALTER TABLE check_ins
+DROP CONSTRAINT IF EXISTS uq_check_ins_entry_session;
+
+ALTER TABLE check_ins
+ADD CONSTRAINT uq_check_ins_entry_session
+UNIQUE (entry_id, session_type);
+
+-- Step 4: Same RLS policy as the other tables
+ALTER TABLE re_entries ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow all for authenticated users" ON public.re_entries;
+CREATE POLICY "Allow all for authenticated users"
+ON public.re_entries
+FOR ALL
+USING (true);
+
+-- Step 5: Verify the migration
+SELECT conname FROM pg_constraint WHERE conname = 'uq_check_ins_entry_session';
+SELECT COUNT(*) AS first_entries FROM check_ins;
+SELECT COUNT(*) AS re_entries FROM re_entries;
@@ -0,0 +1,22 @@
+-- ================================================================
+-- Database Migration: Idempotency keys for scanner check-ins
+-- ================================================================
+--
+-- Scanners now send a client-generated idempotency_key (UUID) with each
+-- scan. A retried upload of the same scan is answered as a duplicate
+-- without re-inserting anything.
+--
+-- Run this in Supabase SQL Editor
+-- ================================================================
+
+-- Step 1: Add the idempotency key column
+ALTER TABLE check_ins
+ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR(64);
+
+-- Step 2: Unique index (NULLs allowed for older scanners that do not send a key)
+CREATE UNIQUE INDEX IF NOT EXISTS ix_check_ins_idempotency_key
+ON check_ins (idempotency_key);
+
+-- Step 3: Verify the migration
+SELECT indexname FROM pg_indexes
+WHERE tablename = 'check_ins' AND indexname = 'ix_check_ins_idempotency_key';
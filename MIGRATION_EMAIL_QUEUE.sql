@@ -0,0 +1,62 @@
+-- ================================================================
+-- Database Migration: Durable outbound email queue
+-- ================================================================
+--
+-- Bulk pass emails are no longer sent from the Streamlit script. The
+-- app writes one email_queue row per attendee and polls it; the email
+-- worker (python email_worker.py) claims pending rows, renders the
+-- passes and sends them with concurrent senders.
+--
+-- A partial unique index allows only one pending/sending email per
+-- entry, so reruns, refreshes and double clicks cannot queue duplicates.
+--
+-- Run this in Supabase SQL Editor
+-- ================================================================
+
+-- Step 1: Create queue table
+CREATE TABLE IF NOT EXISTS email_queue (
+    id SERIAL PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    kind VARCHAR(30) NOT NULL,
+    passes VARCHAR(200),
+    batch_id VARCHAR(36) NOT NULL,
+    requested_by VARCHAR(100) NOT NULL,
+    state VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error VARCHAR(1000),
+    run_after TIMESTAMPTZ DEFAULT NOW(),
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    sent_at TIMESTAMPTZ
+);
+
+-- Step 2: Indexes
+CREATE INDEX IF NOT EXISTS ix_email_queue_id
+ON email_queue (id);
+
+CREATE INDEX IF NOT EXISTS ix_email_queue_batch_id
+ON email_queue (batch_id);
+
+-- Worker claim (state = 'pending' AND run_after <= now)
+CREATE INDEX IF NOT EXISTS ix_email_queue_state_run_after
+ON email_queue (state, run_after);
+
+-- One queued or in-flight email per entry and kind
+CREATE UNIQUE INDEX IF NOT EXISTS uq_email_queue_active_entry
+ON email_queue (entry_id, kind)
+WHERE state IN ('pending', 'sending');
+
+-- Step 3: Same RLS policy as the other tables
+ALTER TABLE email_queue ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow all for authenticated users" ON public.email_queue;
+CREATE POLICY "Allow all for authenticated users"
+ON public.email_queue
+FOR ALL
+USING (true);
+
+-- Step 4: Verify the migration
+SELECT state, COUNT(*) FROM email_queue GROUP BY state;
+SELECT indexname FROM pg_indexes WHERE tablename = 'email_queue';
@@ -0,0 +1,47 @@
+-- ================================================================
+-- Database Migration: Scanner Delta Sync (GET /scanner/entries?since=)
+-- ================================================================
+--
+-- Scanners now download only entries changed since their last sync.
+--   - entries.updated_at is the sync cursor (needs an index)
+--   - entry_tombstones records deleted entries so scanners can drop them
+--
+-- Tombstones are written by the backend (SQLAlchemy after_delete hook).
+-- If you delete entries by hand in the SQL Editor, also insert their
+-- ids into entry_tombstones or scanners will keep the stale rows.
+--
+-- Run this in Supabase SQL Editor
+-- ================================================================
+
+-- Step 1: Index the delta sync cursor
+CREATE INDEX IF NOT EXISTS ix_entries_updated_at
+ON entries (updated_at);
+
+-- Step 2: Create tombstone table for deleted entries
+CREATE TABLE IF NOT EXISTS entry_tombstones (
+    id SERIAL PRIMARY KEY,
+    entry_id INTEGER NOT NULL,
+    deleted_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_entry_tombstones_id
+ON entry_tombstones (id);
+
+CREATE INDEX IF NOT EXISTS ix_entry_tombstones_entry_id
+ON entry_tombstones (entry_id);
+
+CREATE INDEX IF NOT EXISTS ix_entry_tombstones_deleted_at
+ON entry_tombstones (deleted_at);
+
+-- Step 3: Same RLS policy as the other tables
+ALTER TABLE entry_tombstones ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow all for authenticated users" ON public.entry_tombstones;
+CREATE POLICY "Allow all for authenticated users"
+ON public.entry_tombstones
+FOR ALL
+USING (true);
+
+-- Step 4: Verify the migration
+SELECT COUNT(*) AS tombstones FROM entry_tombstones;
+SELECT indexname FROM pg_indexes WHERE tablename = 'entries' AND indexname = 'ix_entries_updated_at';
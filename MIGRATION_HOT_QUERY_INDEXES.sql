@@ -0,0 +1,74 @@
+-- ================================================================
+-- Database Migration: Composite and partial indexes for hot queries
+-- ================================================================
+--
+-- Indexes matched to how the scanner API and Streamlit pages query:
+--   - check_ins (entry_id, session_type)       -> duplicate check on POST /scanner/checkin
+--   - check_ins (gate_number, check_in_time)   -> GET /scanner/stats per gate / per interval
+--   - entries (username, pass_generated flags) WHERE any of them is set
+--                                              -> "passes generated" count on the dashboard
+--
+-- Batch uploads filter on (entry_id, session_type, check_in_time), which is
+-- already served by uq_check_ins_entry_session_time
+-- (MIGRATION_CHECKIN_BATCH_UPSERT.sql).
+--
+-- To re-check from Python (PostgreSQL or local SQLite):
+--   python check_query_indexes.py
+--
+-- Run this in Supabase SQL Editor
+-- ================================================================
+
+-- Step 1: Check-in indexes
+CREATE INDEX IF NOT EXISTS ix_check_ins_entry_session
+ON check_ins (entry_id, session_type);
+
+CREATE INDEX IF NOT EXISTS ix_check_ins_gate_time
+ON check_ins (gate_number, check_in_time);
+
+-- Step 2: Partial index on entries with at least one generated pass
+-- The flag columns make it covering, so the count never reads the table
+-- (and SQLite prefers it over ix_entries_username). Dropped first to
+-- replace the earlier username-only version.
+DROP INDEX IF EXISTS ix_entries_username_pass_generated;
+CREATE INDEX ix_entries_username_pass_generated
+ON entries (username, pass_generated_exhibition_day1, pass_generated_exhibition_day2,
+            pass_generated_interactive_sessions, pass_generated_plenary)
+WHERE pass_generated_exhibition_day1 = true
+   OR pass_generated_exhibition_day2 = true
+   OR pass_generated_interactive_sessions = true
+   OR pass_generated_plenary = true;
+
+-- Step 3: Refresh planner statistics
+ANALYZE check_ins;
+ANALYZE entries;
+
+-- Step 4: Verify the migration
+SELECT indexname FROM pg_indexes
+WHERE indexname IN (
+    'ix_check_ins_entry_session',
+    'ix_check_ins_gate_time',
+    'ix_entries_username_pass_generated'
+);
+
+-- Step 5: Check the hot queries use the indexes
+-- (seq scans disabled so small tables still show which index is usable;
+--  every plan should show "Index Scan" / "Index Only Scan" / "Bitmap Index Scan")
+SET enable_seqscan = off;
+
+EXPLAIN SELECT id FROM check_ins
+WHERE entry_id = 1 AND session_type = 'exhibition_day1' LIMIT 1;
+
+EXPLAIN SELECT COUNT(id), COUNT(DISTINCT entry_id), MAX(check_in_time) FROM check_ins
+WHERE gate_number = 'Gate 1';
+
+EXPLAIN SELECT COUNT(id) FROM check_ins
+WHERE gate_number = 'Gate 1' AND check_in_time >= NOW() - INTERVAL '2 hours';
+
+EXPLAIN SELECT COUNT(*) FROM entries
+WHERE username = 'admin'
+  AND (pass_generated_exhibition_day1 = true
+    OR pass_generated_exhibition_day2 = true
+    OR pass_generated_interactive_sessions = true
+    OR pass_generated_plenary = true);
+
+RESET enable_seqscan;
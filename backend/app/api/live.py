@@ -0,0 +1,170 @@
+"""
+Live gate throughput API - Server-sent events stream and admin dashboard
+Pushes in-memory check-in counters so staff can be moved before lines form
+"""
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Request
+from fastapi.responses import StreamingResponse, HTMLResponse
+
+from ..core.security import decode_token
+from ..services.live_stats import live_stats
+
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+# How often the stream checks for new counters, and the longest gap between events
+TICK_SECONDS = 1
+KEEPALIVE_SECONDS = 15
+
+
+async def verify_live_token(
+    token: Optional[str] = None,
+    authorization: Optional[str] = Header(None)
+) -> dict:
+    """
+    Verify a scanner or admin JWT from the Authorization header or `token` query param
+
+    EventSource cannot set headers, so the browser dashboard passes the token in the URL.
+
+    Raises:
+        HTTPException: If token is missing, invalid or not scanner/admin
+    """
+    if authorization and authorization.startswith("Bearer "):
+        token = authorization.replace("Bearer ", "")
+
+    payload = decode_token(token) if token else None
+
+    if not payload or payload.get("role") not in ("scanner", "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    return payload
+
+
+@router.get("/gates/stream")
+async def stream_gate_throughput(
+    request: Request,
+    token: dict = Depends(verify_live_token)
+):
+    """
+    Server-sent events stream of live check-in counters per gate and session
+
+    Sends a `stats` event whenever counters change (checked every second)
+    and at least every 15 seconds otherwise. Counters come from memory only;
+    the stream never queries the database.
+
+    Authentication: Requires scanner or admin JWT token
+    """
+    async def events():
+        last_version = -1
+        idle = 0.0
+
+        while not await request.is_disconnected():
+            # Rate windows move with the clock, so resend even when idle
+            if live_stats.version != last_version or idle >= KEEPALIVE_SECONDS:
+                last_version = live_stats.version
+                idle = 0.0
+                yield f"event: stats\ndata: {json.dumps(live_stats.snapshot())}\n\n"
+
+            await asyncio.sleep(TICK_SECONDS)
+            idle += TICK_SECONDS
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/gates/snapshot")
+async def get_gate_throughput(token: dict = Depends(verify_live_token)):
+    """
+    Current live counters (same payload as one stream event)
+
+    Authentication: Requires scanner or admin JWT token
+    """
+    return live_stats.snapshot()
+
+
+@router.get("/dashboard", response_class=HTMLResponse)
+async def live_dashboard():
+    """
+    Lightweight admin view of gate throughput
+
+    Open as /api/v1/live/dashboard?token=<JWT>. The page itself is static;
+    data is only delivered by the authenticated event stream.
+    """
+    return LIVE_DASHBOARD_HTML
+
+
+LIVE_DASHBOARD_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Swavlamban 2025 - Live Gates</title>
+<style>
+  body { font-family: Arial, sans-serif; background: #f5f7fa; color: #333; margin: 0; padding: 20px; }
+  h1 { color: #1D4E89; font-size: 22px; margin: 0 0 4px 0; }
+  #status { color: #666; font-size: 13px; margin-bottom: 16px; }
+  .grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(280px, 1fr)); gap: 16px; }
+  .gate { background: #fff; border-radius: 8px; padding: 16px; box-shadow: 0 1px 3px rgba(0,0,0,0.1); }
+  .gate h2 { font-size: 17px; margin: 0 0 8px 0; color: #1D4E89; }
+  .rate { font-size: 32px; font-weight: bold; }
+  .rate small { font-size: 13px; font-weight: normal; color: #666; }
+  .up { color: #c0392b; } .down { color: #27ae60; }
+  .bars { display: flex; align-items: flex-end; height: 60px; gap: 2px; margin: 10px 0; }
+  .bars div { flex: 1; background: #1D4E89; min-height: 1px; }
+  .meta { font-size: 13px; color: #555; line-height: 1.6; }
+  .warn { color: #c0392b; font-weight: bold; }
+</style>
+</head>
+<body>
+<h1>Live Gate Throughput</h1>
+<div id="status">Connecting...</div>
+<div class="grid" id="gates"></div>
+<script>
+  const token = new URLSearchParams(location.search).get('token') || '';
+  const statusEl = document.getElementById('status');
+  const gatesEl = document.getElementById('gates');
+
+  // Gate and session names come from scanner uploads - never insert them as markup
+  function esc(value) {
+    return String(value).replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'})[c]);
+  }
+
+  function render(data) {
+    statusEl.textContent = 'Updated ' + new Date(data.generated_at).toLocaleTimeString() +
+      ' | scans per minute, last ' + data.window_minutes + ' min';
+    gatesEl.innerHTML = '';
+    Object.entries(data.gates).forEach(([gate, g]) => {
+      const peak = Math.max(1, ...g.scans_per_minute);
+      const bars = g.scans_per_minute.map(n => '<div style="height:' + (100 * Number(n) / peak) + '%"></div>').join('');
+      const trend = g.trend > 0 ? '<span class="up">&#9650; ' + Number(g.trend) + '</span>'
+                  : g.trend < 0 ? '<span class="down">&#9660; ' + Math.abs(g.trend) + '</span>' : '&#8212;';
+      const sessions = Object.entries(g.sessions).map(([s, n]) => esc(s.replace(/_/g, ' ')) + ': ' + Number(n)).join('<br>');
+      const backlog = g.sync_backlog_seconds > 120
+        ? '<span class="warn">Scanner sync backlog: ' + Math.round(g.sync_backlog_seconds / 60) + ' min</span><br>' : '';
+      const card = document.createElement('div');
+      card.className = 'gate';
+      card.innerHTML = '<h2>' + esc(gate) + '</h2>' +
+        '<div class="rate">' + Number(g.rate_5m) + ' <small>scans/min (5 min avg)</small> ' + trend + '</div>' +
+        '<div class="bars">' + bars + '</div>' +
+        '<div class="meta">' + backlog + 'Total: <b>' + Number(g.total) + '</b><br>' + sessions + '</div>';
+      gatesEl.appendChild(card);
+    });
+  }
+
+  const source = new EventSource('gates/stream?token=' + encodeURIComponent(token));
+  source.addEventListener('stats', e => render(JSON.parse(e.data)));
+  source.onerror = () => { statusEl.textContent = 'Disconnected - retrying... (check ?token=)'; };
+</script>
+</body>
+</html>
+"""
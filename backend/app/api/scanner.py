@@ -2,18 +2,27 @@
 Scanner API endpoints for QR code scanning at event gates
 Provides authentication, entry downloads, and check-in uploads for offline-capable scanner devices
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import select, func, or_, not_, false, cast, tuple_, union_all, Integer
 from typing import Optional, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import json
 
-from ..core.database import get_db
+from ..core.database import get_async_db, dialect_insert, engine
 from ..core.security import verify_password, create_access_token, decode_token
 from ..models.user import User
 from ..models.entry import Entry
 from ..models.checkin import CheckIn
+from ..models.re_entry import ReEntry
+from ..models.entry_tombstone import EntryTombstone
 from ..models.scanner_device import ScannerDevice
+from ..services.scanner_snapshot import scanner_snapshot
+from ..services.entry_index import entry_index
+from ..services.live_stats import live_stats
 from ..schemas.scanner import (
     ScannerLoginRequest,
     ScannerLoginResponse,
@@ -23,15 +32,26 @@ from ..schemas.scanner import (
     CheckInCreate,
     CheckInBatch,
     CheckInBatchResponse,
+    CheckInResult,
     QRVerifyRequest,
     QRVerifyResponse,
-    ScannerStats
+    ScannerStats,
+    SessionStats,
+    IntervalStats
 )
 
 
 router = APIRouter(prefix="/scanner", tags=["scanner"])
 
 
+# Delta sync re-sends changes from this long before the client's cursor.
+# The cursor is the database clock at the start of the download, but a write
+# that started earlier and committed after it carries an older updated_at and
+# would otherwise be skipped for good; the scanner upserts and deletes by
+# entry id, so re-sent rows are harmless
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
 # Gate configuration (must match frontend src/config/gates.ts)
 GATE_CONFIG = {
     "Gate 1": {
@@ -39,7 +59,7 @@ GATE_CONFIG = {
         "location": "Exhibition Hall",
         "date": "2025-11-25",
         "time": "1100-1730",
-        "allowed_passes": ["exhibition_day1", "exhibitor_pass"],
+        "allowed_passes": ["exhibition_day1", "plenary", "exhibitor_pass"],
         "session_type": "exhibition_day1"
     },
     "Gate 2": {
@@ -47,7 +67,7 @@ GATE_CONFIG = {
         "location": "Exhibition Hall",
         "date": "2025-11-26",
         "time": "1000-1730",
-        "allowed_passes": ["exhibition_day2", "exhibitor_pass"],
+        "allowed_passes": ["exhibition_day2", "interactive_sessions", "plenary", "exhibitor_pass"],
         "session_type": "exhibition_day2"
     },
     "Gate 3": {
@@ -77,7 +97,84 @@ GATE_CONFIG = {
 }
 
 
-def verify_scanner_token(authorization: Optional[str] = Header(None)) -> dict:
+# Rows fetched per round trip when streaming entries
+ENTRY_STREAM_CHUNK_SIZE = 500
+
+# Check-ins inserted and committed together in a batch upload
+CHECKIN_BATCH_CHUNK_SIZE = 200
+
+# Passes valid on each event day at the Main Entrance (must match frontend src/services/scanner.ts)
+DATE_PASSES = {
+    "2025-11-25": ["exhibition_day1", "plenary", "exhibitor_pass"],
+    "2025-11-26": ["exhibition_day2", "interactive_sessions", "exhibitor_pass"]
+}
+
+# Pass type -> Entry boolean column it is allocated by
+PASS_COLUMNS = {
+    "exhibition_day1": Entry.exhibition_day1,
+    "exhibition_day2": Entry.exhibition_day2,
+    "interactive_sessions": Entry.interactive_sessions,
+    "plenary": Entry.plenary,
+    "exhibitor_pass": Entry.is_exhibitor_pass
+}
+
+# Session types a check-in may carry: a gate's own session, or at the Main
+# Entrance (no session of its own) the type of the pass scanned
+VALID_SESSION_TYPES = set(PASS_COLUMNS) | {
+    config["session_type"] for config in GATE_CONFIG.values() if config["session_type"]
+}
+
+
+def checkin_source_error(checkin: CheckInCreate) -> Optional[str]:
+    """
+    Reject a check-in from an unknown gate or session
+
+    Gate and session names are shown on the live dashboard and in stats,
+    so only values from GATE_CONFIG are accepted.
+
+    Returns:
+        Error message, or None if the check-in is acceptable
+    """
+    if checkin.gate_number not in GATE_CONFIG:
+        return f"Unknown gate: {checkin.gate_number}"
+    if checkin.session_type not in VALID_SESSION_TYPES:
+        return f"Unknown session type: {checkin.session_type}"
+    return None
+
+
+def build_entry_filter(gate_number: Optional[str] = None, date: Optional[str] = None):
+    """
+    Build a SQL filter for entries that can enter a gate on a date
+
+    A gate with its own pass list (Gates 1-4, each open on a single day)
+    admits exactly those passes. The Main Entrance has no pass list, so
+    there the date's valid passes apply (DATE_PASSES). The passes are
+    turned into an OR over the matching boolean pass columns.
+    The Main Entrance on a date outside the event is not filtered on.
+
+    Args:
+        gate_number: Gate number from GATE_CONFIG
+        date: Session date (YYYY-MM-DD)
+
+    Returns:
+        SQLAlchemy filter expression, or None if every entry qualifies
+    """
+    passes = None
+
+    gate_config = GATE_CONFIG.get(gate_number) if gate_number else None
+    if gate_config and gate_config["allowed_passes"]:
+        passes = list(gate_config["allowed_passes"])
+    elif date in DATE_PASSES:
+        passes = list(DATE_PASSES[date])
+
+    if passes is None:
+        return None
+
+    # IS TRUE (not == TRUE) so NULL flags never leak through NOT(...) below
+    return or_(false(), *[PASS_COLUMNS[p].is_(True) for p in passes])
+
+
+async def verify_scanner_token(authorization: Optional[str] = Header(None)) -> dict:
     """
     Verify JWT token from Authorization header
 
@@ -111,9 +208,9 @@ def verify_scanner_token(authorization: Optional[str] = Header(None)) -> dict:
 
 
 @router.post("/login", response_model=ScannerLoginResponse)
-def scanner_login(
+async def scanner_login(
     request: ScannerLoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Authenticate scanner operator and return JWT token
@@ -134,11 +231,11 @@ def scanner_login(
         )
 
     # Find scanner user
-    user = db.query(User).filter(
+    user = (await db.scalars(select(User).filter(
         User.username == request.username,
         User.role == "scanner",
         User.is_active == True
-    ).first()
+    ).limit(1))).first()
 
     if not user:
         raise HTTPException(
@@ -146,8 +243,8 @@ def scanner_login(
             detail="Invalid credentials or not authorized as scanner"
         )
 
-    # Verify password
-    if not verify_password(request.password, user.password_hash):
+    # Verify password (bcrypt is CPU-bound - keep it off the event loop)
+    if not await run_in_threadpool(verify_password, request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
@@ -158,9 +255,9 @@ def scanner_login(
 
     # Create or update scanner device
     if request.device_id:
-        device = db.query(ScannerDevice).filter(
+        device = (await db.scalars(select(ScannerDevice).filter(
             ScannerDevice.device_id == request.device_id
-        ).first()
+        ).limit(1))).first()
 
         if device:
             device.operator_username = user.username
@@ -176,7 +273,7 @@ def scanner_login(
             )
             db.add(device)
 
-    db.commit()
+    await db.commit()
 
     # Create JWT token (8-hour expiration for scanner shift)
     token_data = {
@@ -209,53 +306,219 @@ def scanner_login(
     )
 
 
+def entry_to_download(entry: Entry) -> EntryDownload:
+    """Format an Entry row for scanner download"""
+    return EntryDownload(
+        entry_id=entry.id,
+        name=entry.name,
+        organization=entry.organization,
+        phone=entry.phone,
+        email=entry.email,
+        id_type=entry.id_type,
+        id_number=entry.id_number,
+        qr_signature=entry.qr_signature,
+        exhibition_day1=entry.exhibition_day1,
+        exhibition_day2=entry.exhibition_day2,
+        interactive_sessions=entry.interactive_sessions,
+        plenary=entry.plenary,
+        is_exhibitor=entry.is_exhibitor
+    )
+
+
+async def build_entries_query(
+    db: AsyncSession,
+    gate_number: Optional[str] = None,
+    date: Optional[str] = None,
+    since: Optional[datetime] = None
+):
+    """
+    Build the entry download query shared by the JSON and streaming endpoints
+
+    Returns:
+        (sync_time, stmt, deleted_entry_ids) - sync_time is the cursor for
+        the next delta sync, stmt is the select() for the entries to send
+
+    Raises:
+        HTTPException: If gate number is invalid
+    """
+    if gate_number and gate_number not in GATE_CONFIG:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid gate number. Must be one of: {', '.join(GATE_CONFIG.keys())}"
+        )
+
+    # Cursor is taken from the database clock (same clock as updated_at)
+    # before querying, so rows written during this request are re-sent next
+    # time (together with SYNC_OVERLAP, for writes still in flight now)
+    sync_time = await db.scalar(select(func.now())) or datetime.utcnow()
+
+    entry_filter = build_entry_filter(gate_number, date)
+
+    # Organization comes from the owning user - load it in the same query
+    stmt = select(Entry).options(joinedload(Entry.user))
+    if entry_filter is not None:
+        stmt = stmt.filter(entry_filter)
+
+    deleted_entry_ids = []
+
+    if since:
+        since = since - SYNC_OVERLAP
+        stmt = stmt.filter(Entry.updated_at >= since)
+        deleted_entry_ids = list(await db.scalars(
+            select(EntryTombstone.entry_id).filter(EntryTombstone.deleted_at >= since)
+        ))
+
+        # Entries whose passes changed so they no longer qualify for this gate
+        # must be removed from the scanner too
+        if entry_filter is not None:
+            deleted_entry_ids.extend(await db.scalars(
+                select(Entry.id).filter(
+                    Entry.updated_at >= since,
+                    not_(entry_filter)
+                )
+            ))
+
+    return sync_time, stmt, deleted_entry_ids
+
+
 @router.get("/entries", response_model=EntriesDownloadResponse)
-def get_entries(
-    db: Session = Depends(get_db),
+async def get_entries(
+    gate_number: Optional[str] = None,
+    date: Optional[str] = None,
+    since: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
     token: dict = Depends(verify_scanner_token)
 ):
     """
-    Download all valid entries for offline scanner use
+    Download valid entries for offline scanner use
 
-    Returns all entries with their pass allocations and QR signatures
+    Returns entries with their pass allocations and QR signatures
     for offline validation. Scanner app stores these in IndexedDB.
 
+    Gate/date scoping: with `gate_number` and/or `date` only attendees
+    holding a pass that is valid at that gate on that date are returned
+    (filtered in SQL on the boolean pass columns).
+
+    Delta sync: pass the `last_updated` value from the previous response
+    as `since` to receive only entries inserted/updated since then (and a
+    short overlap before, which the scanner dedupes by entry id), plus
+    `deleted_entry_ids` for entries removed in the meantime.
+    Without `since` the full entry list is returned.
+
+    For large downloads prefer /entries/stream (same parameters).
+
     Authentication: Requires valid scanner JWT token
     """
-    # Get all active entries
-    entries = db.query(Entry).all()
+    sync_time, stmt, deleted_entry_ids = await build_entries_query(db, gate_number, date, since)
 
     # Format entries for download
-    entry_list = []
-    for entry in entries:
-        entry_list.append(EntryDownload(
-            entry_id=entry.id,
-            name=entry.name,
-            organization=entry.organization,
-            phone=entry.phone,
-            email=entry.email,
-            id_type=entry.id_type,
-            id_number=entry.id_number,
-            qr_signature=entry.qr_signature,
-            exhibition_day1=entry.exhibition_day1,
-            exhibition_day2=entry.exhibition_day2,
-            interactive_sessions=entry.interactive_sessions,
-            plenary=entry.plenary,
-            is_exhibitor=entry.is_exhibitor
-        ))
+    entry_list = [entry_to_download(entry) for entry in await db.scalars(stmt)]
 
     return EntriesDownloadResponse(
         success=True,
         count=len(entry_list),
-        last_updated=datetime.utcnow(),
-        entries=entry_list
+        last_updated=sync_time,
+        full_sync=since is None,
+        entries=entry_list,
+        deleted_entry_ids=deleted_entry_ids
+    )
+
+
+@router.get("/entries/stream")
+async def stream_entries(
+    gate_number: Optional[str] = None,
+    date: Optional[str] = None,
+    since: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    token: dict = Depends(verify_scanner_token)
+):
+    """
+    Stream entries as newline-delimited JSON (NDJSON)
+
+    Same parameters and filtering as /entries, but rows are read from a
+    server-side cursor in chunks and written out one per line, so memory
+    stays flat regardless of table size and the scanner can start writing
+    into IndexedDB before the download finishes.
+
+    Line format:
+        {"type": "meta", "last_updated": ..., "full_sync": ..., "deleted_entry_ids": [...]}
+        {"type": "entry", "entry": {...EntryDownload...}}   (one per entry)
+        {"type": "end", "count": N}
+
+    Authentication: Requires valid scanner JWT token
+    """
+    sync_time, stmt, deleted_entry_ids = await build_entries_query(db, gate_number, date, since)
+
+    async def generate():
+        meta = {
+            "type": "meta",
+            "last_updated": sync_time.isoformat(),
+            "full_sync": since is None,
+            "deleted_entry_ids": deleted_entry_ids
+        }
+        yield json.dumps(meta) + "\n"
+
+        count = 0
+        entries = await db.stream_scalars(stmt.execution_options(yield_per=ENTRY_STREAM_CHUNK_SIZE))
+        async for entry in entries:
+            yield '{"type": "entry", "entry": ' + entry_to_download(entry).model_dump_json() + "}\n"
+            count += 1
+
+        yield json.dumps({"type": "end", "count": count}) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.get("/entries/snapshot")
+async def get_entries_snapshot(
+    gate_number: Optional[str] = None,
+    date: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    token: dict = Depends(verify_scanner_token)
+):
+    """
+    Download a compact, gzip-compressed entry snapshot for offline scanners
+
+    Only the fields a gate needs are included (entry_id, id_number, name,
+    organization, qr_signature) and the pass flags are packed into a
+    bitfield. Rows are arrays in the order given by `fields`.
+
+    The compressed snapshot is cached per gate/date and rebuilt only when
+    entries change. Send the returned ETag as If-None-Match to get
+    304 Not Modified when nothing changed. The embedded `last_updated`
+    can be used as the `since` cursor for later delta syncs.
+
+    Authentication: Requires valid scanner JWT token
+    """
+    if gate_number and gate_number not in GATE_CONFIG:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid gate number. Must be one of: {', '.join(GATE_CONFIG.keys())}"
+        )
+
+    # Snapshot service works on a sync session - run it on this connection via run_sync
+    fingerprint = await db.run_sync(scanner_snapshot.get_fingerprint)
+    etag = scanner_snapshot.make_etag(fingerprint, gate_number, date)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    sync_time, stmt, _ = await build_entries_query(db, gate_number, date)
+    snapshot = await db.run_sync(
+        scanner_snapshot.get_snapshot, stmt, sync_time, gate_number, date, fingerprint
     )
 
+    headers["Content-Encoding"] = "gzip"
+    headers["ETag"] = snapshot["etag"]
+    return Response(content=snapshot["body"], media_type="application/json", headers=headers)
+
 
 @router.post("/checkin", response_model=dict)
-def create_checkin(
+async def create_checkin(
     checkin: CheckInCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: dict = Depends(verify_scanner_token)
 ):
     """
@@ -264,59 +527,150 @@ def create_checkin(
     Used when scanner has internet connectivity for immediate check-in.
     For offline mode, use /checkin/batch endpoint instead.
 
+    The first scan of an entry for a session is inserted into check_ins with
+    INSERT ... ON CONFLICT DO NOTHING; the unique (entry_id, session_type)
+    constraint makes this safe when two gates scan the same person at once.
+    Later scans are recorded as re-entries. A re-upload of the same scan
+    (same idempotency key or timestamp) is reported as a duplicate.
+
     Authentication: Requires valid scanner JWT token
     """
-    # Check for duplicate check-in
-    existing = db.query(CheckIn).filter(
-        CheckIn.entry_id == checkin.entry_id,
-        CheckIn.session_type == checkin.session_type
-    ).first()
+    source_error = checkin_source_error(checkin)
+    if source_error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=source_error)
 
-    if existing:
-        return {
-            "success": False,
-            "message": "Duplicate check-in - already recorded",
-            "check_in_time": existing.check_in_time.isoformat()
-        }
-
-    # Verify entry exists
-    entry = db.query(Entry).filter(Entry.id == checkin.entry_id).first()
+    # Verify entry exists (served from the in-memory index when warm)
+    entry = await db.run_sync(entry_index.get_by_id, checkin.entry_id)
     if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Entry ID {checkin.entry_id} not found"
         )
 
-    # Create check-in record
-    new_checkin = CheckIn(
-        entry_id=checkin.entry_id,
-        session_type=checkin.session_type,
-        gate_number=checkin.gate_number,
-        gate_location=checkin.gate_location,
-        check_in_time=checkin.check_in_time,
-        scanner_device_id=checkin.scanner_device_id,
-        scanner_operator=checkin.scanner_operator,
-        qr_data=checkin.qr_data
-    )
+    row = checkin_row(checkin)
 
-    db.add(new_checkin)
-    db.commit()
-    db.refresh(new_checkin)
+    # First entry: one round trip, no prior SELECT
+    inserted = await insert_checkin_rows(db, [row])
+    if inserted:
+        await db.commit()
+        live_stats.record(checkin.gate_number, checkin.session_type, checkin.check_in_time)
+        return {
+            "success": True,
+            "message": "Check-in recorded successfully",
+            "check_in_id": inserted[0].id,
+            "entry_id": checkin.entry_id,
+            "name": entry.name,
+            "check_in_time": checkin.check_in_time.isoformat()
+        }
+
+    # Already checked in for this session
+    first = (await db.execute(
+        select(CheckIn.id, CheckIn.check_in_time, CheckIn.idempotency_key).filter(
+            CheckIn.entry_id == checkin.entry_id,
+            CheckIn.session_type == checkin.session_type
+        )
+    )).first()
 
+    re_entry = []
+    if first and not is_same_scan(first.check_in_time, first.idempotency_key, checkin):
+        re_entry = await insert_re_entry_rows(db, [{**row, "check_in_id": first.id}])
+        await db.commit()
+
+    if not re_entry:
+        return {
+            "success": False,
+            "message": "Duplicate check-in - already recorded",
+            "check_in_time": first.check_in_time.isoformat() if first else None
+        }
+
+    live_stats.record(checkin.gate_number, checkin.session_type, checkin.check_in_time)
     return {
         "success": True,
-        "message": "Check-in recorded successfully",
-        "check_in_id": new_checkin.id,
-        "entry_id": new_checkin.entry_id,
+        "re_entry": True,
+        "message": "Re-entry recorded",
+        "check_in_id": first.id,
+        "re_entry_id": re_entry[0].id,
+        "entry_id": checkin.entry_id,
         "name": entry.name,
-        "check_in_time": new_checkin.check_in_time.isoformat()
+        "check_in_time": checkin.check_in_time.isoformat(),
+        "first_check_in_time": first.check_in_time.isoformat()
+    }
+
+
+def normalize_scan_time(check_in_time: datetime) -> datetime:
+    """Normalise a scan timestamp to naive UTC"""
+    if check_in_time.tzinfo is not None:
+        check_in_time = check_in_time.astimezone(timezone.utc).replace(tzinfo=None)
+    return check_in_time
+
+
+def is_same_scan(stored_time: Optional[datetime], stored_key: Optional[str], checkin_data: CheckInCreate) -> bool:
+    """
+    Check whether a stored row is this very scan uploaded again (not a new scan)
+
+    Matched on the idempotency key, otherwise on the timestamp. SQLite keeps
+    wall-clock time without the offset, so naive values are also compared as-is.
+    """
+    if checkin_data.idempotency_key and stored_key == checkin_data.idempotency_key:
+        return True
+    if stored_time is None:
+        return False
+    return (
+        normalize_scan_time(stored_time) == normalize_scan_time(checkin_data.check_in_time)
+        or stored_time.replace(tzinfo=None) == checkin_data.check_in_time.replace(tzinfo=None)
+    )
+
+
+def checkin_row(checkin_data: CheckInCreate) -> dict:
+    """Column values of an uploaded scan (shared by check_ins and re_entries)"""
+    return {
+        "entry_id": checkin_data.entry_id,
+        "session_type": checkin_data.session_type,
+        "gate_number": checkin_data.gate_number,
+        "gate_location": checkin_data.gate_location,
+        "check_in_time": checkin_data.check_in_time,
+        "scanner_device_id": checkin_data.scanner_device_id,
+        "scanner_operator": checkin_data.scanner_operator,
+        "qr_data": checkin_data.qr_data,
+        "idempotency_key": checkin_data.idempotency_key
     }
 
 
+async def insert_checkin_rows(db: AsyncSession, rows: List[dict]) -> list:
+    """
+    Insert first check-ins, skipping any that hit a unique constraint
+
+    A conflict on (entry_id, session_type) means the entry is already
+    checked in for that session; a conflict on the idempotency key means
+    the scan was already uploaded.
+
+    Returns:
+        Inserted rows as (id, entry_id, session_type)
+    """
+    stmt = dialect_insert(CheckIn).values(rows).on_conflict_do_nothing().returning(
+        CheckIn.id, CheckIn.entry_id, CheckIn.session_type
+    )
+    return (await db.execute(stmt)).all()
+
+
+async def insert_re_entry_rows(db: AsyncSession, rows: List[dict]) -> list:
+    """
+    Insert re-entry scans, skipping scans that are already recorded
+
+    Returns:
+        Inserted rows as (id, check_in_id, entry_id, session_type, check_in_time, idempotency_key)
+    """
+    stmt = dialect_insert(ReEntry).values(rows).on_conflict_do_nothing().returning(
+        ReEntry.id, ReEntry.check_in_id, ReEntry.entry_id, ReEntry.session_type,
+        ReEntry.check_in_time, ReEntry.idempotency_key
+    )
+    return (await db.execute(stmt)).all()
+
+
 @router.post("/checkin/batch", response_model=CheckInBatchResponse)
-def batch_checkin(
+async def batch_checkin(
     batch: CheckInBatch,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: dict = Depends(verify_scanner_token)
 ):
     """
@@ -325,88 +679,248 @@ def batch_checkin(
     Used when scanner comes back online to sync all pending check-ins
     from IndexedDB. Handles duplicates gracefully.
 
+    Set-based: one IN (...) query checks that all entries exist, then
+    INSERT ... ON CONFLICT DO NOTHING RETURNING writes the batch.
+    The earliest scan per (entry_id, session_type) is tried as the first
+    entry; rows the insert skips were already checked in and, together
+    with later scans in the batch, are matched against the stored first
+    check-in in one query and recorded as re-entries unless they are the
+    same scan uploaded again (duplicates).
+
+    Idempotency: scans carrying an `idempotency_key` that is already stored
+    are answered as duplicates (with the original check_in_id) before any
+    other work, so retrying a batch after a dropped connection is cheap.
+
+    Partial commits: rows are committed in chunks. If a chunk fails it is
+    retried row by row, so one bad row no longer rolls back the good ones.
+
     Authentication: Requires valid scanner JWT token
 
     Returns:
         - Total check-ins in batch
-        - Successfully uploaded count
+        - Successfully uploaded count (first entries and re-entries)
+        - Re-entry count
         - Duplicate count (already exists)
         - Error count
+        - Per check-in outcomes in batch order
     """
     total = len(batch.checkins)
-    uploaded = 0
-    duplicates = 0
-    errors = 0
+    results = [None] * total
     error_details = []
 
-    for checkin_data in batch.checkins:
-        try:
-            # Check for duplicate
-            existing = db.query(CheckIn).filter(
-                CheckIn.entry_id == checkin_data.entry_id,
-                CheckIn.session_type == checkin_data.session_type,
-                CheckIn.check_in_time == checkin_data.check_in_time
-            ).first()
-
-            if existing:
-                duplicates += 1
-                continue
+    def fail(index: int, message: str):
+        error_details.append(message)
+        results[index] = CheckInResult(
+            index=index, entry_id=batch.checkins[index].entry_id, status="error", error=message
+        )
 
-            # Verify entry exists
-            entry = db.query(Entry).filter(Entry.id == checkin_data.entry_id).first()
-            if not entry:
-                errors += 1
-                error_details.append(f"Entry ID {checkin_data.entry_id} not found")
+    def duplicate(index: int, check_in_id: Optional[int] = None):
+        results[index] = CheckInResult(
+            index=index, entry_id=batch.checkins[index].entry_id, status="duplicate", check_in_id=check_in_id
+        )
+
+    async def insert_in_chunks(indexes: List[int], insert_rows, to_row, on_inserted):
+        """Insert + commit per chunk; a failing chunk is retried row by row"""
+        for start in range(0, len(indexes), CHECKIN_BATCH_CHUNK_SIZE):
+            chunk = indexes[start:start + CHECKIN_BATCH_CHUNK_SIZE]
+            try:
+                inserted = await insert_rows(db, [to_row(i) for i in chunk])
+                await db.commit()
+                on_inserted(inserted, chunk)
+            except Exception:
+                await db.rollback()
+                for index in chunk:
+                    try:
+                        inserted = await insert_rows(db, [to_row(index)])
+                        await db.commit()
+                        on_inserted(inserted, [index])
+                    except Exception as e:
+                        await db.rollback()
+                        fail(index, f"Entry {batch.checkins[index].entry_id}: {str(e)}")
+
+    # Replayed scans: already stored under their idempotency key
+    keys = {c.idempotency_key for c in batch.checkins if c.idempotency_key}
+    known_keys = {}
+    if keys:
+        for key_column, id_column in (
+            (CheckIn.idempotency_key, CheckIn.id),
+            (ReEntry.idempotency_key, ReEntry.check_in_id)
+        ):
+            known_keys.update({
+                row.idempotency_key: row.id for row in await db.execute(
+                    select(id_column.label("id"), key_column.label("idempotency_key")).filter(key_column.in_(keys))
+                )
+            })
+
+    pending = []
+    for index, checkin_data in enumerate(batch.checkins):
+        source_error = checkin_source_error(checkin_data)
+        if source_error:
+            fail(index, f"Entry {checkin_data.entry_id}: {source_error}")
+        elif checkin_data.idempotency_key in known_keys:
+            duplicate(index, known_keys[checkin_data.idempotency_key])
+        else:
+            pending.append(index)
+
+    # 1 round trip: which entries exist?
+    entry_ids = {batch.checkins[i].entry_id for i in pending}
+    existing_entry_ids = set()
+    if entry_ids:
+        existing_entry_ids = set(await db.scalars(select(Entry.id).filter(Entry.id.in_(entry_ids))))
+
+    # Earliest scan per entry/session is the first-entry candidate; the rest
+    # are re-entries (or the same scan twice) and are classified afterwards
+    first_indexes = {}  # (entry_id, session_type) -> batch index
+    later = []
+    seen_keys = set()
+    for index in sorted(pending, key=lambda i: normalize_scan_time(batch.checkins[i].check_in_time)):
+        checkin_data = batch.checkins[index]
+        if checkin_data.entry_id not in existing_entry_ids:
+            fail(index, f"Entry ID {checkin_data.entry_id} not found")
+            continue
+
+        if checkin_data.idempotency_key:
+            if checkin_data.idempotency_key in seen_keys:
+                duplicate(index)
                 continue
+            seen_keys.add(checkin_data.idempotency_key)
+
+        pair = (checkin_data.entry_id, checkin_data.session_type)
+        if pair in first_indexes:
+            later.append(index)
+        else:
+            first_indexes[pair] = index
+
+    def record_first_entries(inserted: list, candidates: List[int]):
+        for row in inserted:
+            index = first_indexes.get((row.entry_id, row.session_type))
+            if index is not None:
+                results[index] = CheckInResult(
+                    index=index, entry_id=row.entry_id, status="created", check_in_id=row.id
+                )
+        # Not returned by the insert: already checked in
+        later.extend(index for index in candidates if results[index] is None)
+
+    await insert_in_chunks(
+        list(first_indexes.values()), insert_checkin_rows,
+        lambda i: checkin_row(batch.checkins[i]), record_first_entries
+    )
 
-            # Create check-in
-            new_checkin = CheckIn(
-                entry_id=checkin_data.entry_id,
-                session_type=checkin_data.session_type,
-                gate_number=checkin_data.gate_number,
-                gate_location=checkin_data.gate_location,
-                check_in_time=checkin_data.check_in_time,
-                scanner_device_id=checkin_data.scanner_device_id,
-                scanner_operator=checkin_data.scanner_operator,
-                qr_data=checkin_data.qr_data
+    # 1 round trip: stored first check-ins for everything left over
+    first_check_in_ids = {}  # batch index -> first check-in id
+    re_entry_indexes = []
+    if later:
+        pairs = {(batch.checkins[i].entry_id, batch.checkins[i].session_type) for i in later}
+        first_checkins = {
+            (row.entry_id, row.session_type): row for row in await db.execute(
+                select(
+                    CheckIn.id, CheckIn.entry_id, CheckIn.session_type,
+                    CheckIn.check_in_time, CheckIn.idempotency_key
+                ).filter(tuple_(CheckIn.entry_id, CheckIn.session_type).in_(pairs))
             )
+        }
 
-            db.add(new_checkin)
-            uploaded += 1
-
-        except Exception as e:
-            errors += 1
-            error_details.append(f"Entry {checkin_data.entry_id}: {str(e)}")
-
-    # Commit all successful check-ins
-    if uploaded > 0:
-        try:
-            db.commit()
-        except Exception as e:
-            db.rollback()
-            return CheckInBatchResponse(
-                success=False,
-                total=total,
-                uploaded=0,
-                duplicates=duplicates,
-                errors=total - duplicates,
-                error_details=[f"Database commit failed: {str(e)}"]
+        for index in later:
+            checkin_data = batch.checkins[index]
+            first = first_checkins.get((checkin_data.entry_id, checkin_data.session_type))
+            if first is None:
+                fail(index, f"Entry {checkin_data.entry_id}: first check-in for {checkin_data.session_type} was not recorded")
+            elif is_same_scan(first.check_in_time, first.idempotency_key, checkin_data):
+                duplicate(index, first.id)
+            else:
+                first_check_in_ids[index] = first.id
+                re_entry_indexes.append(index)
+
+    def record_re_entries(inserted: list, candidates: List[int]):
+        for row in inserted:
+            index = next(
+                (i for i in candidates
+                 if results[i] is None
+                 and (batch.checkins[i].entry_id, batch.checkins[i].session_type) == (row.entry_id, row.session_type)
+                 and is_same_scan(row.check_in_time, row.idempotency_key, batch.checkins[i])),
+                None
             )
+            if index is not None:
+                results[index] = CheckInResult(
+                    index=index, entry_id=row.entry_id, status="re_entry",
+                    check_in_id=row.check_in_id, re_entry_id=row.id
+                )
+        # Not returned by the insert: this re-entry was already recorded
+        for index in candidates:
+            if results[index] is None:
+                duplicate(index, first_check_in_ids[index])
+
+    await insert_in_chunks(
+        re_entry_indexes, insert_re_entry_rows,
+        lambda i: {**checkin_row(batch.checkins[i]), "check_in_id": first_check_in_ids[i]},
+        record_re_entries
+    )
+
+    for result in results:
+        if result.status in ("created", "re_entry"):
+            checkin_data = batch.checkins[result.index]
+            live_stats.record(checkin_data.gate_number, checkin_data.session_type, checkin_data.check_in_time)
+
+    re_entries = sum(1 for r in results if r.status == "re_entry")
+    uploaded = sum(1 for r in results if r.status == "created") + re_entries
+    duplicates = sum(1 for r in results if r.status == "duplicate")
+    errors = sum(1 for r in results if r.status == "error")
 
     return CheckInBatchResponse(
         success=True,
         total=total,
         uploaded=uploaded,
+        re_entries=re_entries,
         duplicates=duplicates,
         errors=errors,
-        error_details=error_details if error_details else None
+        error_details=error_details if error_details else None,
+        results=results
     )
 
 
+def parse_readable_qr(qr_data: str) -> Optional[tuple]:
+    """
+    Parse the human-readable pass QR format (see PassGenerator.generate_qr_data)
+
+    Mirrors parseQRData in the scanner PWA: the ID number (hyphens removed)
+    identifies the entry and the session line gives the pass type.
+
+    Returns:
+        (id_number, pass_type) or None if the text is not a pass QR code
+    """
+    if "SWAVLAMBAN 2025 ENTRY PASS" not in qr_data:
+        return None
+
+    id_number = ""
+    session = ""
+    for line in qr_data.splitlines():
+        if line.startswith("ID Number:"):
+            id_number = line.replace("ID Number:", "").strip().replace("-", "")
+        elif line.startswith("Session:"):
+            session = line.replace("Session:", "").strip()
+
+    if not id_number:
+        return None
+
+    pass_type = "unknown"
+    if "25 & 26" in session:
+        pass_type = "exhibitor_pass"
+    elif "Exhibition" in session and "25 Nov" in session:
+        pass_type = "exhibition_day1"
+    elif "Exhibition" in session and "26 Nov" in session:
+        pass_type = "exhibition_day2"
+    elif "interactive" in session.lower():
+        pass_type = "interactive_sessions"
+    elif "plenary" in session.lower():
+        pass_type = "plenary"
+
+    return id_number, pass_type
+
+
 @router.post("/verify", response_model=QRVerifyResponse)
-def verify_qr_code(
+async def verify_qr_code(
     request: QRVerifyRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: dict = Depends(verify_scanner_token)
 ):
     """
@@ -415,57 +929,63 @@ def verify_qr_code(
     Frontend performs validation locally using downloaded entries.
     This endpoint is optional for additional server-side verification.
 
+    Accepts both the human-readable pass QR text and the legacy
+    "entryId:passType:signature" format. Lookups are served from the
+    in-memory entry index, so a warm verify needs no database round trip.
+
     Authentication: Requires valid scanner JWT token
     """
     try:
-        # Parse QR data format: "entryId:passType:signature"
-        parts = request.qr_data.split(":")
-        if len(parts) != 3:
-            return QRVerifyResponse(
-                valid=False,
-                allowed=False,
-                message="Invalid QR code format",
-                reason="Format should be: entryId:passType:signature"
-            )
+        readable = parse_readable_qr(request.qr_data)
 
-        entry_id_str, pass_type, signature = parts
-        entry_id = int(entry_id_str)
+        if readable:
+            id_number, pass_type = readable
+            entry = await db.run_sync(entry_index.get_by_id_number, id_number)
+            if not entry:
+                return QRVerifyResponse(
+                    valid=False,
+                    allowed=False,
+                    message="Entry not found",
+                    reason="No entry registered with this ID number"
+                )
+            entry_id = entry.entry_id
+        else:
+            # Parse QR data format: "entryId:passType:signature"
+            parts = request.qr_data.split(":")
+            if len(parts) != 3:
+                return QRVerifyResponse(
+                    valid=False,
+                    allowed=False,
+                    message="Invalid QR code format",
+                    reason="Format should be: entryId:passType:signature"
+                )
 
-        # Find entry
-        entry = db.query(Entry).filter(Entry.id == entry_id).first()
+            entry_id_str, pass_type, signature = parts
+            entry_id = int(entry_id_str)
 
-        if not entry:
-            return QRVerifyResponse(
-                valid=False,
-                allowed=False,
-                message="Entry not found",
-                reason=f"Entry ID {entry_id} does not exist"
-            )
+            # Find entry
+            entry = await db.run_sync(entry_index.get_by_id, entry_id)
 
-        # Verify signature
-        if entry.qr_signature != signature:
-            return QRVerifyResponse(
-                valid=False,
-                allowed=False,
-                entry_id=entry_id,
-                message="Invalid QR signature",
-                reason="QR code signature verification failed"
-            )
+            if not entry:
+                return QRVerifyResponse(
+                    valid=False,
+                    allowed=False,
+                    message="Entry not found",
+                    reason=f"Entry ID {entry_id} does not exist"
+                )
+
+            # Verify signature
+            if entry.qr_signature != signature:
+                return QRVerifyResponse(
+                    valid=False,
+                    allowed=False,
+                    entry_id=entry_id,
+                    message="Invalid QR signature",
+                    reason="QR code signature verification failed"
+                )
 
         # Verify pass type allocation
-        pass_allocated = False
-        if pass_type == "exhibition_day1":
-            pass_allocated = entry.exhibition_day1
-        elif pass_type == "exhibition_day2":
-            pass_allocated = entry.exhibition_day2
-        elif pass_type == "interactive_sessions":
-            pass_allocated = entry.interactive_sessions
-        elif pass_type == "plenary":
-            pass_allocated = entry.plenary
-        elif pass_type == "exhibitor_pass":
-            pass_allocated = entry.is_exhibitor
-
-        if not pass_allocated:
+        if not entry.has_pass(pass_type):
             return QRVerifyResponse(
                 valid=True,
                 allowed=False,
@@ -519,10 +1039,20 @@ def verify_qr_code(
         )
 
 
+def epoch_bucket(column, seconds: int):
+    """SQL expression putting a timestamp column into fixed-width epoch buckets"""
+    if engine.dialect.name == "postgresql":
+        return func.floor(func.extract("epoch", column) / seconds)
+    # SQLite
+    return cast(func.strftime("%s", column), Integer) / seconds
+
+
 @router.get("/stats", response_model=ScannerStats)
-def get_scanner_stats(
+async def get_scanner_stats(
     gate_number: Optional[str] = None,
-    db: Session = Depends(get_db),
+    interval_minutes: int = Query(5, ge=1, le=60),
+    window_minutes: int = Query(120, ge=1, le=2880),
+    db: AsyncSession = Depends(get_async_db),
     token: dict = Depends(verify_scanner_token)
 ):
     """
@@ -531,38 +1061,86 @@ def get_scanner_stats(
     Returns statistics for a specific gate or all gates.
     Useful for monitoring and reporting.
 
+    Scans are first entries (check_ins) plus re-entries (re_entries), so
+    total_scans counts every accepted scan, as the live dashboard does;
+    unique_entries counts attendees and re_entries the repeat scans.
+
+    All numbers are computed in the database with COUNT, COUNT(DISTINCT)
+    and MAX aggregates, so no check-in rows are loaded into Python:
+    - totals for the gate
+    - a breakdown per session type
+    - scans per `interval_minutes` bucket over the last `window_minutes`
+
     Authentication: Requires valid scanner JWT token
     """
     # Use gate from token if not specified
     if not gate_number:
         gate_number = token.get("gate", "Unknown")
 
-    # Query check-ins for this gate
-    query = db.query(CheckIn)
-
-    if gate_number != "all":
-        query = query.filter(CheckIn.gate_number == gate_number)
-
-    check_ins = query.all()
-
-    # Calculate statistics
-    total_scans = len(check_ins)
-    successful_scans = total_scans  # All recorded check-ins are successful
-    rejected_scans = 0  # Rejected scans are not recorded in DB
-
-    # Count unique entries
-    unique_entries = len(set(checkin.entry_id for checkin in check_ins))
+    def scans(*columns, since: Optional[datetime] = None):
+        """Every scan at the gate: first entries (check_ins) and re-entries, as one subquery"""
+        branches = []
+        for model in (CheckIn, ReEntry):
+            branch = select(*[getattr(model, column) for column in columns])
+            if gate_number != "all":
+                branch = branch.filter(model.gate_number == gate_number)
+            if since is not None:
+                branch = branch.filter(model.check_in_time >= since)
+            branches.append(branch)
+        return union_all(*branches).subquery("scans")
+
+    # Totals
+    all_scans = scans("entry_id", "session_type", "check_in_time")
+    total_scans, unique_entries, last_scan_time = (await db.execute(select(
+        func.count(),
+        func.count(func.distinct(all_scans.c.entry_id)),
+        func.max(all_scans.c.check_in_time)
+    ))).one()
+    re_entries = await db.scalar(
+        select(func.count(ReEntry.id)).filter(*([] if gate_number == "all" else [ReEntry.gate_number == gate_number]))
+    )
 
-    # Get last scan time
-    last_scan_time = None
-    if check_ins:
-        last_scan_time = max(checkin.check_in_time for checkin in check_ins)
+    # Per session type
+    sessions = [
+        SessionStats(
+            session_type=row.session_type,
+            total_scans=row.total_scans,
+            unique_entries=row.unique_entries,
+            last_scan_time=row.last_scan_time
+        )
+        for row in await db.execute(select(
+            all_scans.c.session_type,
+            func.count().label("total_scans"),
+            func.count(func.distinct(all_scans.c.entry_id)).label("unique_entries"),
+            func.max(all_scans.c.check_in_time).label("last_scan_time")
+        ).group_by(all_scans.c.session_type).order_by(all_scans.c.session_type))
+    ]
+
+    # Scans per interval over the recent window
+    seconds = interval_minutes * 60
+    window_start = datetime.utcnow() - timedelta(minutes=window_minutes)
+    recent_scans = scans("check_in_time", since=window_start)
+    bucket = epoch_bucket(recent_scans.c.check_in_time, seconds).label("bucket")
+    intervals = [
+        IntervalStats(
+            interval_start=datetime.fromtimestamp(int(row.bucket) * seconds, tz=timezone.utc),
+            scans=row.scans
+        )
+        for row in await db.execute(
+            select(bucket, func.count().label("scans")).group_by(bucket).order_by(bucket)
+        )
+        if row.bucket is not None
+    ]
 
     return ScannerStats(
         gate_number=gate_number,
         total_scans=total_scans,
-        successful_scans=successful_scans,
-        rejected_scans=rejected_scans,
+        successful_scans=total_scans,  # All recorded check-ins are successful
+        rejected_scans=0,  # Rejected scans are not recorded in DB
         unique_entries=unique_entries,
-        last_scan_time=last_scan_time
+        re_entries=re_entries,
+        last_scan_time=last_scan_time,
+        sessions=sessions,
+        interval_minutes=interval_minutes,
+        intervals=intervals
     )
@@ -29,6 +29,9 @@ class Settings(BaseSettings):
     DB_NAME: str = "swavlamban2025"
     DB_USER: str = "postgres"
     DB_PASSWORD: str = "postgres"
+    DB_POOL_PROFILE: str = "api"  # api | streamlit | batch | pgbouncer (see core/database.py)
+    DB_TRANSACTION_POOLER: bool = False  # Force transaction-pooler-safe settings (auto on port 6543)
+    DB_POOL_PRE_PING: bool = False  # Ping on every checkout (pool_recycle is used instead)
 
     # Redis
     REDIS_HOST: str = "localhost"
@@ -64,6 +67,31 @@ class Settings(BaseSettings):
     NIC_EMAIL_PASSWORD: str = ""  # Your NIC email password (or app-specific password)
     USE_NIC_SMTP: bool = True  # Set to True to use NIC SMTP (Government Email)
 
+    # Email - Bulk dispatch (see services/email_dispatcher.py)
+    EMAIL_MAX_IN_FLIGHT: int = 0  # Concurrent sends (0 = provider default)
+    EMAIL_RATE_PER_SECOND: float = 0  # Sustained sends per second (0 = provider default)
+    EMAIL_MAX_RETRIES: int = 3  # Retries of a throttled send, with exponential backoff
+    EMAIL_BATCH_SIZE: int = 0  # Messages per API call on providers with a batch API (0 = provider maximum, 1 = off)
+    EMAIL_FAILOVER: bool = True  # Route sends around failing, throttled or out-of-quota providers to the next configured one
+    # Daily send caps per provider (0 = no cap - rely on the provider's 429/quota replies); set to your plan's limit
+    EMAIL_DAILY_QUOTA_BREVO: int = 0
+    EMAIL_DAILY_QUOTA_MAILJET: int = 0
+    EMAIL_DAILY_QUOTA_GMAIL: int = 0
+    EMAIL_DAILY_QUOTA_NIC: int = 0
+    EMAIL_DAILY_QUOTA_MAILBLUSTER: int = 0
+
+    # Email - SMTP connection pool (NIC / Gmail, see services/smtp_pool.py)
+    SMTP_POOL_SIZE: int = 0  # Logged-in connections kept per provider (0 = provider's max in flight)
+    SMTP_KEEPALIVE_SECONDS: int = 60  # NOOP idle connections this often
+    SMTP_MAX_IDLE_SECONDS: int = 300  # Close connections unused this long
+
+    # Email - Outbound queue (see services/email_queue.py, run email_worker.py)
+    EMAIL_QUEUE_POLL_SECONDS: int = 5  # Worker sleep when no job is due
+    EMAIL_QUEUE_LEASE_SECONDS: int = 600  # A job 'sending' not renewed for this long is requeued (worker died)
+    EMAIL_QUEUE_MAX_ATTEMPTS: int = 5  # Sends per job before it is marked failed
+    EMAIL_QUEUE_RETRY_SECONDS: int = 60  # Delay before retrying a failed send, doubled each attempt
+    EMAIL_QUEUE_IN_APP_WORKER: bool = False  # Also drain the queue inside the Streamlit app (no email_worker.py, e.g. Streamlit Cloud)
+
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
         "http://localhost:8501",
@@ -77,6 +105,10 @@ class Settings(BaseSettings):
     # Pass Generation
     PASS_OUTPUT_DIR: str = "../generated_passes"
     IMAGE_ASSETS_DIR: str = "../images"
+    PASS_RENDER_WORKERS: int = 0  # Processes for bulk pass rendering (0 = one per CPU core)
+    PASS_ENCODING_PROFILE: str = "png"  # png | png-optimized | png-palette | jpeg | webp (see services/pass_generator.py)
+    PASS_IMAGE_QUALITY: int = 0  # JPEG/WebP quality override (0 = profile default)
+    STATIC_ATTACHMENT_OPTIMIZE: bool = False  # Re-encode cached static PNGs (invitations) losslessly if smaller
 
     # GitHub (Optional)
     GITHUB_PAT: str = ""
@@ -123,6 +155,10 @@ try:
             settings.GMAIL_APP_PASSWORD = st.secrets.get('GMAIL_APP_PASSWORD', '')
             print(f"🔑 Loaded Gmail SMTP from secrets: {settings.GMAIL_ADDRESS}")
 
+        # Email queue - drain inside the app where email_worker.py cannot run
+        if 'EMAIL_QUEUE_IN_APP_WORKER' in st.secrets:
+            settings.EMAIL_QUEUE_IN_APP_WORKER = bool(st.secrets.get('EMAIL_QUEUE_IN_APP_WORKER', False))
+
         # Database settings (Supabase)
         if 'DB_HOST' in st.secrets:
             settings.DB_HOST = st.secrets.get('DB_HOST', 'localhost')
@@ -130,6 +166,7 @@ try:
             settings.DB_NAME = st.secrets.get('DB_NAME', 'swavlamban2025')
             settings.DB_USER = st.secrets.get('DB_USER', 'postgres')
             settings.DB_PASSWORD = st.secrets.get('DB_PASSWORD', '')
+            settings.DB_POOL_PROFILE = st.secrets.get('DB_POOL_PROFILE', 'streamlit')
             print(f"🔑 Loaded database config from secrets: {settings.DB_HOST}")
 
         print("✅ Successfully loaded configuration from Streamlit secrets")
@@ -1,11 +1,15 @@
 """
 Database connection and session management
 Uses SQLAlchemy with PostgreSQL
+Sync sessions for Streamlit/scripts, async sessions for the FastAPI scanner API
 """
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.pool import NullPool
+from typing import AsyncGenerator, Generator
+from uuid import uuid4
 from .config import settings
 
 # Create SQLAlchemy engine
@@ -26,21 +30,96 @@ else:
     SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
     print(f"🗄️  Using SQLite database: {DB_PATH}")
 
+# Connection pool profiles (selected with DB_POOL_PROFILE)
+# - api: FastAPI workers - room for scanner sync storms
+# - streamlit: admin app - a few connections shared by all reruns
+# - batch: one-off scripts (imports, bulk email) - a single connection
+# - pgbouncer: no client-side pool, every checkout goes to the external
+#   pooler (Supabase transaction pooler / pgbouncer) and is returned at once
+# LIFO keeps the busy connections hot and lets surplus ones sit idle until
+# they are recycled; recycling on a timer replaces a pre-ping round trip
+# on every checkout (the pooler drops idle client connections after a while)
+# pool_size/max_overflow are the budget for the whole process: async_share of
+# it goes to the async engine, the rest to the sync engine (see get_pool_kwargs)
+POOL_PROFILES = {
+    "api": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_timeout": 10,
+        "pool_recycle": 300,
+        "pool_use_lifo": True,
+        "async_share": 0.8  # Scanner endpoints are async; sync serves auth and startup
+    },
+    "streamlit": {
+        "pool_size": 3,
+        "max_overflow": 5,
+        "pool_timeout": 30,
+        "pool_recycle": 300,
+        "pool_use_lifo": True
+    },
+    "batch": {
+        "pool_size": 1,
+        "max_overflow": 1,
+        "pool_timeout": 60,
+        "pool_recycle": 600
+    },
+    "pgbouncer": {
+        "poolclass": NullPool
+    }
+}
+
+
+def get_pool_kwargs(profile: str, for_async: bool = False) -> dict:
+    """
+    Engine pool arguments for a profile (unknown names fall back to 'api')
+
+    The sync and async engines each get their share of the profile's
+    pool_size/max_overflow, so together they stay within the budget
+    (each engine keeps at least one pooled connection).
+    """
+    if profile not in POOL_PROFILES:
+        print(f"⚠️ Unknown DB_POOL_PROFILE '{profile}', using 'api'")
+        profile = "api"
+    kwargs = dict(POOL_PROFILES[profile])
+    share = kwargs.pop("async_share", 0.0)
+    if not for_async:
+        share = 1 - share
+    if "pool_size" in kwargs:
+        kwargs["pool_size"] = max(1, round(kwargs["pool_size"] * share))
+        kwargs["max_overflow"] = round(kwargs["max_overflow"] * share)
+    if settings.DB_POOL_PRE_PING:
+        kwargs["pool_pre_ping"] = True
+    return kwargs
+
+
+# Transaction pooling (Supabase port 6543 / pgbouncer): a server connection is
+# only ours for one transaction, so server-side prepared statements cannot be reused
+use_transaction_pooler = (
+    settings.DB_TRANSACTION_POOLER
+    or settings.DB_PORT == 6543
+    or settings.DB_POOL_PROFILE == "pgbouncer"
+)
+
 # Configure engine with appropriate settings
 if "sqlite" in SQLALCHEMY_DATABASE_URL:
     # SQLite requires check_same_thread=False for multi-threaded apps
     connect_args = {"check_same_thread": False}
     engine_kwargs = {}
 else:
-    # PostgreSQL (Supabase) requires SSL and specific pooler settings
-    connect_args = {"sslmode": "require"}
-    # Disable prepared statements for Supabase transaction pooler compatibility
-    # Transaction pooler (port 6543) does not support prepared statements
-    engine_kwargs = {
-        "pool_pre_ping": True,  # Test connections before using
-        "pool_size": 5,  # Number of connections to keep open
-        "max_overflow": 10  # Max additional connections
+    # PostgreSQL (Supabase) requires SSL; TCP keepalives let dead connections
+    # be noticed without pinging on every checkout
+    # psycopg2 never creates server-side prepared statements, so the sync
+    # engine is already safe behind the transaction pooler
+    connect_args = {
+        "sslmode": "require",
+        "keepalives": 1,
+        "keepalives_idle": 30,
+        "keepalives_interval": 10,
+        "keepalives_count": 3
     }
+    engine_kwargs = get_pool_kwargs(settings.DB_POOL_PROFILE)
+    print(f"🔌 Database pool profile: {settings.DB_POOL_PROFILE}"
+          f"{' (transaction pooler)' if use_transaction_pooler else ''}")
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
@@ -52,6 +131,33 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg for PostgreSQL, aiosqlite for SQLite)
+# Created on first use so the Streamlit app, which only uses the sync engine,
+# does not need the async drivers installed
+if "sqlite" in SQLALCHEMY_DATABASE_URL:
+    ASYNC_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    async_connect_args = {}
+else:
+    ASYNC_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+    # asyncpg takes `ssl` instead of libpq's `sslmode`
+    async_connect_args = {"ssl": "require"}
+    if use_transaction_pooler:
+        # asyncpg prepares every statement: turn off both statement caches and
+        # give each prepared statement a unique name, so a statement prepared on
+        # one pooled server connection is never looked up on another
+        ASYNC_DATABASE_URL += "?prepared_statement_cache_size=0"
+        async_connect_args.update({
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__"
+        })
+
+_async_engine = None
+
+# Async session factory - objects stay usable after commit (no implicit lazy refresh)
+AsyncSessionLocal = async_sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, class_=AsyncSession
+)
+
 # Create declarative base for models
 Base = declarative_base()
 
@@ -73,6 +179,61 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_async_engine():
+    """Return the async engine, creating it (and binding AsyncSessionLocal) on first call"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            connect_args=async_connect_args,
+            echo=settings.DEBUG,
+            **get_pool_kwargs(settings.DB_POOL_PROFILE, for_async=True) if use_postgresql else {}
+        )
+        AsyncSessionLocal.configure(bind=_async_engine)
+    return _async_engine
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get an async database session
+    Waiting on the database does not hold a threadpool worker
+
+    Usage:
+        @app.get("/users/")
+        async def read_users(db: AsyncSession = Depends(get_async_db)):
+            return (await db.scalars(select(User))).all()
+    """
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections (application shutdown)"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+def dialect_insert(table):
+    """
+    Dialect-specific INSERT construct supporting ON CONFLICT and RETURNING
+
+    Both PostgreSQL and SQLite (3.35+) support
+    `insert(table).on_conflict_do_nothing(...).returning(...)`.
+
+    Args:
+        table: Table or mapped model class
+
+    Returns:
+        PostgreSQL or SQLite Insert object
+    """
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
 def init_db() -> None:
     """
     Initialize database - create all tables
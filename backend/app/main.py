@@ -6,9 +6,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from .core.config import settings
-from .core.database import init_db
+from .core.database import init_db, SessionLocal, dispose_async_engine
+from .services.entry_index import entry_index
+from .services.live_stats import live_stats
 from .api.auth import router as auth_router
 from .api.scanner import router as scanner_router
+from .api.live import router as live_router
 
 # Create FastAPI app
 app = FastAPI(
@@ -25,18 +28,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # Scanner snapshot revalidation
 )
 
 # Include routers
 app.include_router(auth_router, prefix=settings.API_V1_PREFIX)
 app.include_router(scanner_router, prefix=settings.API_V1_PREFIX)
+app.include_router(live_router, prefix=settings.API_V1_PREFIX)
 
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on startup"""
+    """Initialize database tables, warm the QR verification index and seed live counters"""
     init_db()
 
+    db = SessionLocal()
+    try:
+        entry_index.warm(db)
+    except Exception as e:
+        # Index is read-through - verification still works, just slower at first
+        print(f"⚠️ Could not warm entry lookup index: {e}")
+
+    try:
+        live_stats.seed(db)
+    except Exception as e:
+        print(f"⚠️ Could not seed live gate counters: {e}")
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled async database connections"""
+    await dispose_async_engine()
+
 
 @app.get("/")
 async def root():
@@ -4,7 +4,10 @@ Database models for Swavlamban 2025 Registration System
 from .user import User
 from .entry import Entry
 from .checkin import CheckIn
+from .re_entry import ReEntry
 from .scanner_device import ScannerDevice
 from .audit_log import AuditLog
+from .entry_tombstone import EntryTombstone
+from .email_queue_job import EmailQueueJob
 
-__all__ = ["User", "Entry", "CheckIn", "ScannerDevice", "AuditLog"]
+__all__ = ["User", "Entry", "CheckIn", "ReEntry", "ScannerDevice", "AuditLog", "EntryTombstone", "EmailQueueJob"]
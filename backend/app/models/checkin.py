@@ -1,7 +1,7 @@
 """
 CheckIn model - Gate entry records
 """
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
@@ -9,7 +9,7 @@ from ..core.database import Base
 
 class CheckIn(Base):
     """
-    Check-in record when attendee scans QR at gate
+    Check-in record when attendee scans QR at gate (first entry per session)
     
     Records:
     - Which session/gate
@@ -18,6 +18,13 @@ class CheckIn(Base):
     - Verification status
     """
     __tablename__ = "check_ins"
+    __table_args__ = (
+        # First entry only - later scans go to re_entries. Enforced by the
+        # database so concurrent scanners cannot both record a first check-in
+        UniqueConstraint("entry_id", "session_type", name="uq_check_ins_entry_session"),
+        # Gate stats: WHERE gate_number = ? [AND check_in_time >= ?]
+        Index("ix_check_ins_gate_time", "gate_number", "check_in_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     entry_id = Column(Integer, ForeignKey("entries.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -38,11 +45,17 @@ class CheckIn(Base):
     scanner_device_id = Column(String(100), nullable=True)
     scanner_operator = Column(String(100), nullable=True)
     
+    qr_data = Column(String(1000), nullable=True)  # Raw QR code data as scanned
+
+    # Client-generated per-scan key - retried uploads of the same scan are no-ops
+    idempotency_key = Column(String(64), nullable=True, unique=True, index=True)
+
     verification_status = Column(String(50), default="verified")  # 'verified', 'manual_override', 'flagged'
     notes = Column(String(1000), nullable=True)  # Any special notes
     
     # Relationships
     entry = relationship("Entry", back_populates="check_ins")
+    re_entries = relationship("ReEntry", back_populates="check_in", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<CheckIn(id={self.id}, entry_id={self.entry_id}, session='{self.session_type}', time='{self.check_in_time}')>"
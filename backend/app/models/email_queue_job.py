@@ -0,0 +1,59 @@
+"""
+EmailQueueJob model - Durable outbound pass email queue
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class EmailQueueJob(Base):
+    """
+    One pass email waiting for (or sent by) the email worker
+
+    The Streamlit app enqueues jobs and polls their state; email_worker.py (or
+    the app itself with EMAIL_QUEUE_IN_APP_WORKER) claims pending jobs, renders
+    the passes and sends them. State lives in
+    the database, so a browser refresh or app restart neither loses nor
+    repeats work.
+
+    States: 'pending' -> 'sending' -> 'sent' | 'failed' (or 'cancelled' while pending)
+    """
+    __tablename__ = "email_queue"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    entry_id = Column(Integer, ForeignKey("entries.id", ondelete="CASCADE"), nullable=False)
+
+    kind = Column(String(30), nullable=False)  # 'pass' (visitor template), 'exhibitor_pass' (exhibitor template)
+    passes = Column(String(200), nullable=True)  # Comma-separated pass flags to send (admin choice), NULL = all allocated
+    batch_id = Column(String(36), nullable=False, index=True)  # One bulk send from the UI
+    requested_by = Column(String(100), nullable=False)  # Username that queued it
+
+    state = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)  # Sends started (claims)
+    last_error = Column(String(1000), nullable=True)
+    run_after = Column(DateTime(timezone=True), server_default=func.now())  # Retry backoff
+
+    # Worker holding a 'sending' job; a lease older than EMAIL_QUEUE_LEASE_SECONDS is requeued
+    locked_by = Column(String(100), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # At most one queued or in-flight email per entry and kind, enforced by the
+        # database - double clicks, two tabs and reruns cannot queue a second one
+        Index(
+            "uq_email_queue_active_entry",
+            entry_id, kind,
+            unique=True,
+            postgresql_where=state.in_(("pending", "sending")),
+            sqlite_where=state.in_(("pending", "sending"))
+        ),
+        # Worker claim: WHERE state = 'pending' AND run_after <= now ORDER BY id
+        Index("ix_email_queue_state_run_after", state, run_after),
+    )
+
+    def __repr__(self):
+        return f"<EmailQueueJob(id={self.id}, entry_id={self.entry_id}, kind='{self.kind}', state='{self.state}')>"
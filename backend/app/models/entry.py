@@ -1,7 +1,7 @@
 """
 Entry model - Attendee registrations
 """
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
@@ -45,9 +45,40 @@ class Entry(Base):
     pass_generated_exhibition_day2 = Column(Boolean, default=False)
     pass_generated_interactive_sessions = Column(Boolean, default=False)
     pass_generated_plenary = Column(Boolean, default=False)
+
+    # Partial index for "entries of this user with at least one generated pass"
+    # (Streamlit dashboard). SQLite only uses a partial index when the query's
+    # WHERE contains the predicate's terms literally: SQLAlchemy renders
+    # `== True` as the constant `= 1` (not a bound parameter) in both, so keep
+    # the dashboard query written exactly like this predicate. The flag columns
+    # make the index covering; without them SQLite treats it as no cheaper than
+    # ix_entries_username and picks either one depending on creation order.
+    # check_query_indexes.py verifies the plan.
+    __table_args__ = (
+        Index(
+            "ix_entries_username_pass_generated",
+            username,
+            pass_generated_exhibition_day1,
+            pass_generated_exhibition_day2,
+            pass_generated_interactive_sessions,
+            pass_generated_plenary,
+            postgresql_where=(
+                (pass_generated_exhibition_day1 == True) |
+                (pass_generated_exhibition_day2 == True) |
+                (pass_generated_interactive_sessions == True) |
+                (pass_generated_plenary == True)
+            ),
+            sqlite_where=(
+                (pass_generated_exhibition_day1 == True) |
+                (pass_generated_exhibition_day2 == True) |
+                (pass_generated_interactive_sessions == True) |
+                (pass_generated_plenary == True)
+            )
+        ),
+    )
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)  # Delta sync cursor
     
     # Relationships
     user = relationship("User", back_populates="entries")
@@ -56,6 +87,21 @@ class Entry(Base):
     def __repr__(self):
         return f"<Entry(id={self.id}, name='{self.name}', organization='{self.user.organization if self.user else 'N/A'}')>"
     
+    @property
+    def organization(self) -> str:
+        """Organization of the user who registered this entry"""
+        return self.user.organization if self.user else ""
+
+    @property
+    def qr_signature(self) -> str:
+        """
+        Value scanners match a pass QR code against
+
+        QR codes print the ID number split into hyphenated groups; scanners
+        strip the hyphens, so the signature is the ID number without them.
+        """
+        return self.id_number.replace("-", "") if self.id_number else ""
+
     @property
     def is_exhibitor(self) -> bool:
         """Check if this is an exhibitor pass (from bulk upload)"""
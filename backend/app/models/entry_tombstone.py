@@ -0,0 +1,32 @@
+"""
+EntryTombstone model - Deletion markers for scanner delta sync
+"""
+from sqlalchemy import Column, Integer, DateTime, event, insert
+from sqlalchemy.sql import func
+from ..core.database import Base
+from .entry import Entry
+
+
+class EntryTombstone(Base):
+    """
+    Record of a deleted entry
+
+    Scanners that sync with a `since` cursor only receive changed rows,
+    so deletions must be remembered separately to be removed from IndexedDB.
+    """
+    __tablename__ = "entry_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    entry_id = Column(Integer, nullable=False, index=True)  # No FK - the entry is gone
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<EntryTombstone(entry_id={self.entry_id}, deleted_at='{self.deleted_at}')>"
+
+
+@event.listens_for(Entry, "after_delete")
+def _record_entry_tombstone(mapper, connection, target):
+    """Write a tombstone in the same transaction whenever an Entry is deleted via the ORM"""
+    connection.execute(
+        insert(EntryTombstone.__table__).values(entry_id=target.id)
+    )
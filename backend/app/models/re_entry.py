@@ -0,0 +1,47 @@
+"""
+ReEntry model - Subsequent gate scans after an attendee's first check-in
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class ReEntry(Base):
+    """
+    A scan of an entry for a session it is already checked in to
+
+    check_ins keeps exactly one row per (entry_id, session_type) - the first
+    entry. Every later scan (leaving and coming back, a second gate) is
+    recorded here and points at that first check-in.
+    """
+    __tablename__ = "re_entries"
+    __table_args__ = (
+        # Same physical scan uploaded twice is stored once
+        UniqueConstraint("entry_id", "session_type", "check_in_time", name="uq_re_entries_entry_session_time"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    check_in_id = Column(Integer, ForeignKey("check_ins.id", ondelete="CASCADE"), nullable=False, index=True)
+    entry_id = Column(Integer, ForeignKey("entries.id", ondelete="CASCADE"), nullable=False, index=True)
+    session_type = Column(String(50), nullable=False)
+
+    check_in_time = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Gate / scanner information (same as check_ins)
+    gate_number = Column(String(50), nullable=True)
+    gate_location = Column(String(255), nullable=True)
+    scanner_device_id = Column(String(100), nullable=True)
+    scanner_operator = Column(String(100), nullable=True)
+    qr_data = Column(String(1000), nullable=True)
+
+    # Client-generated per-scan key - retried uploads of the same scan are no-ops
+    idempotency_key = Column(String(64), nullable=True, unique=True, index=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    check_in = relationship("CheckIn", back_populates="re_entries")
+
+    def __repr__(self):
+        return f"<ReEntry(id={self.id}, entry_id={self.entry_id}, session='{self.session_type}', time='{self.check_in_time}')>"
@@ -86,8 +86,10 @@ class EntriesDownloadResponse(BaseModel):
     """Response for entries download"""
     success: bool
     count: int
-    last_updated: datetime
+    last_updated: datetime = Field(..., description="Sync cursor - send back as `since` on the next download")
+    full_sync: bool = Field(True, description="True if entries is the complete list, False if it is a delta")
     entries: List[EntryDownload]
+    deleted_entry_ids: List[int] = Field(default_factory=list, description="Entries deleted since the cursor (delta only)")
 
     class Config:
         json_schema_extra = {
@@ -95,6 +97,7 @@ class EntriesDownloadResponse(BaseModel):
                 "success": True,
                 "count": 250,
                 "last_updated": "2025-11-25T10:00:00",
+                "full_sync": True,
                 "entries": [
                     {
                         "entry_id": 1,
@@ -111,7 +114,8 @@ class EntriesDownloadResponse(BaseModel):
                         "plenary": False,
                         "is_exhibitor": False
                     }
-                ]
+                ],
+                "deleted_entry_ids": []
             }
         }
 
@@ -126,6 +130,9 @@ class CheckInCreate(BaseModel):
     scanner_device_id: str = Field(..., description="Scanner device ID")
     scanner_operator: str = Field(..., description="Scanner operator username")
     qr_data: Optional[str] = Field(None, description="Raw QR code data")
+    idempotency_key: Optional[str] = Field(
+        None, max_length=64, description="Client-generated unique key per scan (e.g. UUID) - makes retries safe"
+    )
 
     class Config:
         json_schema_extra = {
@@ -137,7 +144,8 @@ class CheckInCreate(BaseModel):
                 "check_in_time": "2025-11-25T11:30:00",
                 "scanner_device_id": "device-abc123",
                 "scanner_operator": "scanner1",
-                "qr_data": "1:exhibition_day1:abc123def456"
+                "qr_data": "1:exhibition_day1:abc123def456",
+                "idempotency_key": "0f8fad5b-d9cb-469f-a165-70867728950e"
             }
         }
 
@@ -164,14 +172,26 @@ class CheckInBatch(BaseModel):
         }
 
 
+class CheckInResult(BaseModel):
+    """Outcome of one check-in in a batch upload"""
+    index: int = Field(..., description="Position of the check-in in the uploaded batch")
+    entry_id: int
+    status: str = Field(..., description="created, re_entry, duplicate or error")
+    check_in_id: Optional[int] = Field(None, description="ID of the (first) check-in for this entry and session")
+    re_entry_id: Optional[int] = Field(None, description="ID of the created re-entry")
+    error: Optional[str] = None
+
+
 class CheckInBatchResponse(BaseModel):
     """Batch check-in upload response"""
     success: bool
     total: int = Field(..., description="Total check-ins in batch")
-    uploaded: int = Field(..., description="Successfully uploaded")
+    uploaded: int = Field(..., description="Successfully uploaded (first entries and re-entries)")
+    re_entries: int = Field(0, description="Scans recorded as re-entries")
     duplicates: int = Field(..., description="Duplicate check-ins skipped")
     errors: int = Field(..., description="Check-ins with errors")
     error_details: Optional[List[str]] = Field(None, description="Error messages")
+    results: List[CheckInResult] = Field(default_factory=list, description="Per check-in outcomes, in batch order")
 
     class Config:
         json_schema_extra = {
@@ -179,9 +199,13 @@ class CheckInBatchResponse(BaseModel):
                 "success": True,
                 "total": 50,
                 "uploaded": 48,
+                "re_entries": 3,
                 "duplicates": 2,
                 "errors": 0,
-                "error_details": []
+                "error_details": [],
+                "results": [
+                    {"index": 0, "entry_id": 1, "status": "created", "check_in_id": 101, "re_entry_id": None, "error": None}
+                ]
             }
         }
 
@@ -226,6 +250,20 @@ class QRVerifyResponse(BaseModel):
         }
 
 
+class SessionStats(BaseModel):
+    """Check-in totals for one session type"""
+    session_type: str
+    total_scans: int
+    unique_entries: int
+    last_scan_time: Optional[datetime] = None
+
+
+class IntervalStats(BaseModel):
+    """Check-ins in one time bucket"""
+    interval_start: datetime
+    scans: int
+
+
 class ScannerStats(BaseModel):
     """Scanner statistics"""
     gate_number: str
@@ -233,7 +271,11 @@ class ScannerStats(BaseModel):
     successful_scans: int
     rejected_scans: int
     unique_entries: int
+    re_entries: int = Field(0, description="Scans after an attendee's first check-in (included in total_scans)")
     last_scan_time: Optional[datetime] = None
+    sessions: List[SessionStats] = Field(default_factory=list, description="Breakdown per session type")
+    interval_minutes: int = Field(5, description="Bucket width of `intervals`")
+    intervals: List[IntervalStats] = Field(default_factory=list, description="Scans per time bucket, oldest first")
 
     class Config:
         json_schema_extra = {
@@ -243,6 +285,18 @@ class ScannerStats(BaseModel):
                 "successful_scans": 145,
                 "rejected_scans": 5,
                 "unique_entries": 140,
-                "last_scan_time": "2025-11-25T12:00:00"
+                "last_scan_time": "2025-11-25T12:00:00",
+                "sessions": [
+                    {
+                        "session_type": "exhibition_day1",
+                        "total_scans": 150,
+                        "unique_entries": 140,
+                        "last_scan_time": "2025-11-25T12:00:00"
+                    }
+                ],
+                "interval_minutes": 5,
+                "intervals": [
+                    {"interval_start": "2025-11-25T11:55:00", "scans": 23}
+                ]
             }
         }
@@ -5,12 +5,13 @@ Uses official sib-api-v3-sdk library
 """
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
-import base64
 import time
 from pathlib import Path
 from typing import List, Optional
 
 from ..core.config import settings
+from .email_attachments import AttachmentLike, load_attachments
+from .email_throttle import parse_retry_after, report_throttled
 
 
 class BrevoService:
@@ -32,7 +33,7 @@ class BrevoService:
         )
 
     def send_email(self, to_email: str, subject: str, html_content: str,
-                   text_content: str = "", attachments: List[str] = None) -> bool:
+                   text_content: str = "", attachments: List[AttachmentLike] = None) -> bool:
         """
         Send email via Brevo API v3
 
@@ -41,7 +42,7 @@ class BrevoService:
             subject: Email subject
             html_content: HTML email body
             text_content: Plain text email body (optional, not used by Brevo)
-            attachments: List of file paths to attach
+            attachments: File paths or in-memory EmailAttachments to attach
 
         Returns:
             bool: True if successful, False otherwise
@@ -62,27 +63,11 @@ class BrevoService:
             attachment_start = time.time()
             brevo_attachments = []
 
-            if attachments:
-                for file_path in attachments:
-                    if Path(file_path).exists():
-                        try:
-                            # Read and encode file to base64
-                            with open(file_path, 'rb') as f:
-                                file_data = f.read()
-                                encoded_string = base64.b64encode(file_data)
-                                base64_content = encoded_string.decode('utf-8')
-
-                            file_name = Path(file_path).name
-
-                            # Add to attachments list
-                            brevo_attachments.append({
-                                "content": base64_content,
-                                "name": file_name
-                            })
-
-                        except Exception as e:
-                            print(f"⚠️  Failed to attach {file_path}: {e}")
-                            continue
+            for attachment in load_attachments(attachments):
+                brevo_attachments.append({
+                    "content": attachment.to_base64(),
+                    "name": attachment.filename
+                })
 
             attachment_time = time.time() - attachment_start
 
@@ -113,6 +98,9 @@ class BrevoService:
             print(f"   Status: {e.status if hasattr(e, 'status') else 'Unknown'}")
             print(f"   Reason: {e.reason if hasattr(e, 'reason') else 'Unknown'}")
             print(f"   Body: {e.body if hasattr(e, 'body') else 'No details'}")
+            if getattr(e, 'status', None) == 429:
+                # Rate limited - the dispatcher backs off and retries
+                report_throttled(parse_retry_after((getattr(e, 'headers', None) or {}).get('Retry-After')))
             return False
 
         except Exception as e:
@@ -0,0 +1,146 @@
+"""
+Email attachments - In-memory files handed from pass generation to email providers
+Rendered passes never touch the disk; static files are read and encoded once per process
+"""
+import base64
+import io
+import mimetypes
+import threading
+from email.mime.base import MIMEBase
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from PIL import Image
+
+from ..core.config import settings
+
+
+class EmailAttachment(NamedTuple):
+    """A file to attach, held in memory"""
+    filename: str
+    content: bytes
+    mime_type: str = "image/png"
+    encoded: Optional[str] = None  # base64 of content, when computed ahead (static attachments)
+
+    @property
+    def name(self) -> str:
+        """Filename - same attribute as Path.name, so callers can treat both alike"""
+        return self.filename
+
+    def to_base64(self) -> str:
+        """Content as a base64 string (API providers)"""
+        if self.encoded is not None:
+            return self.encoded
+        return base64.b64encode(self.content).decode("utf-8")
+
+    def to_mime(self) -> MIMEBase:
+        """Content as a MIME attachment part (SMTP providers)"""
+        maintype, subtype = self.mime_type.split("/", 1)
+        part = MIMEBase(maintype, subtype)
+
+        # Same 76-character lines as email.encoders.encode_base64, from the (cached) base64
+        encoded = self.to_base64()
+        part.set_payload("\n".join(encoded[i:i + 76] for i in range(0, len(encoded), 76)))
+        part["Content-Transfer-Encoding"] = "base64"
+
+        part.add_header("Content-Disposition", "attachment", filename=self.filename)
+        return part
+
+
+# Anything providers accept as an attachment
+AttachmentLike = Union[EmailAttachment, Path, str]
+
+
+def guess_mime_type(filename: str) -> str:
+    """MIME type from a filename extension"""
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+class StaticAttachmentCache:
+    """
+    Process-wide cache of attachment files, read and base64-encoded once
+
+    Files attached by path are the static ones (invitation images) - the
+    same few files go to every recipient of a bulk run. Entries are keyed
+    by path and modification time, so a replaced file is picked up on the
+    next send.
+    """
+
+    def __init__(self):
+        self._files: Dict[str, Tuple[float, EmailAttachment]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, file_path: Path) -> Optional[EmailAttachment]:
+        """
+        Cached attachment for a file
+
+        Returns:
+            None if the file does not exist
+        """
+        key = str(file_path)
+        try:
+            mtime = file_path.stat().st_mtime
+        except OSError:
+            print(f"Warning: Attachment not found: {file_path}")
+            return None
+
+        cached = self._files.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with self._lock:
+            cached = self._files.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            attachment = self._load(file_path)
+            self._files[key] = (mtime, attachment)
+            return attachment
+
+    def _load(self, file_path: Path) -> EmailAttachment:
+        """Read, optionally recompress, and base64-encode a file"""
+        content = file_path.read_bytes()
+        mime_type = guess_mime_type(file_path.name)
+        original_size = len(content)
+
+        if settings.STATIC_ATTACHMENT_OPTIMIZE and mime_type == "image/png":
+            buffer = io.BytesIO()
+            Image.open(io.BytesIO(content)).save(buffer, "PNG", optimize=True)
+            if buffer.tell() < original_size:
+                content = buffer.getvalue()
+
+        attachment = EmailAttachment(
+            file_path.name, content, mime_type,
+            encoded=base64.b64encode(content).decode("utf-8")
+        )
+        print(f"📎 Cached attachment: {file_path.name} ({original_size // 1024} KB → {len(content) // 1024} KB)")
+        return attachment
+
+    def clear(self):
+        """Drop every cached file"""
+        with self._lock:
+            self._files.clear()
+
+
+def load_attachment(attachment: AttachmentLike) -> Optional[EmailAttachment]:
+    """
+    Attachment in memory - EmailAttachments are returned as-is, file paths
+    come from the static attachment cache
+
+    Returns:
+        None if the file does not exist
+    """
+    if isinstance(attachment, EmailAttachment):
+        return attachment
+
+    return static_attachments.get(Path(attachment))
+
+
+def load_attachments(attachments: Optional[Iterable[AttachmentLike]]) -> List[EmailAttachment]:
+    """Load every attachment that exists (see load_attachment)"""
+    loaded = (load_attachment(attachment) for attachment in attachments or [])
+    return [attachment for attachment in loaded if attachment is not None]
+
+
+# Create singleton instance
+static_attachments = StaticAttachmentCache()
@@ -0,0 +1,401 @@
+"""
+Email dispatcher - Concurrent pass email sending with per-provider rate limits
+Bulk runs keep several sends in flight instead of waiting on each round trip
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..core.config import settings
+from .email_attachments import AttachmentLike, load_attachments
+from .email_service import EmailProvider, email_service
+from .email_templates import PassFlags
+from .email_throttle import take_throttled
+
+
+# Per provider (EmailProvider.key):
+# - rate / burst: token bucket - sustained sends per second and how many may go at once after a pause
+# - max_in_flight: concurrent sends (HTTP requests or SMTP sessions)
+# EMAIL_RATE_PER_SECOND / EMAIL_MAX_IN_FLIGHT override the provider values
+PROVIDER_LIMITS = {
+    "brevo": {"rate": 5.0, "burst": 10, "max_in_flight": 8},
+    "mailjet": {"rate": 2.0, "burst": 5, "max_in_flight": 4},
+    "gmail": {"rate": 0.5, "burst": 2, "max_in_flight": 2},
+    "nic": {"rate": 0.5, "burst": 3, "max_in_flight": 3},
+    "mailbluster": {"rate": 2.0, "burst": 4, "max_in_flight": 4}
+}
+DEFAULT_LIMITS = {"rate": 1.0, "burst": 1, "max_in_flight": 1}
+
+# First backoff after a throttled send, doubled on each retry (seconds)
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 120.0
+
+# Longest a send waits for some provider to accept sends again (circuits open,
+# throttled) before the job is reported failed
+PROVIDER_WAIT_MAX_SECONDS = 300.0
+
+# Sends (single emails or batches) accepted ahead of the senders, per concurrent send
+QUEUE_PER_SENDER = 2
+
+
+class EmailJob(NamedTuple):
+    """One pass email to send"""
+    key: int  # Caller's identifier for the job (entry id)
+    recipient_email: str
+    recipient_name: str
+    attachments: List[AttachmentLike]
+    exhibitor: bool = False  # Use the exhibitor email template
+    passes: Optional[PassFlags] = None  # Visitor passes attached (email template), None = from filenames
+    num_attendees: Optional[int] = None  # Exhibitor passes attached (email template), None = from filenames
+    has_invitations: Optional[bool] = None  # Invitation images attached (email template), None = from filenames
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a send is allowed"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, waiting for a refill or the end of a pause"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    delay = (1 - self.tokens) / self.rate
+
+            time.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Hold every sender on this bucket for a while (provider is throttling)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class EmailDispatcher:
+    """
+    Sends pass emails concurrently through EmailService
+
+    Each provider gets a token bucket and a cap on concurrent sends. A send
+    the provider rejects as throttled pauses the provider's bucket with
+    exponential backoff (or the provider's Retry-After) and is retried,
+    on another provider while that one is held off (EMAIL_FAILOVER); any
+    other failure is tried once on another provider, then reported back.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}  # Concurrent sends per provider
+        self._buckets_lock = threading.Lock()
+
+    def get_limits(self, provider_key: Optional[str]) -> dict:
+        """Rate limits for a provider, with settings overrides applied"""
+        limits = dict(PROVIDER_LIMITS.get(provider_key, DEFAULT_LIMITS))
+        if settings.EMAIL_RATE_PER_SECOND:
+            limits["rate"] = settings.EMAIL_RATE_PER_SECOND
+        if settings.EMAIL_MAX_IN_FLIGHT:
+            limits["max_in_flight"] = settings.EMAIL_MAX_IN_FLIGHT
+        return limits
+
+    def _get_bucket(self, provider_key: Optional[str]) -> TokenBucket:
+        """Shared token bucket for a provider (one per process, across bulk runs)"""
+        key = provider_key or "none"
+        with self._buckets_lock:
+            if key not in self._buckets:
+                limits = self.get_limits(provider_key)
+                self._buckets[key] = TokenBucket(limits["rate"], limits["burst"])
+            return self._buckets[key]
+
+    def _get_slots(self, provider_key: Optional[str]) -> threading.BoundedSemaphore:
+        """
+        Shared cap on concurrent sends to a provider (max_in_flight)
+
+        The sender pool is sized for the primary provider; after failover the
+        senders share the next provider's (often smaller) cap.
+        """
+        key = provider_key or "none"
+        with self._buckets_lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(max(1, self.get_limits(provider_key)["max_in_flight"]))
+            return self._slots[key]
+
+    def _next_provider(self, exclude: List[str]) -> Optional[EmailProvider]:
+        """
+        Healthy provider for the next attempt, waiting while every one is
+        held off (throttled or circuit open)
+
+        Returns:
+            None if no provider will take sends within PROVIDER_WAIT_MAX_SECONDS
+            (out of quota, or all failing) - the caller gives up on the job
+        """
+        waited = 0.0
+        while True:
+            provider = email_service.choose_provider(exclude=exclude)
+            if provider is not None:
+                return provider
+
+            delay = email_service.retry_in(exclude=exclude)
+            if waited + delay > PROVIDER_WAIT_MAX_SECONDS:
+                print("❌ No email provider available (all failing or out of quota)")
+                return None
+            delay = max(delay, 0.5)
+            time.sleep(delay)
+            waited += delay
+
+    def _backoff(self, attempt: int, retry_after: float) -> float:
+        """Wait before retrying a throttled send - the provider's Retry-After, else exponential"""
+        return retry_after or min(
+            BACKOFF_MAX_SECONDS,
+            BACKOFF_BASE_SECONDS * 2 ** attempt * (1 + random.random())
+        )
+
+    def send(self, job: EmailJob, exclude: Iterable[str] = ()) -> bool:
+        """
+        Send one job, retrying with backoff while the provider throttles
+
+        Each attempt goes to the healthiest provider (EmailService.choose_provider),
+        so a throttled or failing provider's share moves to the next one; a
+        plainly failed send is tried once more on a different provider.
+
+        Args:
+            exclude: Provider keys that already rejected the job (no further failover)
+        """
+        email_service._ensure_provider_initialized()
+        failed_on: List[str] = list(exclude)  # Providers that rejected this job outright
+
+        for attempt in range(settings.EMAIL_MAX_RETRIES + 1):
+            provider = self._next_provider(failed_on)
+            if provider is None:
+                return False
+            bucket = self._get_bucket(provider.key)
+            bucket.acquire()
+            take_throttled()
+
+            with self._get_slots(provider.key):
+                start = time.monotonic()
+                if job.exhibitor:
+                    success = email_service.send_exhibitor_bulk_email(
+                        recipient_email=job.recipient_email,
+                        recipient_name=job.recipient_name,
+                        pass_files=job.attachments,
+                        provider=provider,
+                        num_attendees=job.num_attendees,
+                        has_invitation=job.has_invitations
+                    )
+                else:
+                    success = email_service.send_pass_email(
+                        recipient_email=job.recipient_email,
+                        recipient_name=job.recipient_name,
+                        pass_files=job.attachments,
+                        provider=provider,
+                        passes=job.passes,
+                        has_invitations=job.has_invitations
+                    )
+                latency = time.monotonic() - start
+
+            retry_after = take_throttled()
+            delay = self._backoff(attempt, retry_after) if retry_after is not None else None
+            email_service.record_result(provider, success, latency, delay)
+
+            if success:
+                return True
+            if delay is None:
+                # Not throttling - fail over once, if another provider is configured
+                if failed_on or not settings.EMAIL_FAILOVER or len(email_service.providers) < 2:
+                    return False
+                failed_on.append(provider.key)
+                print(f"🔀 {provider.name} failed for {job.recipient_email} - trying the next provider")
+                continue
+            if attempt == settings.EMAIL_MAX_RETRIES:
+                return False
+
+            print(f"⏳ {provider.name} is throttling - retrying {job.recipient_email} in {delay:.1f}s")
+            bucket.pause(delay)
+
+        return False
+
+    def send_batch(self, jobs: List[EmailJob]) -> List[bool]:
+        """
+        Send jobs in one provider API call, retrying the rejected ones with
+        backoff while the provider throttles
+
+        Like send(), each attempt goes to the healthiest provider, and a batch
+        rejected as a whole is tried once more on a different provider. When
+        that provider has no batch API, the remaining jobs go through send()
+        one at a time.
+
+        Returns:
+            Success of each job, in the same order
+        """
+        email_service._ensure_provider_initialized()
+
+        results = [False] * len(jobs)
+        pending = list(range(len(jobs)))
+        failed_on: List[str] = []
+
+        for attempt in range(settings.EMAIL_MAX_RETRIES + 1):
+            provider = self._next_provider(failed_on)
+            if provider is None:
+                return results
+            if not hasattr(provider.service, "send_batch"):
+                # Failed over to a provider without a batch API - send the rest one by one
+                email_service.release_provider(provider)
+                for index in pending:
+                    results[index] = self.send(jobs[index], exclude=failed_on)
+                return results
+            bucket = self._get_bucket(provider.key)
+            bucket.acquire()  # One token per API call
+            take_throttled()
+
+            with self._get_slots(provider.key):
+                start = time.monotonic()
+                sent = email_service.send_pass_email_batch([
+                    {
+                        "recipient_email": jobs[index].recipient_email,
+                        "recipient_name": jobs[index].recipient_name,
+                        "pass_files": jobs[index].attachments,
+                        "exhibitor": jobs[index].exhibitor,
+                        "passes": jobs[index].passes,
+                        "num_attendees": jobs[index].num_attendees,
+                        "has_invitations": jobs[index].has_invitations
+                    }
+                    for index in pending
+                ], provider=provider)
+                latency = time.monotonic() - start
+
+            retry_after = take_throttled()
+            delay = self._backoff(attempt, retry_after) if retry_after is not None else None
+            email_service.record_result(provider, any(sent), latency, delay, messages=sum(sent))
+
+            for index, success in zip(pending, sent):
+                results[index] = success
+            pending = [index for index, success in zip(pending, sent) if not success]
+
+            if not pending:
+                return results
+            if delay is None:
+                # Some accepted = per-message errors (bad address), nothing to fail over
+                if any(sent) or failed_on or not settings.EMAIL_FAILOVER or len(email_service.providers) < 2:
+                    return results
+                failed_on.append(provider.key)
+                print(f"🔀 {provider.name} rejected a batch of {len(pending)} - trying the next provider")
+                continue
+            if attempt == settings.EMAIL_MAX_RETRIES:
+                return results
+
+            print(f"⏳ {provider.name} is throttling - retrying {len(pending)} email(s) in {delay:.1f}s")
+            bucket.pause(delay)
+
+        return results
+
+    def _batches(self, jobs: Iterator[EmailJob], max_messages: int,
+                 max_bytes: int) -> Iterator[List[EmailJob]]:
+        """Group jobs into batches of at most max_messages and max_bytes of base64 attachments"""
+        batch, batch_bytes = [], 0
+        for job in jobs:
+            job_bytes = sum(len(attachment.content) for attachment in load_attachments(job.attachments)) * 4 // 3
+            if batch and (len(batch) >= max_messages or batch_bytes + job_bytes > max_bytes):
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(job)
+            batch_bytes += job_bytes
+        if batch:
+            yield batch
+
+    def jobs_ahead(self) -> int:
+        """Most jobs send_all holds at once (sending or queued) - how many a producer should prepare"""
+        email_service._ensure_provider_initialized()
+        senders = max(1, self.get_limits(email_service.provider_key)["max_in_flight"])
+        max_messages, _ = email_service.get_batch_limits()
+        return senders * QUEUE_PER_SENDER * max_messages
+
+    def send_all(self, jobs: Iterable[EmailJob]) -> Iterator[Tuple[EmailJob, bool]]:
+        """
+        Send many jobs concurrently
+
+        Jobs are pulled from the iterable in the caller's thread, only a few
+        ahead of the senders, so a generator can render passes and commit
+        database changes as it goes. Results are yielded in completion order.
+
+        On providers with a batch API (EmailService.get_batch_limits) jobs are
+        grouped and each sender makes one API call per batch.
+
+        Yields:
+            (job, success)
+        """
+        # Initialize once here rather than racing in the sender threads
+        email_service._ensure_provider_initialized()
+        limits = self.get_limits(email_service.provider_key)
+        senders = max(1, limits["max_in_flight"])
+        max_messages, max_bytes = email_service.get_batch_limits()
+
+        if max_messages > 1:
+            units = self._batches(iter(jobs), max_messages, max_bytes)
+            send = self.send_batch
+        else:
+            units = ([job] for job in jobs)
+            send = lambda batch: [self.send(batch[0])]
+
+        futures = {}
+        exhausted = False
+
+        executor = ThreadPoolExecutor(max_workers=senders, thread_name_prefix="email-sender")
+        print(f"📨 Email dispatch via {email_service.provider_name}: "
+              f"{senders} concurrent, {limits['rate']:g}/s"
+              f"{f', batches of up to {max_messages}' if max_messages > 1 else ''}")
+
+        def submit_more():
+            nonlocal exhausted
+            while not exhausted and len(futures) < senders * QUEUE_PER_SENDER:
+                batch = next(units, None)
+                if batch is None:
+                    exhausted = True
+                    break
+                futures[executor.submit(send, batch)] = batch
+
+        try:
+            submit_more()
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = futures.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        print(f"❌ Email error for {', '.join(job.recipient_email for job in batch)}: {e}")
+                        results = [False] * len(batch)
+
+                    for job, success in zip(batch, results):
+                        yield job, success
+
+                submit_more()
+
+            if len(email_service.providers) > 1:
+                for stats in email_service.provider_stats():
+                    rate = f"{stats['success_rate']:.0%}" if stats["success_rate"] is not None else "-"
+                    print(f"📊 {stats['name']}: {stats['state']}, success {rate} of last {stats['samples']}, "
+                          f"{stats['sent_today']} sent today")
+        finally:
+            # Caller stopped early (error, Streamlit rerun) - drop queued sends
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Create singleton instance
+email_dispatcher = EmailDispatcher()
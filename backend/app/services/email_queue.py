@@ -0,0 +1,470 @@
+"""
+Email queue - Durable bulk pass email jobs, drained by a standalone worker
+The Streamlit app enqueues and polls; email_worker.py renders and sends
+"""
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import func, update, select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal, dialect_insert
+from ..models import Entry, EmailQueueJob
+from .email_dispatcher import EmailJob, email_dispatcher
+from .email_service import email_service
+from .email_templates import PassFlags
+from .pass_generator import pass_generator
+
+
+# Pass allocation flags on Entry; pass_generated_<flag> records a sent pass
+PASS_FLAGS = ("exhibition_day1", "exhibition_day2", "interactive_sessions", "plenary")
+
+# Rendered pass types (determine_passes_needed names) that are not a single flag
+COMBINED_PASS_FLAGS = {"exhibition_both_days": ("exhibition_day1", "exhibition_day2")}
+
+# Queue states a job can still be sent from (covered by uq_email_queue_active_entry)
+ACTIVE_STATES = ("pending", "sending")
+
+# Rows per INSERT when enqueuing
+ENQUEUE_CHUNK_SIZE = 100
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class EmailQueue:
+    """
+    Durable outbound email queue (email_queue table)
+
+    - enqueue() adds one job per entry; an entry that already has a pending or
+      in-flight job is skipped by the database's partial unique index
+    - A worker claims pending jobs atomically (FOR UPDATE SKIP LOCKED on
+      PostgreSQL), so several workers never send the same job
+    - A job is marked sent or failed in the worker's own transaction after the
+      provider answers; failed sends are retried with backoff up to
+      EMAIL_QUEUE_MAX_ATTEMPTS
+    - A running worker renews the lease (EMAIL_QUEUE_LEASE_SECONDS) on the jobs
+      it holds, however long a send takes. A worker that dies mid-send leaves
+      its jobs 'sending'; they are requeued once the lease runs out. Only a job
+      whose provider call completed just before the crash can be sent twice.
+    """
+
+    def __init__(self):
+        # In-process worker (start_in_process_worker), for deployments without email_worker.py
+        self._worker_thread: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Producer side (Streamlit)
+    # ------------------------------------------------------------------
+
+    def enqueue(self, db: Session, entries: Iterable[Entry], requested_by: str,
+                passes: Optional[List[str]] = None) -> Tuple[str, int]:
+        """
+        Queue a pass email for each entry
+
+        Args:
+            entries: Attendees to email
+            requested_by: Username queuing the batch
+            passes: Pass flags to send (admin selection), None = all allocated passes
+
+        Returns:
+            (batch_id, number queued) - entries already queued are not counted
+        """
+        batch_id = str(uuid4())
+        rows = [
+            {
+                "entry_id": entry.id,
+                "kind": "exhibitor_pass" if getattr(entry, "is_exhibitor_pass", False) else "pass",
+                "passes": ",".join(passes) if passes is not None else None,
+                "batch_id": batch_id,
+                "requested_by": requested_by,
+                "state": "pending",
+                "attempts": 0,
+                "run_after": _utcnow()
+            }
+            for entry in entries
+        ]
+
+        queued = 0
+        try:
+            for start in range(0, len(rows), ENQUEUE_CHUNK_SIZE):
+                stmt = (
+                    dialect_insert(EmailQueueJob)
+                    .values(rows[start:start + ENQUEUE_CHUNK_SIZE])
+                    .on_conflict_do_nothing(
+                        index_elements=["entry_id", "kind"],
+                        index_where=EmailQueueJob.state.in_(ACTIVE_STATES)
+                    )
+                    .returning(EmailQueueJob.id)
+                )
+                queued += len(db.execute(stmt).all())
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        print(f"📬 Queued {queued}/{len(rows)} pass email(s) by {requested_by} (batch {batch_id})")
+        return batch_id, queued
+
+    def batch_progress(self, db: Session, batch_id: str) -> Dict[str, int]:
+        """Job count per state for a batch (states with no jobs are 0)"""
+        counts = dict.fromkeys(("pending", "sending", "sent", "failed", "cancelled"), 0)
+        rows = db.query(EmailQueueJob.state, func.count(EmailQueueJob.id)).filter(
+            EmailQueueJob.batch_id == batch_id
+        ).group_by(EmailQueueJob.state).all()
+        counts.update(dict(rows))
+        return counts
+
+    def latest_batch(self, db: Session, requested_by: str) -> Optional[str]:
+        """Most recent batch queued by a user (survives refreshes and restarts)"""
+        return db.query(EmailQueueJob.batch_id).filter(
+            EmailQueueJob.requested_by == requested_by
+        ).order_by(EmailQueueJob.id.desc()).limit(1).scalar()
+
+    def failed_jobs(self, db: Session, batch_id: str) -> List[Tuple[EmailQueueJob, Entry]]:
+        """Failed jobs of a batch with their entries"""
+        return db.query(EmailQueueJob, Entry).join(Entry, Entry.id == EmailQueueJob.entry_id).filter(
+            EmailQueueJob.batch_id == batch_id,
+            EmailQueueJob.state == "failed"
+        ).order_by(EmailQueueJob.id).all()
+
+    def worker_stalled(self, db: Session, batch_id: str) -> bool:
+        """
+        Whether a batch is waiting with no worker running
+
+        True when the batch has had jobs to send for longer than
+        EMAIL_QUEUE_LEASE_SECONDS while no worker has claimed, renewed or
+        completed any job in that time - a running worker would have.
+        """
+        cutoff = _utcnow() - timedelta(seconds=settings.EMAIL_QUEUE_LEASE_SECONDS)
+
+        waiting = db.query(EmailQueueJob.id).filter(
+            EmailQueueJob.batch_id == batch_id,
+            EmailQueueJob.state.in_(ACTIVE_STATES),
+            EmailQueueJob.created_at < cutoff
+        ).first()
+        if waiting is None:
+            return False
+
+        # Claims, lease renewals and results all touch claimed jobs (attempts > 0)
+        worker_seen = db.query(EmailQueueJob.id).filter(
+            EmailQueueJob.attempts > 0,
+            EmailQueueJob.updated_at >= cutoff
+        ).first()
+        return worker_seen is None
+
+    def cancel(self, db: Session, batch_id: str) -> int:
+        """Cancel a batch's jobs that have not been claimed yet"""
+        result = db.execute(
+            update(EmailQueueJob)
+            .where(EmailQueueJob.batch_id == batch_id, EmailQueueJob.state == "pending")
+            .values(state="cancelled")
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def claim(self, db: Session, worker_id: str, limit: int) -> List[EmailQueueJob]:
+        """
+        Atomically move up to `limit` due pending jobs to 'sending' for this worker
+
+        One UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED): rows
+        another worker is claiming are skipped rather than waited on. SQLite
+        has no row locks but runs the statement under its write lock.
+        """
+        now = _utcnow()
+        due = (
+            select(EmailQueueJob.id)
+            .where(EmailQueueJob.state == "pending", EmailQueueJob.run_after <= now)
+            .order_by(EmailQueueJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(EmailQueueJob)
+            .where(EmailQueueJob.id.in_(due), EmailQueueJob.state == "pending")
+            .values(
+                state="sending",
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=EmailQueueJob.attempts + 1
+            )
+            .returning(EmailQueueJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            ids = db.execute(stmt).scalars().all()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        if not ids:
+            return []
+        return db.query(EmailQueueJob).filter(EmailQueueJob.id.in_(ids)).order_by(EmailQueueJob.id).all()
+
+    def requeue_stale(self, db: Session) -> int:
+        """Return jobs whose worker stopped mid-send to the queue (or fail them when out of attempts)"""
+        cutoff = _utcnow() - timedelta(seconds=settings.EMAIL_QUEUE_LEASE_SECONDS)
+        stale = (EmailQueueJob.state == "sending", EmailQueueJob.locked_at < cutoff)
+
+        failed = db.execute(
+            update(EmailQueueJob)
+            .where(*stale, EmailQueueJob.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS)
+            .values(state="failed", last_error="Worker stopped while sending", locked_by=None, locked_at=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        requeued = db.execute(
+            update(EmailQueueJob)
+            .where(*stale)
+            .values(state="pending", locked_by=None, locked_at=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+
+        if failed or requeued:
+            print(f"♻️ Stale email jobs: {requeued} requeued, {failed} failed")
+        return requeued + failed
+
+    def renew(self, db: Session, worker_id: str) -> int:
+        """Restart the lease on every job this worker holds"""
+        result = db.execute(
+            update(EmailQueueJob)
+            .where(EmailQueueJob.state == "sending", EmailQueueJob.locked_by == worker_id)
+            .values(locked_at=_utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount
+
+    def _heartbeat(self, worker_id: str, stop: threading.Event):
+        """Renew this worker's leases every third of the lease until stopped (own session)"""
+        interval = max(1, settings.EMAIL_QUEUE_LEASE_SECONDS // 3)
+        db = SessionLocal()
+        try:
+            while not stop.wait(interval):
+                try:
+                    self.renew(db, worker_id)
+                except Exception as e:
+                    # Try again next beat - the lease still has two thirds to run
+                    db.rollback()
+                    print(f"⚠️ Could not renew email job leases: {e}")
+        finally:
+            db.close()
+
+    def complete(self, db: Session, job_id: int, worker_id: str, success: bool,
+                 error: Optional[str] = None, retry: bool = True):
+        """
+        Record the outcome of a claimed job - sent, retry later, or failed
+
+        Args:
+            retry: False = a failure no retry can fix (job fails at once)
+        """
+        job = db.get(EmailQueueJob, job_id)
+        if job is None or job.state != "sending" or job.locked_by != worker_id:
+            # Entry deleted, or the lease ran out and another worker took the job over
+            print(f"⚠️ Email job {job_id} is no longer held by this worker - result not recorded")
+            return
+
+        now = _utcnow()
+        if success:
+            job.state = "sent"
+            job.sent_at = now
+            job.last_error = None
+        elif not retry or job.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+            job.state = "failed"
+            job.last_error = (error or "Send failed")[:1000]
+        else:
+            job.state = "pending"
+            job.run_after = now + timedelta(
+                seconds=settings.EMAIL_QUEUE_RETRY_SECONDS * 2 ** (job.attempts - 1)
+            )
+            job.last_error = (error or "Send failed")[:1000]
+
+        job.locked_by = None
+        job.locked_at = None
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    def _entry_to_render(self, entry: Entry, passes: Optional[str]) -> Entry:
+        """Entry as passes should be rendered for it - a detached copy limited to the selected passes"""
+        if passes is None:
+            return entry
+
+        selected = set(passes.split(","))
+        render_entry = Entry(**{column.key: getattr(entry, column.key) for column in Entry.__table__.columns})
+        for flag in PASS_FLAGS:
+            setattr(render_entry, flag, getattr(entry, flag) and flag in selected)
+        return render_entry
+
+    def _email_jobs(self, db: Session, worker_id: str, batch_size: int) -> Iterator[EmailJob]:
+        """
+        Claim due jobs a batch at a time, render their passes and hand over the emails
+
+        Runs in the dispatcher's calling thread (see EmailDispatcher.send_all),
+        so the database session is never shared between threads.
+        """
+        while True:
+            claimed = self.claim(db, worker_id, batch_size)
+            if not claimed:
+                return
+
+            entries = {
+                entry.id: entry
+                for entry in db.query(Entry).filter(Entry.id.in_([job.entry_id for job in claimed]))
+            }
+            jobs_by_entry = {job.entry_id: job for job in claimed if job.entry_id in entries}
+
+            # Entry deleted after it was queued - fail the job so it is not claimed forever
+            for job in claimed:
+                if job.entry_id not in entries:
+                    self.complete(db, job.id, worker_id, False, "Entry no longer exists", retry=False)
+
+            # QR data is generated per requesting user
+            by_user = sorted(jobs_by_entry.values(), key=lambda job: job.requested_by)
+            for username, user_jobs in groupby(by_user, key=lambda job: job.requested_by):
+                to_render = [self._entry_to_render(entries[job.entry_id], job.passes) for job in user_jobs]
+
+                for rendered in pass_generator.generate_passes_for_entries(to_render, username):
+                    rendered_entry, generated_passes = rendered.entry, rendered.files
+                    entry = entries[rendered_entry.id]
+                    job = jobs_by_entry[rendered_entry.id]
+
+                    if rendered.error:
+                        # Never send a partial set of passes - retried like a failed send
+                        self.complete(db, job.id, worker_id, False, rendered.error)
+                        continue
+                    if not rendered.pass_types:
+                        self.complete(db, job.id, worker_id, False, "No pass templates found for the entry's passes")
+                        continue
+
+                    # Passes actually attached - a pass whose template is missing is skipped
+                    generated = {
+                        flag
+                        for pass_type in rendered.pass_types
+                        for flag in COMBINED_PASS_FLAGS.get(pass_type, (pass_type,))
+                    }
+
+                    try:
+                        # Update database flags only for passes that were actually generated
+                        for flag in PASS_FLAGS:
+                            if flag in generated:
+                                setattr(entry, f"pass_generated_{flag}", True)
+                        db.commit()
+                    except Exception as e:
+                        db.rollback()
+                        self.complete(db, job.id, worker_id, False, f"Could not update pass flags: {e}")
+                        continue
+
+                    # Send email - use correct template based on entry type
+                    # EXHIBITOR: dedicated exhibitor email template, VISITOR: visitor template
+                    yield EmailJob(
+                        key=job.id,
+                        recipient_email=entry.email,
+                        recipient_name=entry.name,
+                        attachments=generated_passes,
+                        exhibitor=job.kind == "exhibitor_pass",
+                        # Email template from the passes rendered, not the attachment filenames
+                        passes=PassFlags(*(flag in generated for flag in PassFlags._fields)),
+                        num_attendees=len(rendered.pass_types),
+                        has_invitations=rendered.has_invitations
+                    )
+
+    def drain(self, worker_id: str) -> int:
+        """
+        Send every due job, then return
+
+        Returns:
+            Number of jobs processed
+        """
+        db = SessionLocal()
+        processed = 0
+
+        # Keep the leases of jobs being rendered or sent from running out
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(worker_id, stop), name="email-queue-heartbeat", daemon=True
+        )
+        heartbeat.start()
+        try:
+            self.requeue_stale(db)
+
+            # Claim only as many jobs as the dispatcher keeps queued ahead of its senders
+            batch_size = email_dispatcher.jobs_ahead()
+
+            for job, success in email_dispatcher.send_all(self._email_jobs(db, worker_id, batch_size)):
+                self.complete(
+                    db, job.key, worker_id, success,
+                    None if success else f"Not sent via {', '.join(p.name for p in email_service.providers) or 'any provider'}"
+                )
+                processed += 1
+                print(f"{'✅' if success else '❌'} Email job {job.key}: {job.recipient_email}")
+        finally:
+            stop.set()
+            heartbeat.join()
+            db.close()
+
+        return processed
+
+    def run_worker(self, once: bool = False):
+        """
+        Drain the queue forever, polling every EMAIL_QUEUE_POLL_SECONDS when idle
+
+        Args:
+            once: Return as soon as no job is due (cron / one-off runs)
+        """
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        email_service._ensure_provider_initialized()
+        print(f"📬 Email worker {worker_id} started ({email_service.provider_name})")
+
+        while True:
+            try:
+                processed = self.drain(worker_id)
+            except Exception as e:
+                # Database or provider outage - keep the worker alive and try again
+                print(f"❌ Email worker error: {e}")
+                processed = 0
+
+            if once and not processed:
+                return
+            if not processed:
+                time.sleep(settings.EMAIL_QUEUE_POLL_SECONDS)
+
+    def start_in_process_worker(self) -> bool:
+        """
+        Run the worker loop in a daemon thread of this process, once per process
+
+        For deployments that cannot run email_worker.py (Streamlit Cloud): the
+        queue is drained for as long as the app process is alive.
+
+        Returns:
+            True if this call started the thread
+        """
+        with self._worker_lock:
+            if self._worker_thread is not None and self._worker_thread.is_alive():
+                return False
+            self._worker_thread = threading.Thread(
+                target=self.run_worker, name="email-queue-worker", daemon=True
+            )
+            self._worker_thread.start()
+            return True
+
+
+# Create singleton instance
+email_queue = EmailQueue()
@@ -2,156 +2,38 @@
 Email service - Auto-detects and uses configured email provider
 Supports: Mailjet API (FAST), NIC SMTP, Gmail SMTP, MailBluster
 """
-import base64
-from pathlib import Path
-from typing import List, Optional
+import random
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 from ..core.config import settings
+from .email_attachments import AttachmentLike, load_attachments
+from .email_templates import PassFlags, count_exhibitor_passes, detect_passes, email_templates
+from .email_throttle import take_throttled
+from .provider_health import QUOTA_SPLIT_FRACTION, ProviderHealth
 
 
-class EmailService:
-    """Unified email service - automatically uses configured provider"""
-    
-    # Email templates for different pass types
-    EMAIL_TEMPLATES = {
-        "exhibition_day1": {
-            "subject": "Swavlamban 2025 - Exhibition Pass (Day 1 - 25 November)",
-            "body": """Dear {name},
-
-Your exhibition pass for Swavlamban 2025 - Day 1 has been generated.
-
-EVENT DETAILS:
-- Date: 25 November 2025 (Monday)
-- Time: 1100 - 1730 hrs
-- Venue: Exhibition Hall, Manekshaw Centre
-
-ACCESS:
-• Exhibition viewing
-• Industry booths and stalls
-• Innovation displays
-
-Please find your pass attached. Print or show this pass on your mobile device at the entry gate.
-
-For support: niio-tdac@navy.gov.in
-
-Best regards,
-Team Swavlamban 2025
-Indian Navy | Innovation & Self-Reliance"""
-        },
-        "exhibition_day2": {
-            "subject": "Swavlamban 2025 - Exhibition Pass (Day 2 - 26 November)",
-            "body": """Dear {name},
+# Providers tried for one message sent outside email_dispatcher (first choice + one failover)
+FAILOVER_ATTEMPTS = 2
 
-Your exhibition pass for Swavlamban 2025 - Day 2 has been generated.
 
-EVENT DETAILS:
-- Date: 26 November 2025 (Tuesday)
-- Time: 1000 - 1730 hrs
-- Venue: Exhibition Hall, Manekshaw Centre
-
-ACCESS:
-• Exhibition viewing
-• Industry booths and stalls
-• Innovation displays
-
-Please find your pass attached. Print or show this pass on your mobile device at the entry gate.
-
-For support: niio-tdac@navy.gov.in
-
-Best regards,
-Team Swavlamban 2025
-Indian Navy | Innovation & Self-Reliance"""
-        },
-        "exhibition_both_days_exhibitor": {
-            "subject": "Swavlamban 2025 - Exhibitor Passes (25-26 November)",
-            "body": """Dear {name},
-
-Your exhibitor passes for Swavlamban 2025 have been generated.
-
-EVENT DETAILS:
-- Dates: 25-26 November 2025
-- Time: Day 1: 1100-1730 hrs | Day 2: 1000-1730 hrs
-- Venue: Exhibition Hall, Manekshaw Centre
-
-STALL SETUP:
-• Venue will be available for stall setup on AM 24 Nov 25
-• Dimensions of stalls: 3m X 2.5m
-
-EXHIBITOR ACCESS:
-• Full access to Exhibition Hall on both days
-• Booth setup and operations
-• Industry interactions
-
-Please find your passes attached. These passes grant access to both days.
-
-For support: niio-tdac@navy.gov.in
-
-Best regards,
-Team Swavlamban 2025
-Indian Navy | Innovation & Self-Reliance"""
-        },
-        "interactive_sessions": {
-            "subject": "Swavlamban 2025 - Panel Discussions Pass (26 November)",
-            "body": """Dear {name},
-
-Your pass for Panel Discussions at Swavlamban 2025 has been generated.
-
-SESSIONS:
-• Panel Discussion I: Future & Emerging Technologies (1030-1130 hrs)
-• Panel Discussion II: Boosting iDEX Ecosystem (1200-1330 hrs)
-
-EVENT DETAILS:
-- Date: 26 November 2025 (Tuesday)
-- Venue: Zorawar Hall, Manekshaw Centre
-
-IMPORTANT:
-• Please arrive by 1020 hrs for Panel I
-• Seating is limited
-• Late entry may not be permitted
-
-Please find your pass attached. Print or show this pass on your mobile device at the entry gate.
-
-For support: niio-tdac@navy.gov.in
-
-Best regards,
-Team Swavlamban 2025
-Indian Navy | Innovation & Self-Reliance"""
-        },
-        "plenary": {
-            "subject": "Swavlamban 2025 - Plenary Session Pass (26 November)",
-            "body": """Dear {name},
-
-Your pass for the Plenary Session at Swavlamban 2025 has been generated.
+class EmailProvider(NamedTuple):
+    """A configured email provider"""
+    key: str  # brevo | mailjet | gmail | nic | mailbluster (rate limits in email_dispatcher)
+    name: str
+    service: object  # BrevoService, MailjetService, ...
+    uses_smtp: bool  # send_email() with attachments as given; False = MailBluster-style API
 
-SESSION DETAILS:
-- Date: 26 November 2025 (Tuesday)
-- Time: 1530 - 1615 hrs
-- Venue: Zorawar Hall, Manekshaw Centre
 
-HIGHLIGHTS:
-• Address by Chief Guest
-• CNS Welcome Address
-• Release of Books/Documents/MoUs
-• Discussions on 'Innovation & Self-reliance'
-
-SPECIAL NOTES:
-• Please be seated by 1620 hrs
-• Formal dress code mandatory
-• Security clearance required
-
-Please find your pass attached. Print or show this pass on your mobile device at the entry gate.
-
-For support: niio-tdac@navy.gov.in
-
-Best regards,
-Team Swavlamban 2025
-Indian Navy | Innovation & Self-Reliance"""
-        }
-    }
+class EmailService:
+    """Unified email service - automatically uses configured provider"""
     
     def __init__(self):
         """Initialize email service based on configuration"""
         self.provider = None
+        self.provider_key = None  # brevo | mailjet | gmail | nic | mailbluster (rate limits in email_dispatcher)
+        self.providers: List[EmailProvider] = []  # Every configured provider, priority order (failover)
+        self.health: Dict[str, ProviderHealth] = {}
         self._initialized = False
 
     def _ensure_provider_initialized(self):
@@ -161,42 +43,43 @@ Indian Navy | Innovation & Self-Reliance"""
 
         print("🔄 Initializing email provider...")
 
-        # Determine which email provider to use (Priority order)
+        # Every configured provider is set up, in priority order. The first one is
+        # the primary; the others take over when it fails, throttles or runs out of quota
         # 1. Brevo API (PRIMARY - formerly Sendinblue) ⚡
         if settings.USE_BREVO and settings.BREVO_API_KEY:
             from .brevo_service import BrevoService
-            self.provider = BrevoService()
-            self.provider_name = "Brevo API"
-            self.uses_smtp = True  # Treats file paths like SMTP (not base64 encoding)
-            print("✅ Using Brevo API (PRIMARY - fast transactional email)")
+            # Accepts attachments like SMTP (not pre-encoded base64)
+            self._add_provider("brevo", "Brevo API", BrevoService(), uses_smtp=True)
+            print("✅ Brevo API configured (fast transactional email)")
         # 2. Mailjet API (STANDBY - fallback if Brevo fails) ⚡
-        elif settings.MAILJET_API_KEY and settings.MAILJET_API_SECRET:
+        if settings.MAILJET_API_KEY and settings.MAILJET_API_SECRET:
             from .mailjet_service import MailjetService
-            self.provider = MailjetService()
-            self.provider_name = "Mailjet API"
-            self.uses_smtp = True  # Treats file paths like SMTP (not base64 encoding)
-            print("✅ Using Mailjet API (STANDBY - ~10s per email)")
-        # 3. Gmail SMTP (Final fallback - personal email)
-        elif settings.USE_GMAIL_SMTP and settings.GMAIL_ADDRESS:
+            self._add_provider("mailjet", "Mailjet API", MailjetService(), uses_smtp=True)
+            print("✅ Mailjet API configured (batch sends up to 50 per call)")
+        # 3. Gmail SMTP (personal email)
+        if settings.USE_GMAIL_SMTP and settings.GMAIL_ADDRESS:
             from .gmail_smtp_service import GmailSMTPService
-            self.provider = GmailSMTPService()
-            self.provider_name = "Gmail SMTP"
-            self.uses_smtp = True
-            print(f"✅ Using Gmail SMTP: {settings.GMAIL_ADDRESS} (Final fallback)")
+            self._add_provider("gmail", "Gmail SMTP", GmailSMTPService(), uses_smtp=True)
+            print(f"✅ Gmail SMTP configured: {settings.GMAIL_ADDRESS}")
         # 4. NIC SMTP (Government email - Official Navy correspondence - SLOW)
-        elif settings.USE_NIC_SMTP and settings.NIC_EMAIL_ADDRESS:
+        if settings.USE_NIC_SMTP and settings.NIC_EMAIL_ADDRESS:
             from .nic_smtp_service import NICSmtpService
-            self.provider = NICSmtpService()
-            self.provider_name = "NIC SMTP (Navy Email)"
-            self.uses_smtp = True
-            print(f"✅ Using NIC SMTP: {settings.NIC_EMAIL_ADDRESS} (SLOW - ~90s per email)")
-        # 4. MailBluster (API-based)
-        elif settings.MAILBLUSTER_API_KEY:
+            self._add_provider("nic", "NIC SMTP (Navy Email)", NICSmtpService(), uses_smtp=True)
+            print(f"✅ NIC SMTP configured: {settings.NIC_EMAIL_ADDRESS} (SLOW)")
+        # 5. MailBluster (API-based)
+        if settings.MAILBLUSTER_API_KEY:
             from .mailbluster_service import MailBlusterService
-            self.provider = MailBlusterService()
-            self.provider_name = "MailBluster"
-            self.uses_smtp = False
-            print("✅ Using MailBluster API")
+            self._add_provider("mailbluster", "MailBluster", MailBlusterService(), uses_smtp=False)
+            print("✅ MailBluster API configured")
+
+        if self.providers:
+            primary = self.providers[0]
+            self.provider = primary.service
+            self.provider_name = primary.name
+            self.provider_key = primary.key
+            self.uses_smtp = primary.uses_smtp
+            print(f"✅ Using {primary.name} (PRIMARY)"
+                  f"{f' - failover: ' + ', '.join(p.name for p in self.providers[1:]) if settings.EMAIL_FAILOVER and len(self.providers) > 1 else ''}")
         # Fallback
         else:
             print("⚠️ Warning: No email service configured!")
@@ -204,219 +87,213 @@ Indian Navy | Innovation & Self-Reliance"""
             self.uses_smtp = False
 
         self._initialized = True
-    
-    def send_pass_email(self, recipient_email: str, recipient_name: str,
-                       pass_files: List[Path], pass_type: str = None) -> bool:
-        """Send pass email with attachments using configured provider"""
 
-        # Ensure provider is initialized (lazy initialization after secrets are loaded)
-        self._ensure_provider_initialized()
+    def _add_provider(self, key: str, name: str, service, uses_smtp: bool):
+        """Register a configured provider with its health record"""
+        self.providers.append(EmailProvider(key, name, service, uses_smtp))
+        # Only a configured cap is enforced locally; otherwise the provider's own
+        # quota replies (429) open the circuit
+        self.health[key] = ProviderHealth(key, getattr(settings, f"EMAIL_DAILY_QUOTA_{key.upper()}", 0))
 
-        # Detect which passes are being sent from filenames
-        pass_types_detected = []
-        has_invitations = False
-
-        for pass_file in pass_files:
-            filename = pass_file.name.lower()
-
-            # Check for invitation images
-            if "inv-" in filename or "invitation" in filename:
-                has_invitations = True
-
-            # Check for QR code passes ONLY (exclude invitation images)
-            # Pass files are named: name_id_passtype.png (e.g., abhishek_1_exhibition_day1_visitor.png)
-            # Invitation files start with "Inv-" and should NOT be counted as passes
-
-            # Skip invitation files from pass type detection
-            if filename.startswith("Inv-") or filename.startswith("inv-"):
-                continue
-
-            if "exhibition_day1" in filename or "ep-25" in filename:
-                if "exhibition_day1" not in pass_types_detected:
-                    pass_types_detected.append("exhibition_day1")
-            elif "exhibition_day2" in filename or "ep-26" in filename:
-                if "exhibition_day2" not in pass_types_detected:
-                    pass_types_detected.append("exhibition_day2")
-            elif "interactive" in filename:
-                if "interactive_sessions" not in pass_types_detected:
-                    pass_types_detected.append("interactive_sessions")
-            elif "plenary" in filename:
-                if "plenary" not in pass_types_detected:
-                    pass_types_detected.append("plenary")
-
-        # Build comprehensive email based on ALL passes being sent
-        # Determine singular/plural for better UX
-        pass_count = len(pass_types_detected)
-        pass_word = "pass" if pass_count == 1 else "passes"
-        subject = f"Swavlamban 2025 - Your Event {pass_word.title()}"
-
-        # Build pass details section with line gaps
-        pass_details = []
-
-        if "exhibition_day1" in pass_types_detected:
-            pass_details.append("""📅 EXHIBITION DAY 1 (25 November 2025)
-- Time: 1100 - 1730 hrs
-- Venue: Exhibition Hall, Manekshaw Centre
-- Access: Exhibition viewing, Industry booths
-""")
-
-        if "exhibition_day2" in pass_types_detected:
-            pass_details.append("""📅 EXHIBITION DAY 2 (26 November 2025)
-- Time: 1000 - 1730 hrs
-- Venue: Exhibition Hall, Manekshaw Centre
-- Access: Exhibition viewing, Industry booths
-""")
-
-        if "interactive_sessions" in pass_types_detected:
-            pass_details.append("""💡 INTERACTIVE SESSIONS (26 November 2025)
-- Session I: Future & Emerging Technologies (1030-1130 hrs)
-- Session II: Boosting iDEX Ecosystem (1200-1330 hrs)
-- Venue: Zorawar Hall, Manekshaw Centre
-""")
-
-        if "plenary" in pass_types_detected:
-            pass_details.append("""🎤 PLENARY SESSION (26 November 2025)
-- Time: 1530 - 1615 hrs
-- Venue: Zorawar Hall, Manekshaw Centre
-- Highlights: Chief Guest Address, Book/MoU Releases
-""")
-
-        # Check if user has Interactive or Plenary but NOT Exhibition Day 2
-        # Add special note about Exhibition Day 2 access
-        has_interactive_or_plenary = ("interactive_sessions" in pass_types_detected or
-                                      "plenary" in pass_types_detected)
-        has_exhibition_day2 = "exhibition_day2" in pass_types_detected
-
-        exhibition_day2_bonus_note = ""
-        if has_interactive_or_plenary and not has_exhibition_day2:
-            exhibition_day2_bonus_note = """
-📝 BONUS ACCESS - EXHIBITION DAY 2:
-Your Interactive/Plenary pass also grants you access to the Exhibition Hall on 26 November 2025 (1000-1730 hrs). Feel free to explore the industry booths and innovation displays!
+    def choose_provider(self, exclude: Iterable[str] = ()) -> Optional[EmailProvider]:
+        """
+        Provider for the next send - the first healthy one in priority order
 
-"""
+        Providers with an open circuit (failing, throttling) or no quota left
+        are skipped. When the first healthy provider is nearly out of daily
+        quota, a growing share of sends goes to the next one instead.
+        With EMAIL_FAILOVER off, only the primary is used.
+
+        Args:
+            exclude: Provider keys not to use (already failed for this message)
+
+        Returns:
+            None if no provider can take a send right now
+        """
+        self._ensure_provider_initialized()
+        if not settings.EMAIL_FAILOVER:
+            # Primary only, always tried - no circuit breaker
+            return next((p for p in self.providers[:1] if p.key not in exclude), None)
+
+        candidates = [p for p in self.providers if p.key not in exclude]
+
+        if len(candidates) > 1:
+            quota_left = self.health[candidates[0].key].quota_left()
+            if quota_left is not None and quota_left < QUOTA_SPLIT_FRACTION \
+                    and random.random() > quota_left / QUOTA_SPLIT_FRACTION:
+                # Spare the primary's last quota - try the others first
+                candidates = candidates[1:] + candidates[:1]
+
+        for provider in candidates:
+            if self.health[provider.key].allow_request():
+                return provider
+        return None
+
+    def release_provider(self, provider: EmailProvider):
+        """Hand back a provider from choose_provider() that was not sent through"""
+        self.health[provider.key].release()
+
+    def record_result(self, provider: EmailProvider, success: bool, latency: float,
+                      retry_after: Optional[float] = None, messages: int = 1):
+        """
+        Record a send outcome in the provider's health
+
+        Args:
+            retry_after: Seconds to hold off a throttling provider (see
+                email_throttle.report_throttled), None if it was not throttled
+            messages: Emails accepted (batch calls)
+        """
+        self.health[provider.key].record(
+            success, latency,
+            throttled=retry_after is not None,
+            retry_after=retry_after or None,
+            messages=messages
+        )
+
+    def retry_in(self, exclude: Iterable[str] = ()) -> float:
+        """Seconds until some provider accepts sends again (0 if one does now)"""
+        self._ensure_provider_initialized()
+        return min(
+            (self.health[p.key].retry_in() for p in self.providers if p.key not in exclude),
+            default=float("inf")
+        )
 
-        # Create comprehensive email body
-        # Capitalize first letter of each word in name (Title Case)
-        formatted_name = recipient_name.title()
+    def provider_stats(self) -> List[dict]:
+        """Health snapshot of every configured provider, priority order"""
+        self._ensure_provider_initialized()
+        return [dict(self.health[p.key].snapshot(), name=p.name) for p in self.providers]
+
+    def _deliver(self, provider: EmailProvider, to_email: str, subject: str, html_content: str,
+                 text_content: str, pass_files: List[AttachmentLike]) -> bool:
+        """One send attempt through one provider"""
+        # SMTP and Brevo/Mailjet providers take paths or in-memory attachments directly
+        if provider.uses_smtp:
+            return provider.service.send_email(
+                to_email=to_email,
+                subject=subject,
+                html_content=html_content,
+                text_content=text_content,
+                attachments=pass_files
+            )
+
+        # API-based providers (MailBluster) use base64 encoded attachments
+        attachments = provider.service.prepare_attachments(pass_files)
+        return provider.service.send_transactional_email(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content,
+            attachments=attachments,
+            from_name="Swavlamban 2025 Team"
+        )
+
+    def _send(self, provider: Optional[EmailProvider], to_email: str, subject: str,
+              html_content: str, text_content: str, pass_files: List[AttachmentLike]) -> bool:
+        """
+        Send through the given provider, or route with failover
 
-        body = f"""Dear {formatted_name},
+        With a provider given (email_dispatcher), this is a single attempt - the
+        caller applies rate limits, records health and fails over. Otherwise the
+        message goes to the best provider and, if that fails, once to the next.
+        """
+        if provider is not None:
+            try:
+                return self._deliver(provider, to_email, subject, html_content, text_content, pass_files)
+            except Exception as e:
+                print(f"❌ Email error ({provider.name}): {e}")
+                return False
 
-Your {pass_word} for Swavlamban 2025 {'has' if pass_count == 1 else 'have'} been generated successfully!
+        tried = []
+        while len(tried) < FAILOVER_ATTEMPTS:
+            provider = self.choose_provider(exclude=tried)
+            if provider is None:
+                print("❌ No email provider available (all failing or out of quota)")
+                return False
+            tried.append(provider.key)
 
-{'='*60}
-YOUR {'PASS' if pass_count == 1 else 'PASSES'}:
-{'='*60}
+            take_throttled()
+            start = time.monotonic()
+            try:
+                success = self._deliver(provider, to_email, subject, html_content, text_content, pass_files)
+            except Exception as e:
+                print(f"❌ Email error ({provider.name}): {e}")
+                success = False
+            self.record_result(provider, success, time.monotonic() - start, take_throttled())
 
-{chr(10).join(pass_details)}
-{exhibition_day2_bonus_note}{'='*60}
-ATTACHMENTS:
-{'='*60}
+            if success:
+                return True
+            if len(tried) < FAILOVER_ATTEMPTS:
+                print(f"🔀 {provider.name} failed for {to_email} - trying the next provider")
 
-✅ Event {pass_word.title()} with QR Code (for entry gate scanning){f"{chr(10)}✅ Invitation Images" if has_invitations else ""}
+        return False
 
-{'='*60}
-IMPORTANT INFORMATION:
-{'='*60}
+    def build_pass_email(self, recipient_name: str, pass_files: List[AttachmentLike],
+                         passes: Optional[PassFlags] = None,
+                         has_invitations: Optional[bool] = None) -> Tuple[str, str, str, List[str]]:
+        """
+        Subject and bodies of a visitor pass email
 
-• PRINT or SHOW the QR code {pass_word} at entry gates
-• Arrive 15 minutes before session start time
-• Valid photo ID required for entry
-• Security clearance mandatory for all sessions
+        Args:
+            passes: Passes attached (the pass types rendered for the entry)
+            has_invitations: Invitation images attached (RenderedEntry.has_invitations)
+            Either one None = detected from the attachment filenames
 
-📍 VENUE LOCATION & NAVIGATION:
-Manekshaw Centre
-Address: H4QW+2MW, Khyber Lines, Delhi Cantonment, New Delhi, Delhi 110010
-🗺️ Open in Google Maps: https://www.google.com/maps/dir/?api=1&destination=28.586103304500742,77.14529897550334
+        Returns:
+            (subject, text body, HTML body, pass types)
+        """
+        if passes is None or has_invitations is None:
+            detected_passes, detected_invitations = detect_passes(pass_files)
+            passes = detected_passes if passes is None else passes
+            has_invitations = detected_invitations if has_invitations is None else has_invitations
 
-📲 EVENT INFORMATION PAGE:
-For complete event details, visit our dedicated information page:
-https://swavlamban2025-info.streamlit.app/
+        subject, body, html_body = email_templates.visitor_email(passes, has_invitations).render(recipient_name)
+        return subject, body, html_body, passes.names
 
-Available information:
-• Venue map & directions (with GPS navigation)
-• Complete event schedule
-• Guidelines (DOs & DON'Ts)
-• FAQs & important contacts
+    def send_pass_email(self, recipient_email: str, recipient_name: str,
+                       pass_files: List[AttachmentLike],
+                       provider: Optional[EmailProvider] = None,
+                       passes: Optional[PassFlags] = None,
+                       has_invitations: Optional[bool] = None) -> bool:
+        """
+        Send pass email with attachments using configured provider
 
-For support or queries, contact:
-📞 011-26771528
-📧 niio-tdac@navy.gov.in
+        Args:
+            passes, has_invitations: What is attached, picks the email template (see build_pass_email)
+            provider: Send through this provider only (email_dispatcher) - by
+                default the best healthy provider is chosen, with failover
+        """
 
-Best regards,
-Team Swavlamban 2025
-Indian Navy | Innovation & Self-Reliance"""
+        # Ensure provider is initialized (lazy initialization after secrets are loaded)
+        self._ensure_provider_initialized()
 
-        html_body = body.replace('\n', '<br>')
+        subject, body, html_body, pass_types_detected = self.build_pass_email(
+            recipient_name, pass_files, passes, has_invitations
+        )
 
-        print(f"📧 Sending email via {self.provider_name}...")
+        print(f"📧 Sending email via {provider.name if provider else self.provider_name}...")
         print(f"   Passes detected: {', '.join(pass_types_detected)}")
         print(f"   Total attachments: {len(pass_files)} (QR passes only)")
 
-        # Use configured email provider
-        if self.provider:
-            try:
-                # SMTP providers (NIC SMTP, Gmail SMTP) use file paths directly
-                if self.uses_smtp:
-                    success = self.provider.send_email(
-                        to_email=recipient_email,
-                        subject=subject,
-                        html_content=html_body,
-                        text_content=body,
-                        attachments=pass_files  # Pass file paths directly
-                    )
-                else:
-                    # API-based providers (MailBluster) use base64 encoded attachments
-                    attachments = []
-                    for pass_file in pass_files:
-                        if not pass_file.exists():
-                            print(f"Warning: Pass file not found: {pass_file}")
-                            continue
-
-                        with open(pass_file, "rb") as f:
-                            file_data = base64.b64encode(f.read()).decode()
-
-                        attachments.append({
-                            "filename": pass_file.name,
-                            "content": file_data,
-                            "type": "image/png"
-                        })
-
-                    success = self.provider.send_transactional_email(
-                        to_email=recipient_email,
-                        subject=subject,
-                        html_content=html_body,
-                        text_content=body,
-                        attachments=attachments,
-                        from_name="Swavlamban 2025 Team"
-                    )
-
-                if success:
-                    print(f"✅ Email sent successfully to {recipient_email} via {self.provider_name}")
-                else:
-                    print(f"❌ Email failed via {self.provider_name}")
-                return success
-
-            except Exception as e:
-                print(f"❌ Email error ({self.provider_name}): {e}")
-                return False
+        # Use configured email provider(s)
+        if self.providers:
+            success = self._send(provider, recipient_email, subject, html_body, body, pass_files)
+            if success:
+                print(f"✅ Email sent successfully to {recipient_email}")
+            else:
+                print(f"❌ Email failed for {recipient_email}")
+            return success
 
         # Fallback to Mailjet (legacy)
         else:
             # Prepare attachments for Mailjet
-            attachments = []
-            for pass_file in pass_files:
-                if not pass_file.exists():
-                    print(f"Warning: Pass file not found: {pass_file}")
-                    continue
-
-                with open(pass_file, "rb") as f:
-                    file_data = base64.b64encode(f.read()).decode()
-
-                attachments.append({
-                    "ContentType": "image/png",
-                    "Filename": pass_file.name,
-                    "Base64Content": file_data
-                })
+            attachments = [
+                {
+                    "ContentType": attachment.mime_type,
+                    "Filename": attachment.filename,
+                    "Base64Content": attachment.to_base64()
+                }
+                for attachment in load_attachments(pass_files)
+            ]
 
             # Prepare email data
             data = {
@@ -448,12 +325,41 @@ Indian Navy | Innovation & Self-Reliance"""
                 print(f"❌ Email error (Mailjet): {e}")
                 return False
 
+    def build_exhibitor_email(self, recipient_name: str, pass_files: List[AttachmentLike],
+                              num_attendees: Optional[int] = None,
+                              has_invitation: Optional[bool] = None) -> Tuple[str, str, str, int]:
+        """
+        Subject and bodies of an exhibitor passes email
+
+        Args:
+            num_attendees: Attendee passes attached (one per exhibitor entry)
+            has_invitation: Invitation card attached (RenderedEntry.has_invitations)
+            Either one None = counted from the attachment filenames
+
+        Returns:
+            (subject, text body, HTML body, number of attendee passes)
+        """
+        if num_attendees is None or has_invitation is None:
+            counted_attendees, counted_invitation = count_exhibitor_passes(pass_files)
+            num_attendees = counted_attendees if num_attendees is None else num_attendees
+            has_invitation = counted_invitation if has_invitation is None else has_invitation
+
+        subject, body, html_body = email_templates.exhibitor_email(num_attendees, has_invitation).render(recipient_name)
+        return subject, body, html_body, num_attendees
+
     def send_exhibitor_bulk_email(self, recipient_email: str, recipient_name: str,
-                                   pass_files: List[Path]) -> bool:
+                                   pass_files: List[AttachmentLike],
+                                   provider: Optional[EmailProvider] = None,
+                                   num_attendees: Optional[int] = None,
+                                   has_invitation: Optional[bool] = None) -> bool:
         """
         Send exhibitor passes email - specifically for bulk exhibitor upload
         This is a dedicated function for exhibitors to avoid modifying visitor email logic
 
+        Args:
+            provider: Send through this provider only (see send_pass_email)
+            num_attendees, has_invitation: What is attached, picks the email template (see build_exhibitor_email)
+
         Expected attachments:
         - Multiple QR passes (EP-25n26.png template with unique QR codes, one per attendee)
         - 1 Exhibitor invitation card (Inv-Exhibitors.png)
@@ -461,155 +367,34 @@ Indian Navy | Innovation & Self-Reliance"""
         # Ensure provider is initialized
         self._ensure_provider_initialized()
 
-        # Count QR passes and check for invitation
-        qr_passes = []
-        has_invitation = False
-
-        for pass_file in pass_files:
-            filename = pass_file.name.lower()
-            if filename.startswith("inv-") or "invitation" in filename:
-                has_invitation = True
-            else:
-                qr_passes.append(pass_file.name)
-
-        num_attendees = len(qr_passes)
-        pass_word = "pass" if num_attendees == 1 else "passes"
-
-        # Format name to Title Case
-        formatted_name = recipient_name.title()
-
-        # Create exhibitor-specific email
-        subject = f"Swavlamban 2025 - Exhibitor {pass_word.title()} (25-26 November)"
-
-        body = f"""Dear {formatted_name},
-
-Your exhibitor {pass_word} for Swavlamban 2025 {'has' if num_attendees == 1 else 'have'} been generated.
-
-{'='*60}
-EVENT DETAILS:
-{'='*60}
-
-• Dates: 25-26 November 2025
-• Time: Day 1: 0930-1730 hrs | Day 2: 1000-1730 hrs
-• Venue: Exhibition Hall, Manekshaw Centre
-• Note: Please arrive by 0930 hrs on Day 1 for inauguration at 1000 hrs
-
-{'='*60}
-STALL SETUP:
-{'='*60}
-
-• Venue will be available for stall setup on AM 24 Nov 25
-• Dimensions of stalls: 3m X 2.5m
-
-{'='*60}
-EXHIBITOR ACCESS:
-{'='*60}
-
-• Full access to Exhibition Hall on both days
-• Booth setup and operations
-• Industry interactions
-
-{'='*60}
-ATTACHMENTS:
-{'='*60}
-
-✅ Event {pass_word.title()} with QR Code (for entry gate scanning){f"{chr(10)}✅ Invitation Card" if has_invitation else ""}
-
-{'='*60}
-IMPORTANT INFORMATION:
-{'='*60}
-
-• PRINT or SHOW the QR code {pass_word} at entry gates
-• Valid Aadhar Card required for entry
-• Security clearance mandatory for all attendees
-
-📍 VENUE LOCATION & NAVIGATION:
-Manekshaw Centre
-Address: H4QW+2MW, Khyber Lines, Delhi Cantonment, New Delhi, Delhi 110010
-🗺️ Open in Google Maps: https://www.google.com/maps/dir/?api=1&destination=28.586103304500742,77.14529897550334
+        subject, body, html_body, num_attendees = self.build_exhibitor_email(
+            recipient_name, pass_files, num_attendees, has_invitation
+        )
 
-📲 EVENT INFORMATION:
-For complete event details, visit https://swavlamban2025-info.streamlit.app
-
-For support or queries, contact:
-📞 011-26771528
-📧 niio-tdac@navy.gov.in
-
-Best regards,
-Team Swavlamban 2025
-Indian Navy | Innovation & Self-Reliance"""
-
-        html_body = body.replace('\n', '<br>')
-
-        print(f"📧 Sending exhibitor email via {self.provider_name}...")
+        print(f"📧 Sending exhibitor email via {provider.name if provider else self.provider_name}...")
         print(f"   Exhibitor: {recipient_name}")
         print(f"   Attendees: {num_attendees}")
         print(f"   Total attachments: {len(pass_files)}")
 
-        # Use configured email provider
-        if self.provider:
-            try:
-                # SMTP providers (NIC SMTP, Gmail SMTP) use file paths directly
-                if self.uses_smtp:
-                    success = self.provider.send_email(
-                        to_email=recipient_email,
-                        subject=subject,
-                        html_content=html_body,
-                        text_content=body,
-                        attachments=pass_files
-                    )
-                else:
-                    # API-based providers (MailBluster) use base64 encoded attachments
-                    attachments = []
-                    for pass_file in pass_files:
-                        if not pass_file.exists():
-                            print(f"Warning: Pass file not found: {pass_file}")
-                            continue
-
-                        with open(pass_file, "rb") as f:
-                            file_data = base64.b64encode(f.read()).decode()
-
-                        attachments.append({
-                            "filename": pass_file.name,
-                            "content": file_data,
-                            "type": "image/png"
-                        })
-
-                    success = self.provider.send_transactional_email(
-                        to_email=recipient_email,
-                        subject=subject,
-                        html_content=html_body,
-                        text_content=body,
-                        attachments=attachments,
-                        from_name="Swavlamban 2025 Team"
-                    )
-
-                if success:
-                    print(f"✅ Exhibitor email sent successfully to {recipient_email}")
-                else:
-                    print(f"❌ Exhibitor email failed")
-                return success
-
-            except Exception as e:
-                print(f"❌ Exhibitor email error: {e}")
-                return False
+        # Use configured email provider(s)
+        if self.providers:
+            success = self._send(provider, recipient_email, subject, html_body, body, pass_files)
+            if success:
+                print(f"✅ Exhibitor email sent successfully to {recipient_email}")
+            else:
+                print(f"❌ Exhibitor email failed")
+            return success
 
         # Fallback to Mailjet (legacy)
         else:
-            attachments = []
-            for pass_file in pass_files:
-                if not pass_file.exists():
-                    print(f"Warning: Pass file not found: {pass_file}")
-                    continue
-
-                with open(pass_file, "rb") as f:
-                    file_data = base64.b64encode(f.read()).decode()
-
-                attachments.append({
-                    "ContentType": "image/png",
-                    "Filename": pass_file.name,
-                    "Base64Content": file_data
-                })
+            attachments = [
+                {
+                    "ContentType": attachment.mime_type,
+                    "Filename": attachment.filename,
+                    "Base64Content": attachment.to_base64()
+                }
+                for attachment in load_attachments(pass_files)
+            ]
 
             data = {
                 'Messages': [{
@@ -641,5 +426,104 @@ Indian Navy | Innovation & Self-Reliance"""
                 return False
 
 
+    def get_batch_limits(self, provider: Optional[EmailProvider] = None) -> Tuple[int, int]:
+        """
+        Largest batch the provider (default: primary) accepts in one API call
+
+        Returns:
+            (messages, payload bytes) - (1, 0) when the provider has no batch API
+            or EMAIL_BATCH_SIZE is 1
+        """
+        self._ensure_provider_initialized()
+        service = provider.service if provider else self.provider
+        if settings.EMAIL_BATCH_SIZE == 1 or not hasattr(service, "send_batch"):
+            return 1, 0
+
+        max_messages = service.MAX_BATCH_MESSAGES
+        if settings.EMAIL_BATCH_SIZE:
+            max_messages = min(max_messages, settings.EMAIL_BATCH_SIZE)
+        return max_messages, service.MAX_BATCH_BYTES
+
+    def send_pass_email_batch(self, messages: List[Dict],
+                              provider: Optional[EmailProvider] = None) -> List[bool]:
+        """
+        Send many personalized pass emails with as few API calls as the provider allows
+
+        Args:
+            messages: Dicts with recipient_email, recipient_name, pass_files,
+                exhibitor (True = exhibitor template) and optionally passes /
+                num_attendees / has_invitations (see build_pass_email /
+                build_exhibitor_email),
+                at most get_batch_limits()
+            provider: Send through this provider (email_dispatcher) - by default
+                the best healthy provider is chosen
+
+        Returns:
+            Success of each message, in the same order
+        """
+        self._ensure_provider_initialized()
+        chosen = provider is None
+        if chosen:
+            provider = self.choose_provider()
+            if provider is None:
+                print("❌ No email provider available (all failing or out of quota)")
+                return [False] * len(messages)
+
+        if not hasattr(provider.service, "send_batch"):
+            # No batch API - one call per message
+            if chosen:
+                # The single sends choose again themselves
+                self.release_provider(provider)
+                provider = None
+            return [
+                self.send_exhibitor_bulk_email(m["recipient_email"], m["recipient_name"], m["pass_files"],
+                                               provider=provider, num_attendees=m.get("num_attendees"),
+                                               has_invitation=m.get("has_invitations"))
+                if m.get("exhibitor") else
+                self.send_pass_email(m["recipient_email"], m["recipient_name"], m["pass_files"],
+                                     provider=provider, passes=m.get("passes"),
+                                     has_invitations=m.get("has_invitations"))
+                for m in messages
+            ]
+
+        batch = []
+        for message in messages:
+            if message.get("exhibitor"):
+                subject, body, html_body, _ = self.build_exhibitor_email(
+                    message["recipient_name"], message["pass_files"],
+                    message.get("num_attendees"), message.get("has_invitations")
+                )
+            else:
+                subject, body, html_body, _ = self.build_pass_email(
+                    message["recipient_name"], message["pass_files"],
+                    message.get("passes"), message.get("has_invitations")
+                )
+
+            batch.append({
+                "to_email": message["recipient_email"],
+                "to_name": message["recipient_name"],
+                "subject": subject,
+                "html_content": html_body,
+                "text_content": body,
+                "attachments": message["pass_files"]
+            })
+
+        print(f"📧 Sending batch of {len(batch)} email(s) via {provider.name}...")
+        start = time.monotonic()
+        try:
+            results = provider.service.send_batch(batch)
+        except Exception as e:
+            print(f"❌ Batch email error ({provider.name}): {e}")
+            results = [False] * len(batch)
+
+        if chosen:
+            # email_dispatcher records its own sends
+            self.record_result(provider, any(results), time.monotonic() - start,
+                               take_throttled(), messages=sum(results))
+
+        print(f"{'✅' if any(results) else '❌'} Batch via {provider.name}: {sum(results)}/{len(results)} accepted")
+        return results
+
+
 # Create singleton instance
 email_service = EmailService()
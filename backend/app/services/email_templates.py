@@ -0,0 +1,315 @@
+"""
+Email templates - Pass email subjects and bodies, compiled once per pass combination
+Each send only substitutes the recipient name into a ready-made text and HTML body
+"""
+import html
+from itertools import product
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from .email_attachments import AttachmentLike
+
+
+class PassFlags(NamedTuple):
+    """Passes attached to a visitor email - the Entry allocation flags of the rendered entry"""
+    exhibition_day1: bool = False
+    exhibition_day2: bool = False
+    interactive_sessions: bool = False
+    plenary: bool = False
+
+    @classmethod
+    def from_entry(cls, entry) -> "PassFlags":
+        """Flags of an Entry (or a copy limited to the selected passes)"""
+        return cls(*(bool(getattr(entry, flag)) for flag in cls._fields))
+
+    @property
+    def names(self) -> List[str]:
+        """Pass types set, in display order"""
+        return [flag for flag, allocated in zip(self._fields, self) if allocated]
+
+
+class EmailTemplate(NamedTuple):
+    """A compiled email - text and HTML bodies split around the recipient name"""
+    subject: str
+    text: Tuple[str, str]  # (before name, after name)
+    html: Tuple[str, str]  # Same, HTML-escaped
+
+    def render(self, recipient_name: str) -> Tuple[str, str, str]:
+        """
+        Subject and bodies for one recipient
+
+        Returns:
+            (subject, text body, HTML body)
+        """
+        name = recipient_name.title()  # Title Case, as in the registration data
+        return (
+            self.subject,
+            self.text[0] + name + self.text[1],
+            self.html[0] + html.escape(name) + self.html[1]
+        )
+
+
+# Where the recipient name goes while a template is compiled
+_NAME_SLOT = "\x00name\x00"
+
+RULE = "=" * 60
+
+# Visitor email section per pass, in PassFlags order
+PASS_SECTIONS = {
+    "exhibition_day1": """📅 EXHIBITION DAY 1 (25 November 2025)
+- Time: 1100 - 1730 hrs
+- Venue: Exhibition Hall, Manekshaw Centre
+- Access: Exhibition viewing, Industry booths
+""",
+    "exhibition_day2": """📅 EXHIBITION DAY 2 (26 November 2025)
+- Time: 1000 - 1730 hrs
+- Venue: Exhibition Hall, Manekshaw Centre
+- Access: Exhibition viewing, Industry booths
+""",
+    "interactive_sessions": """💡 INTERACTIVE SESSIONS (26 November 2025)
+- Session I: Future & Emerging Technologies (1030-1130 hrs)
+- Session II: Boosting iDEX Ecosystem (1200-1330 hrs)
+- Venue: Zorawar Hall, Manekshaw Centre
+""",
+    "plenary": """🎤 PLENARY SESSION (26 November 2025)
+- Time: 1530 - 1615 hrs
+- Venue: Zorawar Hall, Manekshaw Centre
+- Highlights: Chief Guest Address, Book/MoU Releases
+"""
+}
+
+# Interactive/Plenary passes also admit to Exhibition Day 2
+EXHIBITION_DAY2_BONUS_NOTE = """
+📝 BONUS ACCESS - EXHIBITION DAY 2:
+Your Interactive/Plenary pass also grants you access to the Exhibition Hall on 26 November 2025 (1000-1730 hrs). Feel free to explore the industry booths and innovation displays!
+
+"""
+
+
+def _visitor_email(passes: PassFlags, has_invitations: bool) -> Tuple[str, str]:
+    """Subject and text body of a visitor pass email, with the name slot"""
+    pass_count = sum(passes)
+    pass_word = "pass" if pass_count == 1 else "passes"
+    subject = f"Swavlamban 2025 - Your Event {pass_word.title()}"
+
+    pass_details = [PASS_SECTIONS[name] for name in passes.names]
+
+    # Interactive or Plenary but NOT Exhibition Day 2 - mention the Day 2 access
+    exhibition_day2_bonus_note = ""
+    if (passes.interactive_sessions or passes.plenary) and not passes.exhibition_day2:
+        exhibition_day2_bonus_note = EXHIBITION_DAY2_BONUS_NOTE
+
+    body = f"""Dear {_NAME_SLOT},
+
+Your {pass_word} for Swavlamban 2025 {'has' if pass_count == 1 else 'have'} been generated successfully!
+
+{RULE}
+YOUR {'PASS' if pass_count == 1 else 'PASSES'}:
+{RULE}
+
+{chr(10).join(pass_details)}
+{exhibition_day2_bonus_note}{RULE}
+ATTACHMENTS:
+{RULE}
+
+✅ Event {pass_word.title()} with QR Code (for entry gate scanning){f"{chr(10)}✅ Invitation Images" if has_invitations else ""}
+
+{RULE}
+IMPORTANT INFORMATION:
+{RULE}
+
+• PRINT or SHOW the QR code {pass_word} at entry gates
+• Arrive 15 minutes before session start time
+• Valid photo ID required for entry
+• Security clearance mandatory for all sessions
+
+📍 VENUE LOCATION & NAVIGATION:
+Manekshaw Centre
+Address: H4QW+2MW, Khyber Lines, Delhi Cantonment, New Delhi, Delhi 110010
+🗺️ Open in Google Maps: https://www.google.com/maps/dir/?api=1&destination=28.586103304500742,77.14529897550334
+
+📲 EVENT INFORMATION PAGE:
+For complete event details, visit our dedicated information page:
+https://swavlamban2025-info.streamlit.app/
+
+Available information:
+• Venue map & directions (with GPS navigation)
+• Complete event schedule
+• Guidelines (DOs & DON'Ts)
+• FAQs & important contacts
+
+For support or queries, contact:
+📞 011-26771528
+📧 niio-tdac@navy.gov.in
+
+Best regards,
+Team Swavlamban 2025
+Indian Navy | Innovation & Self-Reliance"""
+
+    return subject, body
+
+
+def _exhibitor_email(single: bool, has_invitation: bool) -> Tuple[str, str]:
+    """Subject and text body of an exhibitor passes email, with the name slot"""
+    pass_word = "pass" if single else "passes"
+    subject = f"Swavlamban 2025 - Exhibitor {pass_word.title()} (25-26 November)"
+
+    body = f"""Dear {_NAME_SLOT},
+
+Your exhibitor {pass_word} for Swavlamban 2025 {'has' if single else 'have'} been generated.
+
+{RULE}
+EVENT DETAILS:
+{RULE}
+
+• Dates: 25-26 November 2025
+• Time: Day 1: 0930-1730 hrs | Day 2: 1000-1730 hrs
+• Venue: Exhibition Hall, Manekshaw Centre
+• Note: Please arrive by 0930 hrs on Day 1 for inauguration at 1000 hrs
+
+{RULE}
+STALL SETUP:
+{RULE}
+
+• Venue will be available for stall setup on AM 24 Nov 25
+• Dimensions of stalls: 3m X 2.5m
+
+{RULE}
+EXHIBITOR ACCESS:
+{RULE}
+
+• Full access to Exhibition Hall on both days
+• Booth setup and operations
+• Industry interactions
+
+{RULE}
+ATTACHMENTS:
+{RULE}
+
+✅ Event {pass_word.title()} with QR Code (for entry gate scanning){f"{chr(10)}✅ Invitation Card" if has_invitation else ""}
+
+{RULE}
+IMPORTANT INFORMATION:
+{RULE}
+
+• PRINT or SHOW the QR code {pass_word} at entry gates
+• Valid Aadhar Card required for entry
+• Security clearance mandatory for all attendees
+
+📍 VENUE LOCATION & NAVIGATION:
+Manekshaw Centre
+Address: H4QW+2MW, Khyber Lines, Delhi Cantonment, New Delhi, Delhi 110010
+🗺️ Open in Google Maps: https://www.google.com/maps/dir/?api=1&destination=28.586103304500742,77.14529897550334
+
+📲 EVENT INFORMATION:
+For complete event details, visit https://swavlamban2025-info.streamlit.app
+
+For support or queries, contact:
+📞 011-26771528
+📧 niio-tdac@navy.gov.in
+
+Best regards,
+Team Swavlamban 2025
+Indian Navy | Innovation & Self-Reliance"""
+
+    return subject, body
+
+
+def compile_template(subject: str, body: str) -> EmailTemplate:
+    """Split a text body around its name slot and build the matching HTML body"""
+    html_body = html.escape(body, quote=False).replace("\n", "<br>\n")
+    text_parts = body.split(_NAME_SLOT)
+    html_parts = html_body.split(_NAME_SLOT)
+    assert len(text_parts) == len(html_parts) == 2, "template needs exactly one name slot"
+    return EmailTemplate(subject, tuple(text_parts), tuple(html_parts))
+
+
+def detect_passes(pass_files: Iterable[AttachmentLike]) -> Tuple[PassFlags, bool]:
+    """
+    Passes and invitations in a list of attachments, from their filenames
+
+    Only for callers that do not know what they attached (the bulk queue
+    passes RenderedEntry's pass types and invitations instead).
+
+    Pass files are named name_id_passtype.png (e.g. abhishek_1_exhibition_day1.png),
+    invitation images Inv-*.png.
+
+    Returns:
+        (passes found, whether an invitation image is attached)
+    """
+    found = set()
+    has_invitations = False
+
+    for pass_file in pass_files:
+        filename = pass_file.name.lower()
+
+        # Invitation images are not passes
+        if filename.startswith("inv-") or "invitation" in filename:
+            has_invitations = True
+            continue
+
+        if "exhibition_day1" in filename or "ep-25" in filename:
+            found.add("exhibition_day1")
+        elif "exhibition_day2" in filename or "ep-26" in filename:
+            found.add("exhibition_day2")
+        elif "interactive" in filename:
+            found.add("interactive_sessions")
+        elif "plenary" in filename:
+            found.add("plenary")
+
+    return PassFlags(*(flag in found for flag in PassFlags._fields)), has_invitations
+
+
+def count_exhibitor_passes(pass_files: Iterable[AttachmentLike]) -> Tuple[int, bool]:
+    """
+    Attendee passes and invitation in an exhibitor's attachments, from their filenames
+
+    Only for callers that do not know what they attached (see detect_passes).
+
+    Returns:
+        (number of QR passes, whether an invitation card is attached)
+    """
+    num_attendees = 0
+    has_invitation = False
+
+    for pass_file in pass_files:
+        filename = pass_file.name.lower()
+        if filename.startswith("inv-") or "invitation" in filename:
+            has_invitation = True
+        else:
+            num_attendees += 1
+
+    return num_attendees, has_invitation
+
+
+class EmailTemplates:
+    """
+    Every pass email variant, compiled at startup
+
+    Visitor emails: one per combination of the four pass flags, with and
+    without invitation images (32). Exhibitor emails: one or several
+    passes, with and without the invitation card (4).
+    """
+
+    def __init__(self):
+        self.visitor: Dict[Tuple[PassFlags, bool], EmailTemplate] = {
+            (passes, has_invitations): compile_template(*_visitor_email(passes, has_invitations))
+            for passes in map(PassFlags._make, product((False, True), repeat=len(PassFlags._fields)))
+            for has_invitations in (False, True)
+        }
+        self.exhibitor: Dict[Tuple[bool, bool], EmailTemplate] = {
+            (single, has_invitation): compile_template(*_exhibitor_email(single, has_invitation))
+            for single in (False, True)
+            for has_invitation in (False, True)
+        }
+
+    def visitor_email(self, passes: PassFlags, has_invitations: bool) -> EmailTemplate:
+        """Template of a visitor pass email"""
+        return self.visitor[(PassFlags(*map(bool, passes)), bool(has_invitations))]
+
+    def exhibitor_email(self, num_attendees: int, has_invitation: bool) -> EmailTemplate:
+        """Template of an exhibitor passes email"""
+        return self.exhibitor[(num_attendees == 1, bool(has_invitation))]
+
+
+# Create singleton instance
+email_templates = EmailTemplates()
@@ -0,0 +1,35 @@
+"""
+Email throttle report - How a provider tells its caller a send was rate limited
+Providers report on the sending thread; email_dispatcher and email_service read it back
+"""
+import threading
+from typing import Optional
+
+
+_throttle = threading.local()
+
+
+def report_throttled(retry_after: Optional[float] = None):
+    """
+    Called by a provider when a send was rejected for rate or quota reasons
+    (HTTP 429, SMTP 4xx), so the caller backs off and retries it
+
+    Args:
+        retry_after: Seconds the provider asked to wait, if it said
+    """
+    _throttle.retry_after = retry_after if retry_after is not None else 0.0
+
+
+def take_throttled() -> Optional[float]:
+    """Throttle reported by the last send on this thread (None = not throttled), and reset it"""
+    retry_after = getattr(_throttle, "retry_after", None)
+    _throttle.retry_after = None
+    return retry_after
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds from a Retry-After header value (None if missing or not a number)"""
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,212 @@
+"""
+Entry lookup index - Process-local, read-through cache for online QR verification
+Keeps /scanner/verify off the database during the morning gate rush
+"""
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, NamedTuple, Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from ..models import Entry, EntryTombstone, User
+from .scanner_snapshot import PASS_BITS, pack_passes, scanner_snapshot
+
+
+class EntryRecord(NamedTuple):
+    """Compact view of an entry - everything the gate needs to decide"""
+    entry_id: int
+    id_number: str
+    name: str
+    organization: str
+    qr_signature: str
+    passes: int  # Bitfield, see PASS_BITS
+
+    def has_pass(self, pass_type: str) -> bool:
+        """Check a pass type against the bitfield (unknown pass types are never allocated)"""
+        return bool(self.passes & PASS_BITS.get(pass_type, 0))
+
+
+def normalize_id_number(id_number: str) -> str:
+    """Normalize an ID number the way scanners read it off the QR (no hyphens/spaces, upper-case)"""
+    return id_number.replace("-", "").replace(" ", "").upper() if id_number else ""
+
+
+class EntryLookupIndex:
+    """
+    In-memory index of entries by entry id and normalized ID number
+
+    - Warmed on API startup with a single column query
+    - Read-through: a miss falls back to the database and caches the result
+    - Invalidated by SQLAlchemy events when this process changes an Entry
+    - Revalidated against the entries fingerprint at most every
+      REVALIDATE_SECONDS, to pick up changes made by other processes
+      (Streamlit admin app, SQL editor). Only rows updated or deleted
+      since the last check are reloaded; a full reload happens only when
+      the row count no longer adds up (rows deleted without a tombstone)
+    """
+
+    REVALIDATE_SECONDS = 10
+
+    # Rows changed this long before the last check are reloaded too - a write
+    # that began earlier and committed later carries an older updated_at
+    DELTA_OVERLAP = timedelta(seconds=60)
+
+    def __init__(self):
+        self._by_id: Dict[int, EntryRecord] = {}
+        self._by_id_number: Dict[str, int] = {}
+        self._fingerprint: Optional[str] = None
+        self._synced_at = None  # Database clock at the last (re)load
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # One revalidation at a time
+
+    def _query(self, db: Session):
+        """Column-only query - no ORM objects or relationship loads"""
+        return db.query(
+            Entry.id, Entry.id_number, Entry.name, User.organization,
+            Entry.exhibition_day1, Entry.exhibition_day2, Entry.interactive_sessions,
+            Entry.plenary, Entry.is_exhibitor_pass
+        ).outerjoin(User, User.username == Entry.username)
+
+    @staticmethod
+    def _to_record(row) -> EntryRecord:
+        return EntryRecord(
+            entry_id=row.id,
+            id_number=row.id_number,
+            name=row.name,
+            organization=row.organization or "",
+            qr_signature=(row.id_number or "").replace("-", ""),
+            passes=pack_passes(row)
+        )
+
+    def _store(self, record: EntryRecord):
+        previous = self._by_id.get(record.entry_id)
+        if previous and previous.id_number != record.id_number:
+            self._by_id_number.pop(normalize_id_number(previous.id_number), None)
+        self._by_id[record.entry_id] = record
+        self._by_id_number[normalize_id_number(record.id_number)] = record.entry_id
+
+    def warm(self, db: Session) -> int:
+        """Load every entry into the index; returns the number of entries"""
+        synced_at = db.scalar(select(func.now()))
+        fingerprint = scanner_snapshot.get_fingerprint(db)
+        records = [self._to_record(row) for row in self._query(db)]
+
+        with self._lock:
+            self._by_id.clear()
+            self._by_id_number.clear()
+            for record in records:
+                self._store(record)
+            self._fingerprint = fingerprint
+            self._synced_at = synced_at
+            self._checked_at = time.monotonic()
+
+        print(f"⚡ Entry lookup index warmed: {len(records)} entries")
+        return len(records)
+
+    def invalidate(self, entry_id: Optional[int] = None):
+        """Drop one entry (or everything) so the next lookup reads through"""
+        with self._lock:
+            if entry_id is None:
+                self._by_id.clear()
+                self._by_id_number.clear()
+                self._fingerprint = None
+                return
+
+            record = self._by_id.pop(entry_id, None)
+            if record:
+                self._by_id_number.pop(normalize_id_number(record.id_number), None)
+
+    def _revalidate(self, db: Session):
+        """Pick up entries another process changed since the last check"""
+        now = time.monotonic()
+        if self._fingerprint is not None and now - self._checked_at < self.REVALIDATE_SECONDS:
+            return
+
+        # Requests arriving meanwhile keep answering from the current index
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            fingerprint = scanner_snapshot.get_fingerprint(db)
+            if fingerprint == self._fingerprint:
+                self._checked_at = now
+            elif self._fingerprint is None or self._synced_at is None:
+                self.warm(db)
+            else:
+                self._apply_changes(db, fingerprint)
+        finally:
+            self._refresh_lock.release()
+
+    def _apply_changes(self, db: Session, fingerprint: str):
+        """Reload rows updated and drop rows deleted since the last check"""
+        synced_at = db.scalar(select(func.now()))
+        since = self._synced_at - self.DELTA_OVERLAP
+
+        records = [self._to_record(row) for row in self._query(db).filter(Entry.updated_at >= since)]
+        deleted_ids = db.scalars(
+            select(EntryTombstone.entry_id).filter(EntryTombstone.deleted_at >= since)
+        ).all()
+
+        with self._lock:
+            for entry_id in deleted_ids:
+                record = self._by_id.pop(entry_id, None)
+                if record:
+                    self._by_id_number.pop(normalize_id_number(record.id_number), None)
+            for record in records:
+                self._store(record)
+            cached = len(self._by_id)
+
+        # Rows deleted without a tombstone (SQL editor) - only a full reload finds them
+        if cached != db.query(func.count(Entry.id)).scalar():
+            self.warm(db)
+            return
+
+        with self._lock:
+            self._fingerprint = fingerprint
+            self._synced_at = synced_at
+            self._checked_at = time.monotonic()
+
+    def get_by_id(self, db: Session, entry_id: int) -> Optional[EntryRecord]:
+        """Look up an entry by primary key"""
+        self._revalidate(db)
+
+        record = self._by_id.get(entry_id)
+        if record is None:
+            row = self._query(db).filter(Entry.id == entry_id).first()
+            if row is None:
+                return None
+            record = self._to_record(row)
+            with self._lock:
+                self._store(record)
+        return record
+
+    def get_by_id_number(self, db: Session, id_number: str) -> Optional[EntryRecord]:
+        """Look up an entry by ID number as printed on the QR code (hyphens ignored)"""
+        self._revalidate(db)
+
+        entry_id = self._by_id_number.get(normalize_id_number(id_number))
+        if entry_id is not None and entry_id in self._by_id:
+            return self._by_id[entry_id]
+
+        # Read-through on the raw value (ID numbers are stored as entered)
+        row = self._query(db).filter(Entry.id_number == id_number).first()
+        if row is None:
+            return None
+        record = self._to_record(row)
+        with self._lock:
+            self._store(record)
+        return record
+
+
+# Create singleton instance
+entry_index = EntryLookupIndex()
+
+
+@event.listens_for(Entry, "after_insert")
+@event.listens_for(Entry, "after_update")
+@event.listens_for(Entry, "after_delete")
+def _invalidate_entry_index(mapper, connection, target):
+    """Keep this process's index in step with ORM writes to entries"""
+    entry_index.invalidate(target.id)
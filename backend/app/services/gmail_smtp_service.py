@@ -3,15 +3,15 @@ Gmail SMTP Integration Service
 Free email sending using Gmail SMTP (no third-party service required)
 """
 import smtplib
-import base64
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-from pathlib import Path
 from typing import List, Optional
 
 from ..core.config import settings
+from .email_attachments import AttachmentLike, load_attachments
+from .email_dispatcher import email_dispatcher
+from .email_throttle import report_throttled
+from .smtp_pool import SMTPConnectionPool
 
 
 class GmailSMTPService:
@@ -24,8 +24,23 @@ class GmailSMTPService:
         self.sender_email = settings.GMAIL_ADDRESS
         self.sender_password = settings.GMAIL_APP_PASSWORD
 
+        # Logged-in connections shared by sends, one per concurrent sender by default
+        pool_size = settings.SMTP_POOL_SIZE or email_dispatcher.get_limits("gmail")["max_in_flight"]
+        self.pool = SMTPConnectionPool("Gmail SMTP", self._connect, pool_size)
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open, secure and authenticate a new connection (pool factory)"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
+        try:
+            server.starttls()  # Secure connection
+            server.login(self.sender_email, self.sender_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
     def send_email(self, to_email: str, subject: str, html_content: str,
-                   text_content: str = "", attachments: List[str] = None) -> bool:
+                   text_content: str = "", attachments: List[AttachmentLike] = None) -> bool:
         """
         Send email via Gmail SMTP
 
@@ -34,7 +49,7 @@ class GmailSMTPService:
             subject: Email subject
             html_content: HTML email body
             text_content: Plain text email body (optional)
-            attachments: List of file paths to attach
+            attachments: File paths or in-memory EmailAttachments to attach
 
         Returns:
             bool: True if successful, False otherwise
@@ -55,35 +70,25 @@ class GmailSMTPService:
             msg.attach(part2)
 
             # Add attachments
-            if attachments:
-                for file_path in attachments:
-                    if Path(file_path).exists():
-                        with open(file_path, 'rb') as f:
-                            part = MIMEBase('application', 'octet-stream')
-                            part.set_payload(f.read())
-                            encoders.encode_base64(part)
-                            part.add_header(
-                                'Content-Disposition',
-                                f'attachment; filename={Path(file_path).name}'
-                            )
-                            msg.attach(part)
-
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()  # Secure connection
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
+            for attachment in load_attachments(attachments):
+                msg.attach(attachment.to_mime())
+
+            # Send email on a pooled connection
+            self.pool.send_message(msg)
 
             print(f"✅ Email sent successfully to {to_email}")
             return True
 
         except Exception as e:
             print(f"❌ Failed to send email to {to_email}: {e}")
+            if isinstance(e, smtplib.SMTPResponseException) and 400 <= e.smtp_code < 500:
+                # Transient SMTP rejection (rate/quota) - the dispatcher backs off and retries
+                report_throttled()
             return False
 
     def send_bulk_email(self, recipients: List[str], subject: str,
                        html_content: str, text_content: str = "",
-                       attachments: List[str] = None) -> dict:
+                       attachments: List[AttachmentLike] = None) -> dict:
         """
         Send bulk emails to multiple recipients
         Uses PERSISTENT CONNECTION for faster bulk sending
@@ -93,62 +98,45 @@ class GmailSMTPService:
             subject: Email subject
             html_content: HTML email body
             text_content: Plain text email body
-            attachments: List of file paths to attach
+            attachments: File paths or in-memory EmailAttachments to attach
 
         Returns:
             dict: {"success": count, "failed": count}
         """
         results = {"success": 0, "failed": 0}
 
-        try:
-            # OPTIMIZATION: Reuse single SMTP connection for all emails
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                print(f"✅ Connected to Gmail SMTP for bulk sending ({len(recipients)} emails)")
-
-                for email in recipients:
-                    try:
-                        # Create message for this recipient
-                        msg = MIMEMultipart('alternative')
-                        msg['From'] = f"Swavlamban 2025 <{self.sender_email}>"
-                        msg['To'] = email
-                        msg['Subject'] = subject
-
-                        # Add text and HTML parts
-                        if text_content:
-                            part1 = MIMEText(text_content, 'plain')
-                            msg.attach(part1)
-
-                        part2 = MIMEText(html_content, 'html')
-                        msg.attach(part2)
-
-                        # Add attachments
-                        if attachments:
-                            for file_path in attachments:
-                                if Path(file_path).exists():
-                                    with open(file_path, 'rb') as f:
-                                        part = MIMEBase('application', 'octet-stream')
-                                        part.set_payload(f.read())
-                                        encoders.encode_base64(part)
-                                        part.add_header(
-                                            'Content-Disposition',
-                                            f'attachment; filename={Path(file_path).name}'
-                                        )
-                                        msg.attach(part)
-
-                        # Send using persistent connection
-                        server.send_message(msg)
-                        results["success"] += 1
-                        print(f"✅ Sent to {email}")
-
-                    except Exception as e:
-                        results["failed"] += 1
-                        print(f"❌ Failed to send to {email}: {e}")
-
-        except Exception as e:
-            print(f"❌ Bulk email connection failed: {e}")
-            results["failed"] = len(recipients) - results["success"]
+        # Read attachments once for all recipients
+        attachments = load_attachments(attachments)
+
+        # Pooled connections are reused across recipients (and across bulk calls)
+        print(f"📨 Sending via Gmail SMTP pool ({len(recipients)} emails)")
+        for email in recipients:
+            try:
+                # Create message for this recipient
+                msg = MIMEMultipart('alternative')
+                msg['From'] = f"Swavlamban 2025 <{self.sender_email}>"
+                msg['To'] = email
+                msg['Subject'] = subject
+
+                # Add text and HTML parts
+                if text_content:
+                    part1 = MIMEText(text_content, 'plain')
+                    msg.attach(part1)
+
+                part2 = MIMEText(html_content, 'html')
+                msg.attach(part2)
+
+                # Add attachments
+                for attachment in attachments:
+                    msg.attach(attachment.to_mime())
+
+                self.pool.send_message(msg)
+                results["success"] += 1
+                print(f"✅ Sent to {email}")
+
+            except Exception as e:
+                results["failed"] += 1
+                print(f"❌ Failed to send to {email}: {e}")
 
         return results
 
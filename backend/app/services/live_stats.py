@@ -0,0 +1,116 @@
+"""
+Live gate throughput - In-memory check-in counters for the live dashboard
+Updated by the scanner check-in endpoints after each commit, never re-queried
+"""
+import calendar
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import CheckIn, ReEntry
+
+
+def _epoch(value: Optional[datetime]) -> float:
+    """Epoch seconds for a timestamp (naive values are treated as UTC)"""
+    if value is None:
+        return time.time()
+    return calendar.timegm(value.utctimetuple())
+
+
+class GateThroughputTracker:
+    """
+    Per-gate and per-session check-in counters plus a per-minute timeline
+
+    Counters live in process memory. They are seeded from the database once
+    on startup and then only incremented, so streaming them costs nothing.
+    With several API workers each worker sees its own share of check-ins.
+    """
+
+    WINDOW_MINUTES = 15  # Per-minute history kept for the rate charts
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._minutes: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self._backlog: Dict[str, float] = {}
+        self._last_scan: Dict[str, float] = {}
+        self.version = 0  # Bumped on every change - lets streams skip idle ticks
+
+    def seed(self, db: Session):
+        """
+        Load current totals from the database (one GROUP BY query per table)
+
+        Totals count every scan - first entries and re-entries - the same
+        as record() and GET /scanner/stats total_scans.
+        """
+        rows = []
+        for model in (CheckIn, ReEntry):
+            rows.extend(db.query(
+                model.gate_number, model.session_type, func.count(model.id)
+            ).group_by(model.gate_number, model.session_type).all())
+
+        with self._lock:
+            self._totals.clear()
+            for gate_number, session_type, count in rows:
+                self._totals[gate_number or "Unknown"][session_type] += count
+            self.version += 1
+
+    def record(self, gate_number: Optional[str], session_type: str,
+               check_in_time: Optional[datetime] = None):
+        """Count one committed scan (first entry or re-entry)"""
+        gate = gate_number or "Unknown"
+        now = time.time()
+        scanned_at = _epoch(check_in_time)
+
+        with self._lock:
+            self._totals[gate][session_type] += 1
+            self._minutes[gate][int(scanned_at // 60)] += 1
+            # How far behind the scanner's upload is (offline backlog building up)
+            self._backlog[gate] = max(0.0, now - scanned_at)
+            self._last_scan[gate] = max(self._last_scan.get(gate, 0.0), scanned_at)
+            self.version += 1
+
+    def snapshot(self) -> dict:
+        """Current counters per gate, ready to serialize"""
+        current_minute = int(time.time() // 60)
+        oldest_minute = current_minute - self.WINDOW_MINUTES + 1
+
+        with self._lock:
+            gates = {}
+            for gate in sorted(set(self._totals) | set(self._minutes)):
+                minutes = self._minutes[gate]
+                for minute in [m for m in minutes if m < oldest_minute]:
+                    del minutes[minute]
+
+                per_minute = [minutes.get(m, 0) for m in range(oldest_minute, current_minute + 1)]
+                last_5 = per_minute[-5:]
+                previous_5 = per_minute[-10:-5]
+
+                gates[gate] = {
+                    "total": sum(self._totals[gate].values()),
+                    "sessions": dict(self._totals[gate]),
+                    "scans_per_minute": per_minute,  # Oldest first, last item = current minute
+                    "rate_5m": round(sum(last_5) / 5, 1),
+                    # Positive = load rising vs the 5 minutes before (queue likely forming)
+                    "trend": round((sum(last_5) - sum(previous_5)) / 5, 1),
+                    "sync_backlog_seconds": round(self._backlog.get(gate, 0.0)),
+                    "last_scan_time": (
+                        datetime.utcfromtimestamp(self._last_scan[gate]).isoformat() + "Z"
+                        if gate in self._last_scan else None
+                    )
+                }
+
+            return {
+                "generated_at": datetime.utcnow().isoformat() + "Z",
+                "window_minutes": self.WINDOW_MINUTES,
+                "gates": gates
+            }
+
+
+# Create singleton instance
+live_stats = GateThroughputTracker()
@@ -3,12 +3,12 @@ MailBluster API Integration Service
 Handles email sending via MailBluster API
 """
 import requests
-import base64
-from pathlib import Path
 from typing import List, Optional, Dict
 from datetime import datetime
 
 from ..core.config import settings
+from .email_attachments import AttachmentLike, load_attachments
+from .email_throttle import parse_retry_after, report_throttled
 
 
 class MailBlusterService:
@@ -116,6 +116,9 @@ class MailBlusterService:
                 return True
             else:
                 print(f"MailBluster send error: {response.status_code} - {response.text}")
+                if response.status_code == 429:
+                    # Rate limited - the dispatcher backs off and retries
+                    report_throttled(parse_retry_after(response.headers.get('Retry-After')))
                 return False
 
         except Exception as e:
@@ -158,7 +161,18 @@ class MailBlusterService:
 
         return results
 
-    def send_pass_email(self, to_email: str, name: str, pass_files: List[str],
+    def prepare_attachments(self, attachments: List[AttachmentLike]) -> List[Dict]:
+        """Attachments in the MailBluster payload format (base64 content)"""
+        return [
+            {
+                "filename": attachment.filename,
+                "content": attachment.to_base64(),
+                "type": attachment.mime_type
+            }
+            for attachment in load_attachments(attachments)
+        ]
+
+    def send_pass_email(self, to_email: str, name: str, pass_files: List[AttachmentLike],
                        pass_type: str = "exhibition_day1") -> bool:
         """
         Send event pass email with QR code attachments
@@ -166,7 +180,7 @@ class MailBlusterService:
         Args:
             to_email: Recipient email
             name: Recipient name
-            pass_files: List of pass file paths
+            pass_files: Pass files (paths or in-memory EmailAttachments)
             pass_type: Type of pass (determines email template)
 
         Returns:
@@ -337,16 +351,7 @@ class MailBlusterService:
             template = templates.get(pass_type, templates["exhibition_day1"])
 
             # Prepare attachments
-            attachments = []
-            for pass_file in pass_files:
-                if Path(pass_file).exists():
-                    with open(pass_file, 'rb') as f:
-                        file_content = base64.b64encode(f.read()).decode('utf-8')
-                        attachments.append({
-                            "filename": Path(pass_file).name,
-                            "content": file_content,
-                            "type": "image/png"
-                        })
+            attachments = self.prepare_attachments(pass_files)
 
             # Send email
             return self.send_transactional_email(
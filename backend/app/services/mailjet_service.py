@@ -5,17 +5,23 @@ Much faster than SMTP (10s vs 90s per email)
 Uses official mailjet-rest library (proven to work in 2024)
 """
 from mailjet_rest import Client
-import base64
 import time
-from pathlib import Path
 from typing import List, Optional
 
 from ..core.config import settings
+from .email_attachments import AttachmentLike, load_attachments
+from .email_throttle import parse_retry_after, report_throttled
 
 
 class MailjetService:
     """Service for sending emails via Mailjet API v3.1"""
 
+    # Send API v3.1 accepts up to 50 messages per call
+    MAX_BATCH_MESSAGES = 50
+    # Attachment bytes (base64) per call - Mailjet's 15 MB message limit, applied to the
+    # whole request so one large batch cannot be rejected or hold too much memory
+    MAX_BATCH_BYTES = 15 * 1024 * 1024
+
     def __init__(self):
         """Initialize Mailjet API service using official mailjet-rest library"""
         self.api_key = settings.MAILJET_API_KEY
@@ -24,7 +30,7 @@ class MailjetService:
         self.sender_name = "Swavlamban 2025"
 
     def send_email(self, to_email: str, subject: str, html_content: str,
-                   text_content: str = "", attachments: List[str] = None) -> bool:
+                   text_content: str = "", attachments: List[AttachmentLike] = None) -> bool:
         """
         Send email via Mailjet API v3.1 using official mailjet-rest library
 
@@ -33,7 +39,7 @@ class MailjetService:
             subject: Email subject
             html_content: HTML email body
             text_content: Plain text email body (optional)
-            attachments: List of file paths to attach
+            attachments: File paths or in-memory EmailAttachments to attach
 
         Returns:
             bool: True if successful, False otherwise
@@ -70,27 +76,12 @@ class MailjetService:
             attachment_start = time.time()
             if attachments:
                 message["Attachments"] = []
-                for file_path in attachments:
-                    if Path(file_path).exists():
-                        with open(file_path, 'rb') as f:
-                            file_data = f.read()
-                            file_name = Path(file_path).name
-
-                            # Determine content type based on extension
-                            if file_name.endswith('.png'):
-                                content_type = "image/png"
-                            elif file_name.endswith('.jpg') or file_name.endswith('.jpeg'):
-                                content_type = "image/jpeg"
-                            elif file_name.endswith('.pdf'):
-                                content_type = "application/pdf"
-                            else:
-                                content_type = "application/octet-stream"
-
-                            message["Attachments"].append({
-                                "ContentType": content_type,
-                                "Filename": file_name,
-                                "Base64Content": base64.b64encode(file_data).decode('utf-8')
-                            })
+                for attachment in load_attachments(attachments):
+                    message["Attachments"].append({
+                        "ContentType": attachment.mime_type,
+                        "Filename": attachment.filename,
+                        "Base64Content": attachment.to_base64()
+                    })
             attachment_time = time.time() - attachment_start
 
             # Build full payload
@@ -130,6 +121,9 @@ class MailjetService:
             else:
                 print(f"❌ Mailjet API request failed with status {result.status_code}")
                 print(f"   Response: {result.json()}")
+                if result.status_code == 429:
+                    # Rate limited - the dispatcher backs off and retries
+                    report_throttled(parse_retry_after(result.headers.get('Retry-After')))
                 return False
 
         except Exception as e:
@@ -138,7 +132,7 @@ class MailjetService:
 
     def send_bulk_email(self, recipients: List[dict], subject: str,
                        html_content: str, text_content: str = "",
-                       attachments: List[str] = None) -> dict:
+                       attachments: List[AttachmentLike] = None) -> dict:
         """
         Send bulk emails via Mailjet API v3.1 using official mailjet-rest library
 
@@ -147,7 +141,7 @@ class MailjetService:
             subject: Email subject
             html_content: HTML email body
             text_content: Plain text email body (optional)
-            attachments: List of file paths to attach
+            attachments: File paths or in-memory EmailAttachments to attach
 
         Returns:
             dict: Results with success_count, failed_count, and errors
@@ -167,27 +161,12 @@ class MailjetService:
             # Prepare attachments once (reused for all messages)
             attachment_list = []
             if attachments:
-                for file_path in attachments:
-                    if Path(file_path).exists():
-                        with open(file_path, 'rb') as f:
-                            file_data = f.read()
-                            file_name = Path(file_path).name
-
-                            # Determine content type
-                            if file_name.endswith('.png'):
-                                content_type = "image/png"
-                            elif file_name.endswith('.jpg') or file_name.endswith('.jpeg'):
-                                content_type = "image/jpeg"
-                            elif file_name.endswith('.pdf'):
-                                content_type = "application/pdf"
-                            else:
-                                content_type = "application/octet-stream"
-
-                            attachment_list.append({
-                                "ContentType": content_type,
-                                "Filename": file_name,
-                                "Base64Content": base64.b64encode(file_data).decode('utf-8')
-                            })
+                for attachment in load_attachments(attachments):
+                    attachment_list.append({
+                        "ContentType": attachment.mime_type,
+                        "Filename": attachment.filename,
+                        "Base64Content": attachment.to_base64()
+                    })
 
             # Create message for each recipient
             for recipient in recipients:
@@ -263,3 +242,99 @@ class MailjetService:
                 'failed_count': len(recipients) if recipients else 0,
                 'errors': [{'error': str(e)}]
             }
+
+    def _batch_message(self, message: dict) -> dict:
+        """Mailjet message for one send_batch entry"""
+        payload = {
+            "From": {
+                "Email": self.sender_email,
+                "Name": self.sender_name
+            },
+            "To": [
+                {
+                    "Email": message["to_email"],
+                    "Name": message.get("to_name", "")
+                }
+            ],
+            "Subject": message["subject"],
+            "HTMLPart": message["html_content"]
+        }
+
+        if message.get("text_content"):
+            payload["TextPart"] = message["text_content"]
+
+        attachments = load_attachments(message.get("attachments"))
+        if attachments:
+            payload["Attachments"] = [
+                {
+                    "ContentType": attachment.mime_type,
+                    "Filename": attachment.filename,
+                    "Base64Content": attachment.to_base64()
+                }
+                for attachment in attachments
+            ]
+
+        return payload
+
+    def send_batch(self, messages: List[dict], _retry: bool = True) -> List[bool]:
+        """
+        Send personalized messages (own recipient, body and attachments each) in one API call
+
+        Args:
+            messages: Dicts with to_email, to_name, subject, html_content,
+                text_content and attachments - at most MAX_BATCH_MESSAGES
+
+        Returns:
+            Success of each message, in the same order
+        """
+        start_time = time.time()
+
+        mailjet = Client(
+            auth=(self.api_key, self.api_secret),
+            version='v3.1'
+        )
+
+        result = mailjet.send.create(data={
+            "Messages": [self._batch_message(message) for message in messages]
+        })
+        api_time = time.time() - start_time
+
+        try:
+            statuses = result.json().get("Messages", [])
+        except ValueError:
+            statuses = []
+
+        print(f"📬 Mailjet batch API Response: Status={result.status_code}, "
+              f"Messages={len(messages)}, Time={api_time:.1f}s")
+
+        if result.status_code == 429:
+            # Rate limited - nothing was sent; the dispatcher backs off and retries
+            report_throttled(parse_retry_after(result.headers.get('Retry-After')))
+            return [False] * len(messages)
+
+        if len(statuses) != len(messages):
+            print(f"❌ Mailjet batch API request failed with status {result.status_code}")
+            print(f"   Response: {result.text[:500]}")
+            return [False] * len(messages)
+
+        # Response statuses are in request order
+        results = []
+        for message, status in zip(messages, statuses):
+            results.append(status.get("Status") == "success")
+            if status.get("Status") == "error":
+                for error in status.get("Errors", []):
+                    print(f"   ❌ {message['to_email']}: {error.get('ErrorMessage', 'Unknown error')}")
+
+        if result.status_code != 200 and _retry:
+            # An invalid message fails the whole call (400) - resend the others once
+            # without it; messages already reported as sent are not resent
+            resend = [
+                index for index, status in enumerate(statuses)
+                if status.get("Status") not in ("success", "error")
+            ]
+            if resend:
+                print(f"🔄 Resending {len(resend)} valid message(s) from the rejected batch")
+                for index, success in zip(resend, self.send_batch([messages[i] for i in resend], _retry=False)):
+                    results[index] = success
+
+        return results
@@ -1,20 +1,85 @@
 """
 Pass generation service - QR code generation and overlay on pass templates
 """
+import io
+import math
 import qrcode
 import json
+import numpy as np
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 from PIL import Image, ImageDraw, ImageFont
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
 from ..core.config import settings
 from ..core.security import hash_id_number, create_hmac_signature
 from ..models import Entry
+from .email_attachments import EmailAttachment
+
+
+class RenderedEntry(NamedTuple):
+    """An entry's passes as rendered by generate_passes_for_entries"""
+    entry: Entry
+    files: List[Union[EmailAttachment, Path]]  # As returned by generate_passes_for_entry
+    pass_types: List[str]  # Passes rendered (determine_passes_needed names), same order as files
+    error: Optional[str] = None  # A pass failed to render - files is empty, nothing may be sent
+    has_invitations: bool = False  # files ends with invitation images (get_additional_attachments)
+
+
+def _warm_worker():
+    """
+    Make sure a worker has every pass template decoded before its first job
+
+    Forkserver workers inherit the templates already decoded by the server
+    (pass_template_preload), so this only checks the cache; spawned workers
+    decode their own copy here.
+    """
+    pass_generator.warm_templates()
+
+
+def _render_pass_job(template_path: str, qr_data: str, filename: str) -> EmailAttachment:
+    """Render one pass in a worker process (module level so it can be pickled)"""
+    return pass_generator.render_pass(Path(template_path), qr_data, filename)
 
 
 class PassGenerator:
     """Service for generating event passes with QR codes"""
+
+    # Entries rendered ahead of the consumer, per worker process
+    RENDER_WINDOW_PER_WORKER = 4
+
+    # EXACT 2024 colors - Brown on Beige for ALL passes
+    QR_FILL_COLOR = (0x8B, 0x45, 0x13)  # #8B4513
+    QR_BACK_COLOR = (0xF5, 0xDE, 0xB3)  # #F5DEB3
+
+    # Pass image encoding profiles (selected with PASS_ENCODING_PROFILE)
+    # - png: Pillow defaults (zlib level 6) - the original output
+    # - png-optimized: same pixels, smallest lossless PNG, slower to encode
+    # - png-palette: 256-colour PNG; the palette is built per template and
+    #   always contains the two QR colours, so QR modules are unchanged
+    # - jpeg / webp: lossy, smallest; quality from PASS_IMAGE_QUALITY if set
+    # Compare them on the real templates with: python check_pass_encoding.py
+    PASS_ENCODING_PROFILES = {
+        "png": {"format": "PNG"},
+        "png-optimized": {"format": "PNG", "optimize": True},
+        "png-palette": {"format": "PNG", "optimize": True, "palette_colors": 256},
+        "jpeg": {"format": "JPEG", "quality": 85, "optimize": True},
+        "webp": {"format": "WEBP", "quality": 85, "method": 4}
+    }
+
+    # Image format -> (file extension, MIME type)
+    ENCODING_FORMATS = {
+        "PNG": (".png", "image/png"),
+        "JPEG": (".jpg", "image/jpeg"),
+        "WEBP": (".webp", "image/webp")
+    }
     
     # Pass template mappings (as per user's practical structure)
     PASS_TEMPLATES = {
@@ -78,16 +143,25 @@ class PassGenerator:
             base_dir = Path(__file__).parent.parent.parent.parent
             self.images_dir = base_dir / settings.IMAGE_ASSETS_DIR.lstrip("../")
         
+        # Only for scripts that save passes locally; generated passes are kept in memory
         self.output_dir = Path(settings.PASS_OUTPUT_DIR)
         if not self.output_dir.is_absolute():
             base_dir = Path(__file__).parent.parent.parent.parent
             self.output_dir = base_dir / settings.PASS_OUTPUT_DIR.lstrip("../")
         
-        # Create output directory
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        
         # Pass templates directory
         self.passes_dir = self.images_dir / "Passes"
+
+        # Decoded pass templates: path -> (mtime, RGB image); see get_template()
+        self._templates: Dict[str, Tuple[float, Image.Image]] = {}
+        self._templates_lock = threading.Lock()
+
+        # Quantization palettes: (path, colours) -> (mtime, palette image); see get_pass_palette()
+        self._palettes: Dict[Tuple[str, int], Tuple[float, Image.Image]] = {}
+
+        # Worker pool for generate_passes_for_entries (created on first use)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_workers = 0
     
     def generate_qr_data(self, entry: Entry, pass_type: str, username: str) -> str:
         """Generate clean text format QR data"""
@@ -115,13 +189,22 @@ Valid for entry on specified date and session only."""
 
         return qr_text
     
-    def create_qr_image(self, qr_data: str, pass_type: str, template_filename: str) -> Image.Image:
-        """Create QR code - EXACT 2024 code"""
+    def create_qr_image(self, qr_data: str, pass_type: str, template_filename: str,
+                        size: Optional[int] = None) -> Image.Image:
+        """
+        Create QR code - EXACT 2024 code
+
+        With size, the QR code is drawn directly at size x size pixels (see
+        rasterize_qr) instead of at box_size=10 for compose_pass to resize.
+        """
         # EXACT 2024 QR generation
         qr = qrcode.QRCode(version=1, box_size=10, border=5)
         qr.add_data(qr_data)
         qr.make(fit=True)
 
+        if size:
+            return self.rasterize_qr(qr.get_matrix(), size)
+
         # EXACT 2024 colors - Brown on Beige for ALL passes
         # The beige background creates a light box that stands out on both:
         # - Dark blue Exhibition pass backgrounds (beige box is visible)
@@ -129,24 +212,127 @@ Valid for entry on specified date and session only."""
         qr_img = qr.make_image(fill_color="#8B4513", back_color="#F5DEB3")
 
         return qr_img
+
+    def rasterize_qr(self, matrix: List[List[bool]], size: int) -> Image.Image:
+        """
+        Draw a QR module matrix (border included) as a size x size RGB image
+
+        Every module becomes a block of whole pixels, so edges stay sharp -
+        resizing the box_size=10 image smeared modules across pixel
+        boundaries. Pixels left over after the integer scale-up are added
+        to the quiet zone, centring the code.
+        """
+        modules = np.array(matrix, dtype=bool)
+        scale = max(1, size // len(modules))
+
+        # Each module -> scale x scale block of pixels
+        dark = np.repeat(np.repeat(modules, scale, axis=0), scale, axis=1)
+
+        side = max(size, len(dark))
+        offset = (side - len(dark)) // 2
+
+        pixels = np.empty((side, side, 3), dtype=np.uint8)
+        pixels[:] = self.QR_BACK_COLOR
+        pixels[offset:offset + len(dark), offset:offset + len(dark)][dark] = self.QR_FILL_COLOR
+
+        return Image.fromarray(pixels, "RGB")
+
+    def get_qr_size(self, template: Image.Image) -> int:
+        """Side of the QR code on a template, in pixels - fits the left frame"""
+        return min(template.width // 3, template.height) - 250
     
-    def overlay_qr_on_pass(self, pass_template_path: Path, qr_image: Image.Image,
-                           output_path: Path, template_filename: str) -> Path:
-        """Overlay QR code on pass template - EXACT 2024 code"""
-        # Load the pass template
-        template = Image.open(pass_template_path)
+    def get_template(self, template_path: Path) -> Image.Image:
+        """
+        Decoded pass template, cached by path and modification time
+
+        The returned image is shared - copy() it before drawing on it.
+        Replacing a template file on disk is picked up on the next call.
+        """
+        key = str(template_path)
+        mtime = template_path.stat().st_mtime
 
-        # Convert palette mode to RGB to preserve QR code colors
-        if template.mode == 'P':
-            template = template.convert('RGB')
+        cached = self._templates.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with self._templates_lock:
+            cached = self._templates.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            template = Image.open(template_path)
+
+            # Convert palette mode to RGB to preserve QR code colors
+            if template.mode == 'P':
+                template = template.convert('RGB')
+            else:
+                template.load()
+
+            self._templates[key] = (mtime, template)
+            print(f"🖼️ Cached pass template: {template_path.name} ({template.width}x{template.height})")
+            return template
+
+    def warm_templates(self):
+        """Decode every pass template (and its palette, if the encoding profile uses one) into the cache"""
+        palette_colors = self.get_encoding_profile().get("palette_colors")
+
+        for template_filename in sorted(set(self.PASS_TEMPLATES.values())):
+            template_path = self.passes_dir / template_filename
+            if template_path.exists():
+                self.get_template(template_path)
+                if palette_colors:
+                    self.get_pass_palette(template_path, palette_colors)
+
+    def get_encoding_profile(self, profile: Optional[str] = None) -> Dict[str, Any]:
+        """Encoding options for a profile (default PASS_ENCODING_PROFILE; unknown names fall back to 'png')"""
+        profile = profile or settings.PASS_ENCODING_PROFILE
+        if profile not in self.PASS_ENCODING_PROFILES:
+            print(f"⚠️ Unknown PASS_ENCODING_PROFILE '{profile}', using 'png'")
+            profile = "png"
+
+        options = dict(self.PASS_ENCODING_PROFILES[profile])
+        if "quality" in options and settings.PASS_IMAGE_QUALITY:
+            options["quality"] = settings.PASS_IMAGE_QUALITY
+        return options
+
+    def get_pass_palette(self, template_path: Path, colors: int) -> Image.Image:
+        """
+        Palette for quantizing passes rendered on a template, cached like get_template
+
+        The template's own colours are reduced to colors - 2 entries and the
+        two QR colours are added exactly, so quantizing never shifts QR modules.
+        """
+        key = (str(template_path), colors)
+        mtime = template_path.stat().st_mtime
+
+        cached = self._palettes.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        template = self.get_template(template_path).convert("RGB")
+        quantized = template.quantize(colors=colors - 2, method=Image.Quantize.MEDIANCUT)
+        palette = quantized.getpalette()[:(colors - 2) * 3]
+        palette += list(self.QR_FILL_COLOR) + list(self.QR_BACK_COLOR)
+
+        palette_image = Image.new("P", (1, 1))
+        palette_image.putpalette(palette)
+
+        self._palettes[key] = (mtime, palette_image)
+        return palette_image
+
+    def compose_pass(self, pass_template_path: Path, qr_image: Image.Image) -> Image.Image:
+        """Overlay QR code on pass template - EXACT 2024 code"""
+        # Load the pass template (decoded once, copied per pass)
+        template = self.get_template(pass_template_path).copy()
 
         # Calculate the size of the left frame
-        frame_width = template.width // 3
         frame_height = template.height
 
-        # Resize QR code to fit in the left frame
-        qr_size = min(frame_width, frame_height) - 250
-        qr_img = qr_image.resize((qr_size, qr_size))
+        # Resize QR code to fit in the left frame (already done if rasterized to size)
+        qr_size = self.get_qr_size(template)
+        qr_img = qr_image
+        if qr_img.size != (qr_size, qr_size):
+            qr_img = qr_img.resize((qr_size, qr_size))
 
         # Calculate position to paste QR code
         left_margin = 60
@@ -158,10 +344,36 @@ Valid for entry on specified date and session only."""
         # Paste QR code onto template
         template.paste(qr_img, qr_position)
 
-        # Save as PNG
-        template.save(output_path, "PNG")
+        return template
+
+    def overlay_qr_on_pass(self, pass_template_path: Path, qr_image: Image.Image,
+                           filename: str) -> EmailAttachment:
+        """Overlay a ready-made QR code on pass template and encode it in memory"""
+        return self.encode_pass(self.compose_pass(pass_template_path, qr_image), filename, pass_template_path)
 
-        return output_path
+    def encode_pass(self, pass_image: Image.Image, filename: str, template_path: Path,
+                    profile: Optional[str] = None) -> EmailAttachment:
+        """
+        Encode a rendered pass as an in-memory attachment
+
+        Uses the encoding profile (PASS_ENCODING_PROFILE by default); the
+        filename extension and MIME type follow the profile's image format.
+        """
+        options = self.get_encoding_profile(profile)
+        image_format = options.pop("format")
+        palette_colors = options.pop("palette_colors", None)
+
+        if palette_colors:
+            palette = self.get_pass_palette(template_path, palette_colors)
+            pass_image = pass_image.convert("RGB").quantize(palette=palette, dither=Image.Dither.NONE)
+        elif image_format != "PNG" and pass_image.mode != "RGB":
+            pass_image = pass_image.convert("RGB")
+
+        buffer = io.BytesIO()
+        pass_image.save(buffer, image_format, **options)
+
+        extension, mime_type = self.ENCODING_FORMATS[image_format]
+        return EmailAttachment(str(Path(filename).with_suffix(extension)), buffer.getvalue(), mime_type)
     
     def determine_passes_needed(self, entry: Entry) -> List[tuple]:
         """Determine which pass files are needed for this entry"""
@@ -239,16 +451,16 @@ Valid for entry on specified date and session only."""
 
         return attachments
 
-    def generate_passes_for_entry(self, entry: Entry, username: str) -> List[Path]:
+    def build_pass_jobs(self, entry: Entry, username: str) -> List[Tuple[str, Path, str, str]]:
         """
-        Generate all passes for an entry and include DND + Event Flow attachments
-        Returns list of all files to be attached to email (QR passes + DNDs + Event Flows)
+        Work needed to render an entry's passes, without rendering them
+
+        Returns:
+            List of (pass_type, template_path, qr_data, filename)
         """
-        passes_needed = self.determine_passes_needed(entry)
-        generated_passes = []
+        jobs = []
 
-        # Generate QR code passes
-        for pass_type, template_filename in passes_needed:
+        for pass_type, template_filename in self.determine_passes_needed(entry):
             # Get template path
             template_path = self.passes_dir / template_filename
 
@@ -259,30 +471,263 @@ Valid for entry on specified date and session only."""
             # Generate QR data
             qr_data = self.generate_qr_data(entry, pass_type, username)
 
-            # Create QR image
-            qr_img = self.create_qr_image(qr_data, pass_type, template_filename)
-
             # Output filename
             safe_name = entry.name.replace(" ", "_").replace("/", "-")
             output_filename = f"{safe_name}_{entry.id}_{pass_type}.png"
-            output_path = self.output_dir / output_filename
 
-            # Overlay QR on pass (QR already at correct size)
-            self.overlay_qr_on_pass(template_path, qr_img, output_path, template_filename)
-            generated_passes.append(output_path)
+            jobs.append((pass_type, template_path, qr_data, output_filename))
 
-            print(f"✅ Generated pass: {output_filename}")
+        return jobs
 
-        # Add DND and Event Flow attachments
+    def render_pass(self, template_path: Path, qr_data: str, filename: str) -> EmailAttachment:
+        """Render a single pass: QR code drawn at its final size, overlaid on its template"""
+        qr_size = self.get_qr_size(self.get_template(template_path))
+        qr_img = self.create_qr_image(qr_data, "", template_path.name, size=qr_size)
+        return self.encode_pass(self.compose_pass(template_path, qr_img), filename, template_path)
+
+    def encoding_report(self, profiles: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Size and quality of a sample pass per template under each encoding profile
+
+        Quality is measured against the unencoded pass: PSNR over the whole
+        image (None = lossless) and whether every QR pixel decodes unchanged.
+
+        Returns:
+            One dict per (template, profile): template, profile, bytes,
+            base64_bytes, encode_ms, psnr_db, qr_exact
+        """
+        sample_qr_data = self.generate_qr_data(
+            Entry(name="Sample Attendee Name", id_type="Aadhar Card", id_number="123456789012"),
+            "exhibition_day1", "admin"
+        )
+        rows = []
+
+        for template_filename in sorted(set(self.PASS_TEMPLATES.values())):
+            template_path = self.passes_dir / template_filename
+            if not template_path.exists():
+                print(f"Warning: Template not found: {template_path}")
+                continue
+
+            qr_size = self.get_qr_size(self.get_template(template_path))
+            qr_img = self.create_qr_image(sample_qr_data, "", template_filename, size=qr_size)
+            reference = np.asarray(self.compose_pass(template_path, qr_img).convert("RGB"), dtype=np.int16)
+
+            # QR area, as placed by compose_pass
+            qr_top = (reference.shape[0] - qr_size) // 2
+            qr_area = (slice(qr_top, qr_top + qr_size), slice(60, 60 + qr_size))
+
+            for profile in profiles or list(self.PASS_ENCODING_PROFILES):
+                pass_image = self.compose_pass(template_path, qr_img)
+
+                start = time.perf_counter()
+                encoded = self.encode_pass(pass_image, "sample.png", template_path, profile)
+                encode_ms = (time.perf_counter() - start) * 1000
+
+                decoded = np.asarray(Image.open(io.BytesIO(encoded.content)).convert("RGB"), dtype=np.int16)
+                mse = float(np.mean((decoded - reference) ** 2))
+
+                rows.append({
+                    "template": template_filename,
+                    "profile": profile,
+                    "bytes": len(encoded.content),
+                    "base64_bytes": 4 * math.ceil(len(encoded.content) / 3),
+                    "encode_ms": round(encode_ms, 1),
+                    "psnr_db": round(10 * math.log10(255 ** 2 / mse), 1) if mse else None,
+                    "qr_exact": bool(np.array_equal(decoded[qr_area], reference[qr_area]))
+                })
+
+        return rows
+
+    def _with_attachments(self, entry: Entry,
+                          passes: List[EmailAttachment]) -> List[Union[EmailAttachment, Path]]:
+        """Append the invitation attachments for an entry to its rendered passes"""
         additional_attachments = self.get_additional_attachments(entry)
-        generated_passes.extend(additional_attachments)
 
         if additional_attachments:
             print(f"📎 Added {len(additional_attachments)} additional attachment(s):")
             for attachment in additional_attachments:
                 print(f"   - {attachment.name}")
 
-        return generated_passes
+        return passes + additional_attachments
+
+    def _rendered(self, entry: Entry, passes: List[EmailAttachment], pass_types: List[str]) -> RenderedEntry:
+        """RenderedEntry for an entry's rendered passes, with its invitation attachments"""
+        files = self._with_attachments(entry, passes)
+        return RenderedEntry(entry, files, pass_types, has_invitations=len(files) > len(passes))
+
+    def generate_passes_for_entry(self, entry: Entry, username: str) -> List[Union[EmailAttachment, Path]]:
+        """
+        Generate all passes for an entry and include DND + Event Flow attachments
+        Returns list of all files to be attached to email (QR passes + DNDs + Event Flows)
+
+        Passes are rendered in memory (EmailAttachment, nothing is written to
+        PASS_OUTPUT_DIR); static attachments are returned as paths.
+        """
+        generated_passes = []
+
+        # Generate QR code passes
+        for pass_type, template_path, qr_data, filename in self.build_pass_jobs(entry, username):
+            rendered_pass = self.render_pass(template_path, qr_data, filename)
+            generated_passes.append(rendered_pass)
+
+            print(f"✅ Generated pass: {rendered_pass.name}")
+
+        # Add DND and Event Flow attachments
+        return self._with_attachments(entry, generated_passes)
+
+    def _get_executor(self, workers: int) -> ProcessPoolExecutor:
+        """Process pool for pass rendering, kept alive between bulk runs"""
+        if self._executor is None or self._executor_workers != workers:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+
+            # Never fork this process: the API and the email workers run threads
+            # (and hold locks) that a forked child would inherit mid-operation.
+            # forkserver forks workers from a clean single-threaded server that has
+            # already decoded every template (pass_template_preload): the pixel
+            # buffers are never written, so all workers share one copy of them.
+            # spawn is the fallback (e.g. Windows), where each worker decodes its own.
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            mp_context = multiprocessing.get_context(start_method)
+            if start_method == "forkserver":
+                mp_context.set_forkserver_preload([f"{__package__}.pass_template_preload"])
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp_context,
+                initializer=_warm_worker
+            )
+            self._executor_workers = workers
+            print(f"⚙️ Pass rendering pool started: {workers} worker(s), {start_method}")
+
+        return self._executor
+
+    def _render_entry(self, entry: Entry, username: str) -> RenderedEntry:
+        """Render an entry's passes in this process"""
+        passes, pass_types = [], []
+        try:
+            for pass_type, template_path, qr_data, filename in self.build_pass_jobs(entry, username):
+                passes.append(self.render_pass(template_path, qr_data, filename))
+                pass_types.append(pass_type)
+                print(f"✅ Generated pass: {filename}")
+        except Exception as e:
+            print(f"⚠️ Could not render passes for entry {entry.id}: {e}")
+            return RenderedEntry(entry, [], [], f"Could not render passes: {e}")
+
+        return self._rendered(entry, passes, pass_types)
+
+    def generate_passes_for_entries(self, entries: Iterable[Entry], username: str,
+                                    max_workers: Optional[int] = None) -> Iterator[RenderedEntry]:
+        """
+        Generate passes for many entries in parallel worker processes
+
+        QR drawing and PNG encoding are CPU-bound, so passes are rendered in a
+        process pool - one worker per CPU core unless PASS_RENDER_WORKERS or
+        max_workers says otherwise. Entries are yielded as soon as all of their
+        passes are ready (completion order, not input order), so the caller can
+        email one attendee while the next ones render. Only a few entries per
+        worker are rendered ahead, which keeps memory use flat on large runs.
+
+        An entry whose pass fails to render is yielded with `error` set and no
+        files - like generate_passes_for_entry raising - so the caller neither
+        sends a partial email nor marks its passes generated.
+
+        Yields:
+            RenderedEntry per entry
+        """
+        workers = max_workers or settings.PASS_RENDER_WORKERS or os.cpu_count() or 1
+        entries = iter(entries)
+
+        if workers <= 1:
+            for entry in entries:
+                yield self._render_entry(entry, username)
+            return
+
+        window = workers * self.RENDER_WINDOW_PER_WORKER
+        ready = deque()  # RenderedEntry waiting to be yielded
+        in_progress = {}  # entry key -> {"entry", "jobs", "rendered", "errors", "left"}
+        futures = {}  # future -> (entry key, filename)
+        next_key = 0
+        exhausted = False
+
+        def submit_more():
+            nonlocal next_key, exhausted
+            while not exhausted and len(in_progress) < window:
+                entry = next(entries, None)
+                if entry is None:
+                    exhausted = True
+                    break
+
+                try:
+                    jobs = self.build_pass_jobs(entry, username)
+                except Exception as e:
+                    ready.append(RenderedEntry(entry, [], [], f"Could not prepare passes: {e}"))
+                    continue
+                if not jobs:
+                    ready.append(self._rendered(entry, [], []))
+                    continue
+
+                key = next_key
+                next_key += 1
+                in_progress[key] = {
+                    "entry": entry,
+                    "jobs": [(pass_type, filename) for pass_type, _, _, filename in jobs],
+                    "rendered": {},
+                    "errors": [],
+                    "left": len(jobs)
+                }
+                executor = self._get_executor(workers)
+                for pass_type, template_path, qr_data, filename in jobs:
+                    future = executor.submit(_render_pass_job, str(template_path), qr_data, filename)
+                    futures[future] = (key, filename)
+
+        try:
+            submit_more()
+
+            while ready or futures:
+                while ready:
+                    yield ready.popleft()
+                    submit_more()
+
+                if not futures:
+                    continue
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, filename = futures.pop(future)
+                    state = in_progress[key]
+
+                    try:
+                        state["rendered"][filename] = future.result()
+                        print(f"✅ Generated pass: {state['rendered'][filename].name}")
+                    except BrokenProcessPool:
+                        # A worker died - start a fresh pool for the remaining entries
+                        self._executor = None
+                        print(f"⚠️ Pass rendering worker crashed: {filename}")
+                        state["errors"].append(f"{filename}: rendering worker crashed")
+                    except Exception as e:
+                        print(f"⚠️ Could not render pass {filename}: {e}")
+                        state["errors"].append(f"{filename}: {e}")
+
+                    state["left"] -= 1
+                    if state["left"] == 0:
+                        del in_progress[key]
+                        entry = state["entry"]
+                        if state["errors"]:
+                            ready.append(RenderedEntry(
+                                entry, [], [], "Could not render passes: " + "; ".join(state["errors"])
+                            ))
+                        else:
+                            # Keep the pass order of generate_passes_for_entry
+                            passes = [state["rendered"][filename] for _, filename in state["jobs"]]
+                            ready.append(self._rendered(
+                                entry, passes, [pass_type for pass_type, _ in state["jobs"]]
+                            ))
+
+                submit_more()
+        finally:
+            # Caller stopped early (error, Streamlit rerun) - drop queued work
+            for future in futures:
+                future.cancel()
 
 
 # Create singleton instance
@@ -0,0 +1,11 @@
+"""
+Pass template preload - Imported once by the pass rendering forkserver
+Decodes every pass template before workers are forked, so they share the pixels copy-on-write
+"""
+from .pass_generator import pass_generator
+
+try:
+    pass_generator.warm_templates()
+except Exception as e:
+    # Workers fall back to decoding on first use
+    print(f"⚠️ Could not preload pass templates: {e}")
@@ -0,0 +1,186 @@
+"""
+Provider health - Rolling send stats and a circuit breaker per email provider
+EmailService routes each send to the first healthy provider in priority order
+"""
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+
+# Rolling window of send outcomes kept per provider
+HEALTH_WINDOW = 50
+
+# Circuit breaker - open after this many failures in a row, or when the success
+# rate over at least CIRCUIT_MIN_SAMPLES sends drops below CIRCUIT_MIN_SUCCESS_RATE
+CIRCUIT_FAILURE_STREAK = 5
+CIRCUIT_MIN_SAMPLES = 10
+CIRCUIT_MIN_SUCCESS_RATE = 0.5
+
+# How long an open circuit rejects sends before letting one trial through;
+# doubled each time the trial fails
+CIRCUIT_OPEN_SECONDS = 60.0
+CIRCUIT_MAX_OPEN_SECONDS = 600.0
+
+# Start moving traffic to the next provider when less than this fraction of
+# the daily quota (EMAIL_DAILY_QUOTA_<PROVIDER>) is left; the share sent to
+# the provider tapers to zero
+QUOTA_SPLIT_FRACTION = 0.2
+
+
+class ProviderHealth:
+    """
+    Thread-safe health record of one email provider
+
+    Circuit states:
+    - closed: sends allowed
+    - open: sends rejected until the cooldown ends (failing, throttling or out of quota)
+    - half_open: one trial send allowed - success closes the circuit,
+      failure opens it again for twice as long
+    """
+
+    def __init__(self, key: str, daily_quota: int = 0):
+        self.key = key
+        self.daily_quota = daily_quota
+
+        self._outcomes = deque(maxlen=HEALTH_WINDOW)  # (success, latency seconds)
+        self._failure_streak = 0
+        self._state = "closed"
+        self._open_until = 0.0
+        self._open_seconds = CIRCUIT_OPEN_SECONDS
+        self._trial_in_flight = False
+
+        self._quota_day = None
+        self._sent_today = 0
+        self._lock = threading.Lock()
+
+    def _roll_quota_day(self):
+        """Reset the daily counter at UTC midnight"""
+        today = datetime.now(timezone.utc).date()
+        if today != self._quota_day:
+            self._quota_day = today
+            self._sent_today = 0
+
+    def allow_request(self) -> bool:
+        """
+        Whether a send may go to this provider now
+
+        In the half-open state this reserves the single trial send, so only
+        call it right before actually sending.
+        """
+        with self._lock:
+            self._roll_quota_day()
+            if self.daily_quota and self._sent_today >= self.daily_quota:
+                return False
+
+            if self._state == "open":
+                if time.monotonic() < self._open_until:
+                    return False
+                self._state = "half_open"
+                self._trial_in_flight = False
+
+            if self._state == "half_open":
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+
+            return True
+
+    def release(self):
+        """Give back a trial send reserved by allow_request() that will not be made"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record(self, success: bool, latency: float, throttled: bool = False,
+               retry_after: Optional[float] = None, messages: int = 1):
+        """
+        Record the outcome of a send (one API call / SMTP message)
+
+        Args:
+            messages: Emails the provider accepted (batch calls) - counted against the quota
+            throttled: Provider rejected the send for rate or quota reasons - opens the circuit
+            retry_after: Seconds to keep the circuit open after a throttle (the
+                provider's Retry-After or the caller's backoff), if known
+        """
+        with self._lock:
+            self._outcomes.append((success, latency))
+
+            if success:
+                self._roll_quota_day()
+                self._sent_today += messages
+                self._failure_streak = 0
+                if self._state == "half_open":
+                    print(f"✅ Email provider {self.key} recovered - circuit closed")
+                self._state = "closed"
+                self._open_seconds = CIRCUIT_OPEN_SECONDS
+                self._trial_in_flight = False
+                return
+
+            self._failure_streak += 1
+            samples = len(self._outcomes)
+            success_rate = sum(1 for ok, _ in self._outcomes if ok) / samples
+
+            if self._state == "open":
+                # Sent before the circuit opened - already held off
+                return
+            if self._state == "half_open":
+                # Trial failed - back off longer
+                self._open_seconds = min(CIRCUIT_MAX_OPEN_SECONDS, self._open_seconds * 2)
+                self._open(max(self._open_seconds, retry_after or 0), "trial send failed")
+            elif throttled:
+                # Rate limits clear quickly - hold off only as long as asked
+                self._open(retry_after or self._open_seconds, "throttled")
+            elif self._failure_streak >= CIRCUIT_FAILURE_STREAK:
+                self._open(self._open_seconds, f"{self._failure_streak} failures in a row")
+            elif samples >= CIRCUIT_MIN_SAMPLES and success_rate < CIRCUIT_MIN_SUCCESS_RATE:
+                self._open(self._open_seconds, f"success rate {success_rate:.0%}")
+
+    def _open(self, seconds: float, reason: str):
+        """Open the circuit (lock held)"""
+        self._state = "open"
+        self._open_until = time.monotonic() + seconds
+        self._trial_in_flight = False
+        print(f"⚠️ Email provider {self.key} circuit open for {seconds:.1f}s ({reason})")
+
+    def quota_left(self) -> Optional[float]:
+        """Fraction of today's quota left (None = no known quota)"""
+        if not self.daily_quota:
+            return None
+        with self._lock:
+            self._roll_quota_day()
+            return max(0.0, 1 - self._sent_today / self.daily_quota)
+
+    def retry_in(self) -> float:
+        """
+        Seconds until the provider may take a send again (0 = now)
+
+        Out of quota: until UTC midnight. Half open: a short wait for the
+        trial send in flight.
+        """
+        with self._lock:
+            self._roll_quota_day()
+            if self.daily_quota and self._sent_today >= self.daily_quota:
+                now = datetime.now(timezone.utc)
+                midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+                return (midnight - now).total_seconds()
+            if self._state == "half_open":
+                return 1.0 if self._trial_in_flight else 0.0
+            if self._state == "open":
+                return max(0.0, self._open_until - time.monotonic())
+            return 0.0
+
+    def snapshot(self) -> dict:
+        """Current stats (logs / admin display)"""
+        with self._lock:
+            self._roll_quota_day()
+            samples = len(self._outcomes)
+            return {
+                "provider": self.key,
+                "state": self._state,
+                "samples": samples,
+                "success_rate": sum(1 for ok, _ in self._outcomes if ok) / samples if samples else None,
+                "avg_latency": sum(latency for _, latency in self._outcomes) / samples if samples else None,
+                "sent_today": self._sent_today,
+                "daily_quota": self.daily_quota or None
+            }
@@ -0,0 +1,150 @@
+"""
+Scanner snapshot service - Compact, precompressed entry bundles for offline scanners
+Snapshots are rebuilt only when the entries table changes and are served with an ETag
+"""
+import gzip
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import Entry, EntryTombstone
+
+
+# Pass flags packed into one integer per entry (must match frontend src/services/sync.ts)
+PASS_BITS = {
+    "exhibition_day1": 1,
+    "exhibition_day2": 2,
+    "interactive_sessions": 4,
+    "plenary": 8,
+    "exhibitor_pass": 16
+}
+
+# Only the fields the gate needs to match a QR code and show the result
+SNAPSHOT_FIELDS = ["entry_id", "id_number", "name", "organization", "qr_signature", "passes"]
+
+SNAPSHOT_VERSION = 1
+
+
+def pack_passes(entry) -> int:
+    """Pack the pass allocation flags of an entry (ORM object or column row) into a bitfield"""
+    passes = 0
+    if entry.exhibition_day1:
+        passes |= PASS_BITS["exhibition_day1"]
+    if entry.exhibition_day2:
+        passes |= PASS_BITS["exhibition_day2"]
+    if entry.interactive_sessions:
+        passes |= PASS_BITS["interactive_sessions"]
+    if entry.plenary:
+        passes |= PASS_BITS["plenary"]
+    if entry.is_exhibitor_pass:
+        passes |= PASS_BITS["exhibitor_pass"]
+    return passes
+
+
+class ScannerSnapshotService:
+    """Builds and caches gzip-compressed entry snapshots per gate/date scope"""
+
+    # How much older than the newest row a late-committed write may be
+    # and still be noticed (matches EntryLookupIndex.DELTA_OVERLAP)
+    LATE_COMMIT_WINDOW = timedelta(seconds=60)
+
+    def __init__(self):
+        self._cache: Dict[Tuple[Optional[str], Optional[str]], dict] = {}
+        self._lock = threading.Lock()
+
+    def get_fingerprint(self, db: Session) -> str:
+        """
+        Cheap change marker for the entries table
+
+        Any insert or update moves max(updated_at), any delete changes the
+        row count and adds a tombstone. A write that began earlier and
+        committed later carries an older updated_at and may not move the
+        maximum, so the rows within LATE_COMMIT_WINDOW of it are counted
+        too; tombstones are counted for the same reason.
+        """
+        count, last_update = db.query(func.count(Entry.id), func.max(Entry.updated_at)).one()
+        recent = 0
+        if last_update is not None:
+            recent = db.query(func.count(Entry.id)).filter(
+                Entry.updated_at >= last_update - self.LATE_COMMIT_WINDOW
+            ).scalar()
+        tombstones, last_tombstone, last_deleted = db.query(
+            func.count(EntryTombstone.id), func.max(EntryTombstone.id), func.max(EntryTombstone.deleted_at)
+        ).one()
+        return f"{count}:{last_update}:{recent}:{tombstones}:{last_tombstone}:{last_deleted}"
+
+    def make_etag(self, fingerprint: str, gate_number: Optional[str], date: Optional[str]) -> str:
+        """ETag for a snapshot scope at a given fingerprint"""
+        raw = f"v{SNAPSHOT_VERSION}|{gate_number}|{date}|{fingerprint}"
+        return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+    def get_snapshot(self, db: Session, stmt, sync_time: datetime,
+                     gate_number: Optional[str], date: Optional[str],
+                     fingerprint: str) -> dict:
+        """
+        Return the cached snapshot for this scope, rebuilding it if entries changed
+
+        Args:
+            db: Database session (sync; the async API calls this via run_sync)
+            stmt: Entry select() already filtered for the gate/date scope
+            sync_time: Delta sync cursor to embed in the snapshot
+            gate_number: Gate scope (cache key)
+            date: Date scope (cache key)
+            fingerprint: Current value of get_fingerprint()
+
+        Returns:
+            dict with 'etag', 'body' (gzip bytes), 'count' and 'raw_size'
+        """
+        key = (gate_number, date)
+
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached and cached["fingerprint"] == fingerprint:
+            return cached
+
+        # Built outside the lock: under the async API the query yields to the
+        # event loop, and a thread lock held across that would block other requests
+        rows = [
+            [
+                entry.id,
+                entry.id_number,
+                entry.name,
+                entry.organization,
+                entry.qr_signature,
+                pack_passes(entry)
+            ]
+            for entry in db.scalars(stmt.execution_options(yield_per=500))
+        ]
+
+        payload = json.dumps({
+            "version": SNAPSHOT_VERSION,
+            "last_updated": sync_time.isoformat(),
+            "fields": SNAPSHOT_FIELDS,
+            "pass_bits": PASS_BITS,
+            "rows": rows
+        }, separators=(",", ":")).encode("utf-8")
+
+        snapshot = {
+            "fingerprint": fingerprint,
+            "etag": self.make_etag(fingerprint, gate_number, date),
+            "body": gzip.compress(payload, compresslevel=9),
+            "count": len(rows),
+            "raw_size": len(payload)
+        }
+
+        with self._lock:
+            self._cache[key] = snapshot
+
+        print(f"📦 Built scanner snapshot {gate_number or 'all'}/{date or 'any'}: "
+              f"{len(rows)} entries, {len(payload)} → {len(snapshot['body'])} bytes")
+
+        return snapshot
+
+
+# Create singleton instance
+scanner_snapshot = ScannerSnapshotService()
@@ -0,0 +1,154 @@
+"""
+SMTP connection pool - Authenticated SMTP sessions reused across messages
+The TLS handshake and LOGIN happen once per connection instead of once per email
+"""
+import smtplib
+import threading
+import time
+from email.message import Message
+from typing import Callable, List, Tuple
+
+from ..core.config import settings
+
+
+class SMTPConnectionPool:
+    """
+    Up to `size` logged-in SMTP connections shared by all sending threads
+
+    - Idle connections are kept alive with NOOP every SMTP_KEEPALIVE_SECONDS
+      and closed after SMTP_MAX_IDLE_SECONDS without use
+    - A connection the server has dropped is replaced transparently and the
+      message is sent again on the new one
+    - When every connection is busy, senders wait for one to be returned
+    """
+
+    def __init__(self, name: str, connect: Callable[[], smtplib.SMTP], size: int):
+        self.name = name
+        self.connect = connect
+        self.size = max(1, size)
+
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []  # (connection, last used), most recent last
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._keepalive_thread = None
+
+    def _acquire(self, verify: bool = False) -> smtplib.SMTP:
+        """Take an idle connection (checking it if it sat idle a while, or if asked) or open a new one"""
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, last_used = self._idle.pop()
+
+                recently_used = time.monotonic() - last_used < settings.SMTP_KEEPALIVE_SECONDS
+                if (recently_used and not verify) or self._is_alive(connection):
+                    return connection
+                self._close(connection)
+
+            connection = self.connect()
+            print(f"🔌 {self.name}: opened pooled connection")
+            self._start_keepalive()
+            return connection
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, connection: smtplib.SMTP):
+        """Return a healthy connection to the pool"""
+        with self._lock:
+            self._idle.append((connection, time.monotonic()))
+        self._slots.release()
+
+    def _discard(self, connection: smtplib.SMTP):
+        """Drop a broken connection, freeing its slot"""
+        self._close(connection)
+        self._slots.release()
+
+    @staticmethod
+    def _is_alive(connection: smtplib.SMTP) -> bool:
+        try:
+            return connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _close(connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+    def send_message(self, msg: Message):
+        """
+        Send a message on a pooled connection
+
+        Raises:
+            smtplib.SMTPException / OSError: if the server rejects the message
+            or cannot be reached (after one reconnect)
+        """
+        for attempt in range(2):
+            # After a drop the other idle connections are suspect too - check before reuse
+            connection = self._acquire(verify=attempt > 0)
+            try:
+                connection.send_message(msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                # Server closed the session (idle timeout, restart) - reconnect once
+                self._discard(connection)
+                if attempt:
+                    raise
+                print(f"🔄 {self.name}: connection dropped ({e}), reconnecting")
+                continue
+            except smtplib.SMTPResponseException:
+                # Rejected message - smtplib has already reset the session, so it is reusable
+                self._release(connection)
+                raise
+            except Exception:
+                self._discard(connection)
+                raise
+
+            self._release(connection)
+            return
+
+    def _start_keepalive(self):
+        """Start the keepalive thread on first use"""
+        with self._lock:
+            if self._keepalive_thread is None:
+                self._keepalive_thread = threading.Thread(
+                    target=self._keepalive, name=f"smtp-keepalive-{self.name}", daemon=True
+                )
+                self._keepalive_thread.start()
+
+    def _keepalive(self):
+        """NOOP idle connections so the server keeps them open; close stale ones"""
+        while True:
+            time.sleep(settings.SMTP_KEEPALIVE_SECONDS)
+
+            with self._lock:
+                idle, self._idle = self._idle, []
+
+            now = time.monotonic()
+            kept = []
+            for connection, last_used in idle:
+                if now - last_used > settings.SMTP_MAX_IDLE_SECONDS or not self._is_alive(connection):
+                    self._close(connection)
+                else:
+                    kept.append((connection, last_used))
+
+            with self._lock:
+                # Connections returned while checking were used more recently - keep them last;
+                # senders may have opened new ones meanwhile, so trim back to the pool size
+                self._idle = kept + self._idle
+                surplus = self._idle[:-self.size]
+                self._idle = self._idle[-self.size:]
+
+            for connection, _ in surplus:
+                self._close(connection)
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close(connection)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Check Pass Encoding - Size and quality of each pass template per encoding profile
+
+Renders a sample pass on every template and encodes it with each profile in
+PassGenerator.PASS_ENCODING_PROFILES, to choose PASS_ENCODING_PROFILE.
+Base64 size is what the email providers actually upload.
+
+Usage:
+    python check_pass_encoding.py                  # all profiles
+    python check_pass_encoding.py png png-palette  # selected profiles
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from app.core.config import settings
+from app.services.pass_generator import pass_generator
+
+
+def check_pass_encoding(profiles=None) -> bool:
+    """Print the encoding report grouped by template"""
+    print("=" * 78)
+    print("PASS ENCODING REPORT - Swavlamban 2025")
+    print("=" * 78)
+    print(f"\n📊 Current profile: {settings.PASS_ENCODING_PROFILE}")
+
+    unknown = [name for name in profiles or [] if name not in pass_generator.PASS_ENCODING_PROFILES]
+    if unknown:
+        print(f"\n❌ Unknown profile(s): {', '.join(unknown)}")
+        print(f"   Available: {', '.join(pass_generator.PASS_ENCODING_PROFILES)}")
+        return False
+
+    rows = pass_generator.encoding_report(profiles)
+    if not rows:
+        print(f"\n❌ No pass templates found in {pass_generator.passes_dir}")
+        return False
+
+    template = None
+    for row in rows:
+        if row["template"] != template:
+            template = row["template"]
+            print(f"\n🖼️  {template}")
+            print(f"   {'Profile':<15}{'Size':>10}{'Base64':>10}{'Encode':>10}{'PSNR':>10}   QR")
+
+        psnr = "lossless" if row["psnr_db"] is None else f"{row['psnr_db']:.1f} dB"
+        print(
+            f"   {row['profile']:<15}"
+            f"{row['bytes'] / 1024:>8.0f}KB"
+            f"{row['base64_bytes'] / 1024:>8.0f}KB"
+            f"{row['encode_ms']:>8.0f}ms"
+            f"{psnr:>10}"
+            f"   {'✅ exact' if row['qr_exact'] else '⚠️ changed'}"
+        )
+
+    print("\n" + "=" * 78)
+    print("QR 'changed' means lossy compression touched QR pixels - check scans before using it")
+    print("=" * 78)
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_pass_encoding(sys.argv[1:]) else 1)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Check Query Indexes - Verify the hot queries are served by an index
+
+Runs EXPLAIN (PostgreSQL) or EXPLAIN QUERY PLAN (SQLite) for the queries
+the scanner API and Streamlit dashboard run most, and checks that each
+plan uses one of the indexes created for it (MIGRATION_HOT_QUERY_INDEXES.sql,
+MIGRATION_CHECKIN_FIRST_ENTRY.sql, MIGRATION_EMAIL_QUEUE.sql).
+
+Usage:
+    python check_query_indexes.py
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from sqlalchemy import select, func
+from app.core.database import engine, SQLALCHEMY_DATABASE_URL
+from app.models import CheckIn, EmailQueueJob, Entry
+
+
+# (description, statement, indexes any of which satisfies the check)
+HOT_QUERIES = [
+    (
+        "First check-in lookup (entry_id, session_type)",
+        select(CheckIn.id, CheckIn.check_in_time).filter(
+            CheckIn.entry_id == 1,
+            CheckIn.session_type == "exhibition_day1"
+        ),
+        # SQLite names unique-constraint indexes sqlite_autoindex_<table>_<n>
+        ["uq_check_ins_entry_session", "sqlite_autoindex_check_ins"]
+    ),
+    (
+        "Idempotency key replay check",
+        select(CheckIn.id).filter(CheckIn.idempotency_key.in_(["0f8fad5b-d9cb-469f-a165-70867728950e"])),
+        ["ix_check_ins_idempotency_key"]
+    ),
+    (
+        "Gate stats totals (gate_number)",
+        select(
+            func.count(CheckIn.id),
+            func.count(func.distinct(CheckIn.entry_id)),
+            func.max(CheckIn.check_in_time)
+        ).filter(CheckIn.gate_number == "Gate 1"),
+        ["ix_check_ins_gate_time"]
+    ),
+    (
+        "Gate stats intervals (gate_number, check_in_time >=)",
+        select(func.count(CheckIn.id)).filter(
+            CheckIn.gate_number == "Gate 1",
+            CheckIn.check_in_time >= datetime.utcnow() - timedelta(hours=2)
+        ),
+        ["ix_check_ins_gate_time"]
+    ),
+    (
+        "Dashboard passes generated (username + pass_generated flags)",
+        select(func.count(Entry.id)).filter(
+            Entry.username == "admin"
+        ).filter(
+            (Entry.pass_generated_exhibition_day1 == True) |
+            (Entry.pass_generated_exhibition_day2 == True) |
+            (Entry.pass_generated_interactive_sessions == True) |
+            (Entry.pass_generated_plenary == True)
+        ),
+        # Only the partial index counts - ix_entries_username would still need
+        # every row of the user read to test the flags
+        ["ix_entries_username_pass_generated"]
+    ),
+    (
+        "Email worker claim (state, run_after <=)",
+        select(EmailQueueJob.id).filter(
+            EmailQueueJob.state == "pending",
+            EmailQueueJob.run_after <= datetime.utcnow()
+        ).order_by(EmailQueueJob.id).limit(20),
+        ["ix_email_queue_state_run_after", "uq_email_queue_active_entry"]
+    ),
+]
+
+
+def explain(connection, stmt) -> str:
+    """Return the query plan of a statement as text"""
+    # render_postcompile expands IN (...) lists into individual parameters
+    compiled = stmt.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    prefix = "EXPLAIN " if engine.dialect.name == "postgresql" else "EXPLAIN QUERY PLAN "
+    rows = connection.exec_driver_sql(prefix + str(compiled), params).fetchall()
+    # PostgreSQL: one text column; SQLite: (id, parent, notused, detail)
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def check_query_indexes() -> bool:
+    """Explain each hot query and check it uses an expected index"""
+    print("=" * 70)
+    print("QUERY INDEX CHECK - Swavlamban 2025")
+    print("=" * 70)
+    print(f"\n📊 Database URL: {SQLALCHEMY_DATABASE_URL}")
+
+    all_ok = True
+
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql":
+            # Small tables are cheaper to scan than to index - disable seq scans
+            # for this transaction so the plan shows whether an index is usable
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+        for description, stmt, indexes in HOT_QUERIES:
+            plan = explain(connection, stmt)
+            used = next((name for name in indexes if name in plan), None)
+
+            if used:
+                print(f"\n✅ {description}")
+                print(f"   Uses index: {used}")
+            else:
+                all_ok = False
+                print(f"\n❌ {description}")
+                print(f"   Expected one of: {', '.join(indexes)}")
+                print("   Plan:")
+                for line in plan.splitlines():
+                    print(f"      {line}")
+
+    print("\n" + "=" * 70)
+    if all_ok:
+        print("✅ ALL HOT QUERIES USE AN INDEX")
+    else:
+        print("❌ SOME HOT QUERIES DO NOT USE AN INDEX")
+        print("   Run MIGRATION_HOT_QUERY_INDEXES.sql and MIGRATION_CHECKIN_FIRST_ENTRY.sql (Supabase)")
+        print("   or recreate the local SQLite database")
+    print("=" * 70)
+    return all_ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_query_indexes() else 1)
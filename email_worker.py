@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Email Worker - Sends the bulk pass emails queued from the Streamlit app
+
+Claims pending jobs from the email_queue table (MIGRATION_EMAIL_QUEUE.sql),
+renders each attendee's passes and sends them with concurrent senders
+within the email provider's rate limits. Progress is stored in the
+database, so the worker (or the app) can be restarted at any time; several
+workers may run side by side.
+
+Usage:
+    python email_worker.py          # run forever, polling for new jobs
+    python email_worker.py --once   # send everything due, then exit
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from app.core.database import init_db
+from app.services.email_queue import email_queue
+
+
+if __name__ == "__main__":
+    init_db()
+    try:
+        email_queue.run_worker(once="--once" in sys.argv[1:])
+    except KeyboardInterrupt:
+        print("\n👋 Email worker stopped")
@@ -1360,6 +1360,9 @@ def show_generate_passes():
         from app.models import Entry
         from app.services.pass_generator import pass_generator
         from app.services.email_service import email_service
+        from app.services.email_queue import email_queue
+        from app.services.email_templates import PassFlags
+        from app.core.config import settings
 
         entries = db.query(Entry).filter(Entry.username == user['username']).all()
 
@@ -1446,7 +1449,9 @@ def show_generate_passes():
                         st.success(f"✅ Generated {len(actual_passes)} {pass_word}!")
 
                         # Store ONLY actual passes in session state for download
-                        st.session_state.generated_passes = actual_passes
+                        # (rendered passes are already in memory; invitations are read once here)
+                        from app.services.email_attachments import load_attachments
+                        st.session_state.generated_passes = load_attachments(actual_passes)
                         st.session_state.generated_for_entry = entry.id
 
                     except Exception as e:
@@ -1463,14 +1468,13 @@ def show_generate_passes():
                     with col_name:
                         st.write(f"📄 **{pass_file.name}**")
                     with col_btn:
-                        with open(pass_file, "rb") as f:
-                            st.download_button(
-                                label="Download",
-                                data=f.read(),
-                                file_name=pass_file.name,
-                                mime="image/png",
-                                key=f"download_{pass_file.name}"
-                            )
+                        st.download_button(
+                            label="Download",
+                            data=pass_file.content,
+                            file_name=pass_file.name,
+                            mime=pass_file.mime_type,
+                            key=f"download_{pass_file.name}"
+                        )
 
             st.markdown("---")
 
@@ -1480,9 +1484,7 @@ def show_generate_passes():
 
             if st.button("📧 Generate Passes & Send Email", use_container_width=True, type="primary", key="individual_email_btn"):
                 import time
-                import os
 
-                generated_passes = []
                 try:
                     with st.spinner("🎫 Generating passes..."):
                         # Generate passes first
@@ -1514,27 +1516,16 @@ def show_generate_passes():
                             success = email_service.send_exhibitor_bulk_email(
                                 recipient_email=entry.email,
                                 recipient_name=entry.name,
-                                pass_files=generated_passes
+                                pass_files=generated_passes,
+                                num_attendees=len(pass_generator.determine_passes_needed(entry))
                             )
                         else:
-                            # VISITOR: Use visitor email template
-                            # Determine primary pass type for email template
-                            if entry.exhibition_day1:
-                                email_type = "exhibition_day1"
-                            elif entry.exhibition_day2:
-                                email_type = "exhibition_day2"
-                            elif entry.interactive_sessions:
-                                email_type = "interactive_sessions"
-                            elif entry.plenary:
-                                email_type = "plenary"
-                            else:
-                                email_type = "exhibition_day1"
-
+                            # VISITOR: Use visitor email template (chosen from the entry's pass flags)
                             success = email_service.send_pass_email(
                                 entry.email,
                                 entry.name,
                                 generated_passes,
-                                email_type
+                                passes=PassFlags.from_entry(entry)
                             )
                         duration = time.time() - start_time
 
@@ -1547,16 +1538,6 @@ def show_generate_passes():
                 except Exception as e:
                     st.error(f"❌ Failed to send email: {str(e)}")
 
-                finally:
-                    # CLEANUP: Delete generated pass files immediately after email sent
-                    for pass_file in generated_passes:
-                        try:
-                            # Only delete QR pass files (not invitation templates)
-                            if pass_file.exists() and "generated_passes" in str(pass_file):
-                                os.remove(pass_file)
-                        except Exception:
-                            pass
-
             st.markdown("---")
 
             # Bulk Email section (after individual email)
@@ -1567,6 +1548,63 @@ def show_generate_passes():
             if bulk_mode:
                 st.info("💡 Select multiple attendees below and send all passes in one operation")
 
+                if settings.EMAIL_QUEUE_IN_APP_WORKER:
+                    # No email_worker.py in this deployment - drain the queue in the app process
+                    email_queue.start_in_process_worker()
+
+                # Progress of the latest queued batch - read from the database,
+                # so it survives browser refreshes and app restarts
+                poll_batch = False
+                batch_id = st.session_state.get('bulk_email_batch_id') or email_queue.latest_batch(db, user['username'])
+                if batch_id:
+                    st.markdown("#### 📬 Latest Bulk Email Batch")
+
+                    notice = st.session_state.pop('bulk_email_notice', None)
+                    if notice:
+                        st.success(notice)
+
+                    progress = email_queue.batch_progress(db, batch_id)
+                    total = sum(progress.values())
+                    finished = progress['sent'] + progress['failed'] + progress['cancelled']
+
+                    if total:
+                        st.progress(finished / total)
+                    status = (f"**📤 Sent {progress['sent']}/{total}** | ⏳ Queued: {progress['pending']} | "
+                              f"📨 Sending: {progress['sending']} | ❌ Failed: {progress['failed']}")
+                    if progress['cancelled']:
+                        status += f" | 🛑 Cancelled: {progress['cancelled']}"
+                    st.markdown(status)
+
+                    if progress['pending'] or progress['sending']:
+                        if email_queue.worker_stalled(db, batch_id):
+                            st.warning("⚠️ No email worker is processing this batch. Run `python email_worker.py` "
+                                       "on a server with database access, set `EMAIL_QUEUE_IN_APP_WORKER = true`, "
+                                       "or send from this app now (keep the app running until the batch is done).")
+                            if st.button("📤 Send From This App", use_container_width=True):
+                                email_queue.start_in_process_worker()
+                                st.session_state.bulk_email_notice = "📤 Sending queued emails from this app"
+                                st.rerun()
+                        else:
+                            st.info("⏱️ Emails are being sent in the background - you can leave this page, progress is saved")
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            poll_batch = st.checkbox("🔄 Auto-refresh progress", value=True, key="bulk_email_auto_refresh")
+                        with col2:
+                            if st.button("🛑 Cancel Queued Emails", use_container_width=True):
+                                cancelled = email_queue.cancel(db, batch_id)
+                                st.session_state.bulk_email_notice = f"🛑 Cancelled {cancelled} queued email(s)"
+                                st.rerun()
+                    else:
+                        st.success("✅ Batch complete")
+
+                    failed_jobs = email_queue.failed_jobs(db, batch_id)
+                    if failed_jobs:
+                        with st.expander(f"❌ {len(failed_jobs)} failed email(s)"):
+                            for job, failed_entry in failed_jobs:
+                                st.markdown(f"- {failed_entry.name} ({failed_entry.email}): {job.last_error}")
+
+                    st.markdown("---")
+
                 # Pass type filter section
                 st.markdown("#### 🎯 Filter by Pass Type")
                 st.markdown("Select which pass types to include:")
@@ -1684,198 +1722,40 @@ def show_generate_passes():
                         # Non-admin: Send all passes
                         st.session_state.bulk_send_passes = None
 
-                    # Time estimation (Mailjet API is 9x faster than SMTP)
-                    estimated_time = len(selected_entries) * 10  # 10s per email via Mailjet API
-                    estimated_minutes = estimated_time / 60
-                    st.info(f"⏱️ Estimated time: ~{estimated_minutes:.1f} minutes ({estimated_time:.0f} seconds) via Mailjet API")
-
-                    # Initialize bulk email session state
-                    if 'bulk_email_in_progress' not in st.session_state:
-                        st.session_state.bulk_email_in_progress = False
-                    if 'bulk_email_processed_ids' not in st.session_state:
-                        st.session_state.bulk_email_processed_ids = set()
-                    if 'bulk_email_success_count' not in st.session_state:
-                        st.session_state.bulk_email_success_count = 0
-                    if 'bulk_email_failed_count' not in st.session_state:
-                        st.session_state.bulk_email_failed_count = 0
-                    if 'bulk_email_start_time' not in st.session_state:
-                        st.session_state.bulk_email_start_time = None
-
-                    # Button to start bulk email
-                    start_button = st.button("📧 Generate & Send Bulk Emails", use_container_width=True, type="primary", disabled=st.session_state.bulk_email_in_progress)
-
-                    # Button to cancel/reset bulk email
-                    if st.session_state.bulk_email_in_progress:
-                        if st.button("🛑 Reset Bulk Email Operation", use_container_width=True):
-                            st.session_state.bulk_email_in_progress = False
-                            st.session_state.bulk_email_processed_ids = set()
-                            st.session_state.bulk_email_success_count = 0
-                            st.session_state.bulk_email_failed_count = 0
-                            st.session_state.bulk_email_start_time = None
-                            st.rerun()
-
-                    if start_button or st.session_state.bulk_email_in_progress:
-                        import time
-
-                        # Start new operation
-                        if not st.session_state.bulk_email_in_progress:
-                            st.session_state.bulk_email_in_progress = True
-                            st.session_state.bulk_email_processed_ids = set()
-                            st.session_state.bulk_email_success_count = 0
-                            st.session_state.bulk_email_failed_count = 0
-                            st.session_state.bulk_email_start_time = time.time()
-
-                        start_time = st.session_state.bulk_email_start_time
-
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-                        time_text = st.empty()
-
-                        success_count = st.session_state.bulk_email_success_count
-                        failed_count = st.session_state.bulk_email_failed_count
-                        processed_ids = st.session_state.bulk_email_processed_ids
-
-                        # Filter out already processed entries
-                        remaining_entries = [e for e in selected_entries if e.id not in processed_ids]
-
-                        for idx, bulk_entry in enumerate(remaining_entries):
-                            # Calculate progress (including already processed entries)
-                            total_processed = len(st.session_state.bulk_email_processed_ids)
-                            current_position = total_processed + 1
-
-                            # Calculate elapsed and remaining time
-                            elapsed = time.time() - start_time
-                            avg_time_per_email = elapsed / (total_processed + 1) if total_processed > 0 else 10  # Initial estimate 10s for Mailjet
-                            remaining_emails = len(selected_entries) - (total_processed + 1)
-                            estimated_remaining = remaining_emails * avg_time_per_email
-
-                            status_text.markdown(f"**📤 Processing {current_position}/{len(selected_entries)}:** {bulk_entry.name}")
-                            time_text.info(f"⏱️ Elapsed: {elapsed:.1f}s | Remaining: ~{estimated_remaining:.1f}s | Avg: {avg_time_per_email:.1f}s/email via Mailjet API")
-
-                            generated_passes = []
-                            try:
-                                # Check if admin has selected specific passes to send
-                                send_specific_passes = st.session_state.get('bulk_send_passes')
-
-                                if send_specific_passes:
-                                    # ADMIN MODE: Only generate selected passes
-                                    # Create a temporary entry copy with only selected passes enabled
-                                    from copy import copy
-                                    temp_entry = copy(bulk_entry)
-
-                                    # Override pass selections based on admin's choice
-                                    temp_entry.exhibition_day1 = bulk_entry.exhibition_day1 and send_specific_passes['ex1']
-                                    temp_entry.exhibition_day2 = bulk_entry.exhibition_day2 and send_specific_passes['ex2']
-                                    temp_entry.interactive_sessions = bulk_entry.interactive_sessions and send_specific_passes['interactive']
-                                    temp_entry.plenary = bulk_entry.plenary and send_specific_passes['plenary']
-
-                                    # Generate only selected passes
-                                    generated_passes = pass_generator.generate_passes_for_entry(temp_entry, user['username'])
-                                else:
-                                    # NON-ADMIN MODE: Generate all passes
-                                    generated_passes = pass_generator.generate_passes_for_entry(bulk_entry, user['username'])
-
-                                # Update database flags only for passes that were actually generated
-                                if send_specific_passes:
-                                    if bulk_entry.exhibition_day1 and send_specific_passes['ex1']:
-                                        bulk_entry.pass_generated_exhibition_day1 = True
-                                    if bulk_entry.exhibition_day2 and send_specific_passes['ex2']:
-                                        bulk_entry.pass_generated_exhibition_day2 = True
-                                    if bulk_entry.interactive_sessions and send_specific_passes['interactive']:
-                                        bulk_entry.pass_generated_interactive_sessions = True
-                                    if bulk_entry.plenary and send_specific_passes['plenary']:
-                                        bulk_entry.pass_generated_plenary = True
-                                else:
-                                    # Update all flags
-                                    if bulk_entry.exhibition_day1:
-                                        bulk_entry.pass_generated_exhibition_day1 = True
-                                    if bulk_entry.exhibition_day2:
-                                        bulk_entry.pass_generated_exhibition_day2 = True
-                                    if bulk_entry.interactive_sessions:
-                                        bulk_entry.pass_generated_interactive_sessions = True
-                                    if bulk_entry.plenary:
-                                        bulk_entry.pass_generated_plenary = True
-
-                                db.commit()
-
-                                # Send email - use correct template based on entry type
-                                is_exhibitor = getattr(bulk_entry, 'is_exhibitor_pass', False)
-
-                                if is_exhibitor:
-                                    # EXHIBITOR: Use dedicated exhibitor email template
-                                    success = email_service.send_exhibitor_bulk_email(
-                                        recipient_email=bulk_entry.email,
-                                        recipient_name=bulk_entry.name,
-                                        pass_files=generated_passes
-                                    )
-                                else:
-                                    # VISITOR: Use visitor email template
-                                    email_type = "exhibition_day1" if bulk_entry.exhibition_day1 else "exhibition_day2"
-                                    success = email_service.send_pass_email(
-                                        recipient_email=bulk_entry.email,
-                                        recipient_name=bulk_entry.name,
-                                        pass_files=generated_passes,
-                                        pass_type=email_type
-                                    )
-
-                                if success:
-                                    success_count += 1
-                                    st.session_state.bulk_email_success_count += 1
-                                else:
-                                    failed_count += 1
-                                    st.session_state.bulk_email_failed_count += 1
-
-                            except Exception as e:
-                                failed_count += 1
-                                st.session_state.bulk_email_failed_count += 1
-                                st.warning(f"⚠️ Failed for {bulk_entry.name}: {str(e)}")
-
-                            finally:
-                                # Mark entry as processed
-                                st.session_state.bulk_email_processed_ids.add(bulk_entry.id)
-                                processed_ids.add(bulk_entry.id)
-
-                                # CLEANUP: Delete generated pass files immediately after email sent
-                                # This prevents disk space issues during bulk operations
-                                import os
-                                for pass_file in generated_passes:
-                                    try:
-                                        # Only delete QR pass files (not invitation templates)
-                                        if pass_file.exists() and "generated_passes" in str(pass_file):
-                                            os.remove(pass_file)
-                                    except Exception as cleanup_error:
-                                        # Silent fail - cleanup errors shouldn't stop bulk operation
-                                        pass
-
-                            # Update progress bar
-                            total_processed = len(st.session_state.bulk_email_processed_ids)
-                            progress_bar.progress(total_processed / len(selected_entries))
-
-                        # Check if all entries are processed
-                        if len(st.session_state.bulk_email_processed_ids) >= len(selected_entries):
-                            total_time = time.time() - start_time
-                            progress_bar.empty()
-                            status_text.empty()
-                            time_text.empty()
-
-                            st.success(f"✅ Bulk operation completed in {total_time:.0f} seconds ({total_time/60:.1f} minutes)")
-                            if st.session_state.bulk_email_success_count > 0:
-                                st.success(f"✅ Successfully sent {st.session_state.bulk_email_success_count} email(s)!")
-                            if st.session_state.bulk_email_failed_count > 0:
-                                st.error(f"❌ Failed to send {st.session_state.bulk_email_failed_count} email(s)")
-
-                            # Reset session state
-                            st.session_state.bulk_email_in_progress = False
-                            st.session_state.bulk_email_processed_ids = set()
-                            st.session_state.bulk_email_success_count = 0
-                            st.session_state.bulk_email_failed_count = 0
-                            st.session_state.bulk_email_start_time = None
-                        else:
-                            # More entries to process, trigger rerun to continue
-                            time.sleep(0.1)  # Brief pause before rerun
-                            st.rerun()
+                    # Emails are queued in the database and sent by the email worker
+                    # (email_worker.py, or in this process with EMAIL_QUEUE_IN_APP_WORKER) -
+                    # this page only enqueues and shows progress
+                    if st.button("📧 Generate & Send Bulk Emails", use_container_width=True, type="primary"):
+                        send_specific_passes = st.session_state.get('bulk_send_passes')
+                        passes = None
+                        if send_specific_passes:
+                            # ADMIN MODE: Only send selected passes
+                            passes = [
+                                flag for flag, key in (
+                                    ('exhibition_day1', 'ex1'),
+                                    ('exhibition_day2', 'ex2'),
+                                    ('interactive_sessions', 'interactive'),
+                                    ('plenary', 'plenary')
+                                )
+                                if send_specific_passes[key]
+                            ]
+
+                        batch_id, queued = email_queue.enqueue(db, selected_entries, user['username'], passes)
+                        if queued:
+                            st.session_state.bulk_email_batch_id = batch_id
+
+                        notice = f"✅ Queued {queued} email(s)"
+                        if queued < len(selected_entries):
+                            notice += f" - {len(selected_entries) - queued} attendee(s) already had an email queued"
+                        st.session_state.bulk_email_notice = notice
+                        st.rerun()
                 else:
                     st.warning("Please select at least one attendee")
+
+                if poll_batch:
+                    import time
+                    time.sleep(3)  # Poll the queue while the batch is being sent
+                    st.rerun()
     finally:
         db.close()
 
@@ -2435,17 +2315,7 @@ Swavlamban 2025 Team""",
                                             attachments = passes
                                         else:
                                             # MailBluster uses base64 encoded content
-                                            import base64
-                                            from pathlib import Path
-                                            for pass_file in passes:
-                                                if Path(pass_file).exists():
-                                                    with open(pass_file, 'rb') as f:
-                                                        file_content = base64.b64encode(f.read()).decode('utf-8')
-                                                        attachments.append({
-                                                            "filename": Path(pass_file).name,
-                                                            "content": file_content,
-                                                            "type": "image/png"
-                                                        })
+                                            attachments = email_service.prepare_attachments(passes)
 
                                     # Send email using selected service
                                     if settings.USE_GMAIL_SMTP:
@@ -2702,7 +2572,8 @@ Swavlamban 2025 Team""",
                                         email_success = email_service.send_exhibitor_bulk_email(
                                             recipient_email=exhibitor['email'],
                                             recipient_name=exhibitor['firm_name'],
-                                            pass_files=all_passes_for_exhibitor
+                                            pass_files=all_passes_for_exhibitor,
+                                            num_attendees=processed_attendees
                                         )
 
                                         if email_success:
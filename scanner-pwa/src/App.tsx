@@ -62,11 +62,15 @@ function App() {
         try {
           setSyncing(true);
           await uploadPendingScans();
+
+          // Pull entry changes since last sync (delta - cheap)
+          if (gateNumber) await downloadEntries(gateNumber);
           setLastSync(new Date());
 
-          // Update pending count
+          // Update pending count and total entries
           const stats = await getSyncStats();
           setPendingCount(stats.pendingScans);
+          setTotalEntries(stats.totalEntries);
         } catch (error) {
           console.error('Background sync failed:', error);
         } finally {
@@ -76,7 +80,7 @@ function App() {
     }, SYNC_INTERVAL_MS);
 
     return () => clearInterval(syncInterval);
-  }, [token, setSyncing, setLastSync, setPendingCount]);
+  }, [token, gateNumber, setSyncing, setLastSync, setPendingCount, setTotalEntries]);
 
   // Update pending count and total entries on mount and after each scan
   useEffect(() => {
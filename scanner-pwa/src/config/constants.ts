@@ -17,7 +17,9 @@ export const STORAGE_KEYS = {
   TOKEN: 'scanner_token',
   GATE_NUMBER: 'gate_number',
   OPERATOR: 'operator',
-  LAST_SYNC: 'last_sync'
+  LAST_SYNC: 'last_sync',
+  LAST_SYNC_SCOPE: 'last_sync_scope',
+  SNAPSHOT_ETAG: 'snapshot_etag'
 } as const;
 
 // Pass Types
@@ -23,6 +23,31 @@ export async function apiCall<T = any>(
   return response.json();
 }
 
+// Raw fetch for streamed (NDJSON) and snapshot responses - caller reads the body
+export async function apiStream(
+  endpoint: string,
+  headers: Record<string, string> = {}
+): Promise<Response> {
+  const token = sessionStorage.getItem(STORAGE_KEYS.TOKEN);
+
+  const response = await fetch(`${API_BASE_URL}${endpoint}`, {
+    method: 'GET',
+    headers: {
+      ...(token && { Authorization: `Bearer ${token}` }),
+      ...headers
+    }
+  });
+
+  if (response.status === 304) return response;
+
+  if (!response.ok || !response.body) {
+    const error = await response.json().catch(() => ({ detail: 'API request failed' }));
+    throw new Error(error.detail || error.message || error.error || 'API request failed');
+  }
+
+  return response;
+}
+
 export const api = {
   get: <T = any>(endpoint: string) => apiCall<T>(endpoint, { method: 'GET' }),
 
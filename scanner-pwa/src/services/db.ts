@@ -12,6 +12,16 @@ export class ScannerDB extends Dexie {
       entries: 'entry_id, qr_signature, organization',
       pending_scans: '++id, entry_id, uploaded, check_in_time'
     });
+
+    // v2: every pending scan carries an idempotency key for safe upload retries
+    this.version(2).stores({
+      entries: 'entry_id, qr_signature, organization',
+      pending_scans: '++id, entry_id, uploaded, check_in_time'
+    }).upgrade(tx =>
+      tx.table('pending_scans').toCollection().modify((scan: PendingScan) => {
+        if (!scan.idempotency_key) scan.idempotency_key = crypto.randomUUID();
+      })
+    );
   }
 
   // Sync entries from API
@@ -20,6 +30,21 @@ export class ScannerDB extends Dexie {
     await this.entries.bulkAdd(entries);
   }
 
+  // Apply a delta sync: upsert changed entries and remove deleted ones
+  async applyEntryChanges(entries: Entry[], deletedIds: number[]): Promise<void> {
+    await this.transaction('rw', this.entries, async () => {
+      if (entries.length > 0) await this.entries.bulkPut(entries);
+      if (deletedIds.length > 0) await this.entries.bulkDelete(deletedIds);
+    });
+  }
+
+  // Remove entries not present in a completed full download
+  async removeEntriesExcept(keepIds: Set<number>): Promise<void> {
+    const staleIds = (await this.entries.toCollection().primaryKeys())
+      .filter(id => !keepIds.has(id));
+    if (staleIds.length > 0) await this.entries.bulkDelete(staleIds);
+  }
+
   // Get entry by signature
   async getEntryBySignature(signature: string): Promise<Entry | undefined> {
     return await this.entries.where('qr_signature').equals(signature).first();
@@ -31,9 +56,12 @@ export class ScannerDB extends Dexie {
   }
 
   // Add pending scan
-  async addPendingScan(scan: Omit<PendingScan, 'id' | 'created_at'>): Promise<number> {
+  async addPendingScan(
+    scan: Omit<PendingScan, 'id' | 'created_at' | 'idempotency_key'>
+  ): Promise<number> {
     return await this.pending_scans.add({
       ...scan,
+      idempotency_key: crypto.randomUUID(),
       created_at: new Date(),
       uploaded: false
     });
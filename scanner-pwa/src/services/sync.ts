@@ -1,31 +1,162 @@
 import { db } from './db';
-import { api } from './api';
+import { api, apiStream } from './api';
+import type {
+  BatchCheckInRequest,
+  BatchCheckInResponse,
+  EntriesSnapshot,
+  EntriesStreamLine
+} from '@/types/api.types';
 import type { Entry } from '@/types/entry.types';
-import type { BatchCheckInRequest, BatchCheckInResponse } from '@/types/api.types';
+import { STORAGE_KEYS } from '@/config/constants';
 import { toISOString } from '@/utils/datetime';
 
+// Entries written to IndexedDB per transaction while the download streams in
+const STREAM_WRITE_CHUNK = 500;
+
 export async function downloadEntries(gateNumber?: string, date?: string): Promise<number> {
   try {
     const params = new URLSearchParams();
     if (gateNumber) params.append('gate_number', gateNumber);
     if (date) params.append('date', date);
 
-    const response = await api.get<{ success: boolean; count: number; entries: Entry[] }>(
-      `/scanner/entries?${params.toString()}`
-    );
+    // Delta sync: only ask for changes since the last cursor if IndexedDB already
+    // holds entries downloaded for the same gate/date scope
+    const scope = params.toString();
+    const cursor = localStorage.getItem(STORAGE_KEYS.LAST_SYNC);
+    const sameScope = localStorage.getItem(STORAGE_KEYS.LAST_SYNC_SCOPE) === scope;
+    const hasEntries = (await db.getTotalEntries()) > 0;
+    const canDelta = Boolean(cursor && sameScope && hasEntries);
 
-    if (response.success && response.entries) {
-      await db.syncEntries(response.entries);
-      return response.count;
+    // Initial load: compact gzip snapshot (much smaller than the full JSON)
+    if (!canDelta) {
+      return await downloadSnapshot(scope);
     }
+    params.append('since', cursor!);
+
+    // Stream NDJSON and write to IndexedDB in chunks as lines arrive.
+    // Existing entries stay in place until the download completes, so a
+    // dropped connection never leaves the scanner with a partial list.
+    const response = await apiStream(`/scanner/entries/stream?${params.toString()}`);
+    const reader = response.body!.pipeThrough(new TextDecoderStream()).getReader();
+
+    let buffer = '';
+    let pending: Entry[] = [];
+    const receivedIds = new Set<number>();
+    const stream = {
+      lastUpdated: null as string | null,
+      fullSync: true,
+      deletedIds: [] as number[],
+      completed: false
+    };
 
-    return 0;
+    const flush = async () => {
+      if (pending.length === 0) return;
+      await db.applyEntryChanges(pending, []);
+      pending = [];
+    };
+
+    const handleLine = async (line: string) => {
+      if (!line.trim()) return;
+      const message = JSON.parse(line) as EntriesStreamLine;
+
+      if (message.type === 'meta') {
+        stream.lastUpdated = message.last_updated;
+        stream.fullSync = message.full_sync;
+        stream.deletedIds = message.deleted_entry_ids;
+      } else if (message.type === 'entry') {
+        pending.push(message.entry);
+        receivedIds.add(message.entry.entry_id);
+        if (pending.length >= STREAM_WRITE_CHUNK) await flush();
+      } else if (message.type === 'end') {
+        stream.completed = true;
+      }
+    };
+
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += value;
+
+      const lines = buffer.split('\n');
+      buffer = lines.pop() ?? '';
+      for (const line of lines) await handleLine(line);
+    }
+    await handleLine(buffer);
+    await flush();
+
+    if (!stream.completed || !stream.lastUpdated) {
+      throw new Error('Entry download interrupted');
+    }
+
+    if (stream.fullSync) {
+      await db.removeEntriesExcept(receivedIds);
+    } else if (stream.deletedIds.length > 0) {
+      await db.applyEntryChanges([], stream.deletedIds);
+    }
+
+    localStorage.setItem(STORAGE_KEYS.LAST_SYNC, stream.lastUpdated);
+    localStorage.setItem(STORAGE_KEYS.LAST_SYNC_SCOPE, scope);
+    return await db.getTotalEntries();
   } catch (error) {
     console.error('Failed to download entries:', error);
     throw error;
   }
 }
 
+// Pass bitfield layout (must match backend app/services/scanner_snapshot.py)
+const PASS_BITS = {
+  exhibition_day1: 1,
+  exhibition_day2: 2,
+  interactive_sessions: 4,
+  plenary: 8,
+  exhibitor_pass: 16
+} as const;
+
+export async function downloadSnapshot(scope: string): Promise<number> {
+  const sameScope = localStorage.getItem(STORAGE_KEYS.LAST_SYNC_SCOPE) === scope;
+  const hasEntries = (await db.getTotalEntries()) > 0;
+  const etag = localStorage.getItem(STORAGE_KEYS.SNAPSHOT_ETAG);
+
+  const headers: Record<string, string> = {};
+  if (etag && sameScope && hasEntries) headers['If-None-Match'] = etag;
+
+  const response = await apiStream(`/scanner/entries/snapshot?${scope}`, headers);
+
+  // Nothing changed since our copy was downloaded
+  if (response.status === 304) {
+    return await db.getTotalEntries();
+  }
+
+  const snapshot = (await response.json()) as EntriesSnapshot;
+
+  const entries: Entry[] = snapshot.rows.map(
+    ([entry_id, id_number, name, organization, qr_signature, passes]) => ({
+      entry_id,
+      id_number,
+      name,
+      organization,
+      qr_signature,
+      phone: '',
+      email: '',
+      id_type: '',
+      exhibition_day1: (passes & PASS_BITS.exhibition_day1) !== 0,
+      exhibition_day2: (passes & PASS_BITS.exhibition_day2) !== 0,
+      interactive_sessions: (passes & PASS_BITS.interactive_sessions) !== 0,
+      plenary: (passes & PASS_BITS.plenary) !== 0,
+      is_exhibitor: (passes & PASS_BITS.exhibitor_pass) !== 0
+    })
+  );
+
+  await db.syncEntries(entries);
+
+  const newEtag = response.headers.get('ETag');
+  if (newEtag) localStorage.setItem(STORAGE_KEYS.SNAPSHOT_ETAG, newEtag);
+  localStorage.setItem(STORAGE_KEYS.LAST_SYNC, snapshot.last_updated);
+  localStorage.setItem(STORAGE_KEYS.LAST_SYNC_SCOPE, scope);
+
+  return entries.length;
+}
+
 export async function uploadPendingScans(): Promise<{
   total: number;
   created: number;
@@ -50,22 +181,25 @@ export async function uploadPendingScans(): Promise<{
       scanner_operator: scan.scanner_operator,
       check_in_time: toISOString(scan.check_in_time),
       verification_status: 'verified',
-      notes: undefined
+      notes: undefined,
+      idempotency_key: scan.idempotency_key
     }));
 
     const response = await api.post<BatchCheckInResponse>('/scanner/checkin/batch', {
       checkins
     } as BatchCheckInRequest);
 
-    if (response.success) {
-      // Mark all scans as uploaded
-      const scanIds = pendingScans.map((scan) => scan.id!).filter((id) => id !== undefined);
-      await db.markScansAsUploaded(scanIds);
-    }
+    // Mark scans the server stored (now or on an earlier attempt) as uploaded;
+    // rows that errored stay pending and are retried alone next time
+    const scanIds = (response.results || [])
+      .filter((result) => result.status !== 'error')
+      .map((result) => pendingScans[result.index]?.id)
+      .filter((id): id is number => id !== undefined);
+    await db.markScansAsUploaded(scanIds);
 
     return {
       total: response.total,
-      created: response.created,
+      created: response.uploaded,
       duplicates: response.duplicates,
       errors: response.errors
     };
@@ -1,3 +1,5 @@
+import type { Entry } from './entry.types';
+
 export interface LoginRequest {
   username: string;
   password: string;
@@ -46,6 +48,7 @@ export interface CheckInRequest {
   check_in_time: string;
   verification_status: string;
   notes?: string;
+  idempotency_key?: string;
 }
 
 export interface CheckInResponse {
@@ -59,11 +62,44 @@ export interface BatchCheckInRequest {
   checkins: CheckInRequest[];
 }
 
+export interface CheckInResult {
+  index: number;
+  entry_id: number;
+  status: 'created' | 're_entry' | 'duplicate' | 'error';
+  check_in_id?: number;
+  re_entry_id?: number;
+  error?: string;
+}
+
 export interface BatchCheckInResponse {
   success: boolean;
   total: number;
-  created: number;
+  uploaded: number;
+  re_entries: number;
   duplicates: number;
   errors: number;
-  message: string;
+  error_details?: string[];
+  results: CheckInResult[];
+}
+
+export interface EntriesDownloadResponse {
+  success: boolean;
+  count: number;
+  last_updated: string;
+  full_sync: boolean;
+  entries: Entry[];
+  deleted_entry_ids: number[];
+}
+
+export type EntriesStreamLine =
+  | { type: 'meta'; last_updated: string; full_sync: boolean; deleted_entry_ids: number[] }
+  | { type: 'entry'; entry: Entry }
+  | { type: 'end'; count: number };
+
+export interface EntriesSnapshot {
+  version: number;
+  last_updated: string;
+  fields: string[];
+  pass_bits: Record<string, number>;
+  rows: [number, string, string, string, string, number][];
 }
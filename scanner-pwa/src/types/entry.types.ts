@@ -24,6 +24,7 @@ export interface PendingScan {
   check_in_time: Date;
   scanner_device_id: string;
   scanner_operator: string;
+  idempotency_key: string;
   uploaded: boolean;
   created_at: Date;
 }
@@ -49,6 +49,7 @@ def main():
 
     # Initialize pass generator
     generator = PassGenerator()
+    generator.output_dir.mkdir(parents=True, exist_ok=True)
 
     # Determine which passes to generate
     passes_to_generate = []
@@ -86,10 +87,11 @@ def main():
         # Output filename
         safe_name = entry.name.replace(" ", "_")
         output_filename = f"TEST_{safe_name}_{pass_type}.png"
-        output_path = generator.output_dir / output_filename
 
-        # Overlay QR on pass
-        generator.overlay_qr_on_pass(template_path, qr_img, output_path, template_filename)
+        # Overlay QR on pass and save it for inspection
+        rendered_pass = generator.overlay_qr_on_pass(template_path, qr_img, output_filename)
+        output_path = generator.output_dir / rendered_pass.filename
+        output_path.write_bytes(rendered_pass.content)
 
         generated_files.append(output_path)
         print(f"   ✅ Generated: {output_path.name}")